@@ -2,10 +2,14 @@ import requests
 import json
 import os
 import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from enum import Enum
+from urllib3.util.retry import Retry
 
 from C3.utils.logging_utils import init_logger, get_logger
+from Common.rate_limit import RateLimitedAdapter
 # logger
 init_logger()
 logger = get_logger(__name__)
@@ -13,6 +17,65 @@ logger = get_logger(__name__)
 C3_DIR_PATH = os.path.split(pathlib.Path(__file__).parent.resolve())[0]
 CONF_DIR_PATH = os.path.join(C3_DIR_PATH, 'configs')
 
+# (connect, read) timeout in seconds of each request
+DEFAULT_TIMEOUT = (10, 60)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_POOL_MAXSIZE = 16
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+# Updating a DUT by PATCH sets the same values again, so it's safe to retry
+RETRY_ALLOWED_METHODS = Retry.DEFAULT_ALLOWED_METHODS | {'PATCH'}
+# The max number of requests in flight of update_duts_bulk, it should not
+# exceed the pool size of the session
+DEFAULT_BULK_WORKERS = 8
+
+
+def create_session(
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        rate_limiter=None
+):
+    """ Create a requests.Session which keeps the connections alive and
+        retries the throttled or failed requests
+
+        The requests are scheduled by rate_limiter, default is the
+        RateLimiter shared in this process.
+    """
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        allowed_methods=RETRY_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        # Return the last response instead of raising MaxRetryError
+        raise_on_status=False,
+    )
+    adapter = RateLimitedAdapter(
+        rate_limiter=rate_limiter,
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """ Get the session shared by all C3API instances in this process
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
 
 class C3Location(Enum):
     """ The location string from C3
@@ -46,12 +109,32 @@ class DUTPayloadAttrs:
 
 
 class C3API:
-    def __init__(self, base_url=''):
+    def __init__(
+            self,
+            base_url='',
+            cache=None,
+            session=None,
+            timeout=DEFAULT_TIMEOUT
+    ):
+        """
+            Parameters:
+                cache {C3.utils.cache.ResponseCache}: Cache the responses
+                    of GET requests, it's disabled by default
+                session {requests.Session}: The session to send requests,
+                    default is the session shared in this process.
+                    See create_session to build a session with different
+                    retry and pool settings.
+                timeout {float or tuple}: The (connect, read) timeout in
+                    seconds of each request
+        """
         with open(os.path.join(CONF_DIR_PATH, 'api_token.json')) as f:
             self._api_token = json.load(f)
 
         self._base_url = base_url if base_url else \
             'https://certification.canonical.com/api/v1/hardware'
+        self._cache = cache
+        self._session = session
+        self._timeout = timeout
 
     @property
     def base_url(self):
@@ -61,8 +144,50 @@ class C3API:
     def api_token(self):
         return self._api_token
 
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = get_shared_session()
+        return self._session
+
+    @property
+    def timeout(self):
+        return self._timeout
+
     def _request(self, http_method='GET', url='', params={}, payload={}):
         """ Wrapper for requests
+
+            The GET requests are served by the cache if it's given, and the
+            other requests invalidate the cached responses of the CIDs in
+            their URL and payload.
+        """
+        if self._cache is None:
+            return self._send(http_method, url, params, payload)
+
+        tags = self._cache.find_tags(url, params, payload)
+        if http_method.upper() != 'GET':
+            response = self._send(http_method, url, params, payload)
+            self._cache.invalidate(tags)
+            return response
+
+        key = self._cache.make_key(http_method, url, params, payload)
+        response, etag = self._cache.get(key)
+        if response is not None:
+            return response
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self._send(http_method, url, params, payload, headers)
+        return self._cache.set(key, response, tags)
+
+    def _send(self, http_method='GET', url='', params={}, payload={},
+              extra_headers={}):
+        """ Send the request through the pooled session
+
+            The throttled or failed requests are retried by the session.
+            Raise the exception if no response is received.
         """
         headers = {
             'Accept': 'application/json',
@@ -70,28 +195,33 @@ class C3API:
             'Authorization': 'ApiKey {}:{}'.format(
                 self._api_token['launchpad_id'],
                 self._api_token['api_token']
-            )
+            ),
+            **extra_headers
         }
 
+        response = None
         try:
             payload = json.dumps(payload)
-            response = requests.request(
+            response = self.session.request(
                 http_method,
                 url,
                 params=params,
                 data=payload,
-                headers=headers
+                headers=headers,
+                timeout=self._timeout
             )
             if response.status_code < 200 or response.status_code > 299:
-                response.raise_for_status()
+                if response.status_code != 304:
+                    response.raise_for_status()
         except Exception as e:
             logger.error(e)
             logger.error('*' * 50)
             logger.error('params: {}'.format(params))
             logger.error('payload: {}'.format(payload))
             logger.error('*' * 50)
-        finally:
-            return response
+            if response is None:
+                raise
+        return response
 
     def _update_dut(self, cid, payload):
         """ Update DUT information
@@ -119,3 +249,49 @@ class C3API:
         )
         response = self._update_dut(cid, payload=f_payload)
         return response
+
+    def update_duts_bulk(self, payloads=None,
+                         max_workers=DEFAULT_BULK_WORKERS):
+        """ Update the information of many DUTs concurrently
+
+            A failed DUT won't stop the others.
+
+            Parameters:
+                payloads {dict}: The payload of each CID, see
+                    update_dut_by_cid
+                    e.g. {'202208-28154': {'holder': '<launchpad_id>'}}
+                max_workers {int}: The max number of requests in flight
+
+            Return {list}: The result of each CID in the order of payloads
+                e.g.
+                    [{
+                        'cid': '202208-28154',
+                        'ok': False,
+                        'status_code': 502,
+                        'error': '502 Server Error: Bad Gateway ...',
+                        'response': <Response [502]>
+                    }]
+        """
+        def update(cid):
+            response, error = None, None
+            try:
+                response = self.update_dut_by_cid(cid, payloads[cid])
+                if not response.ok:
+                    error = response.text
+            except Exception as e:
+                error = str(e)
+            return {
+                'cid': cid,
+                'ok': error is None,
+                'status_code': None if response is None
+                else response.status_code,
+                'error': error,
+                'response': response
+            }
+
+        payloads = dict(payloads or {})
+        if not payloads:
+            return []
+        with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(payloads))) as executor:
+            return list(executor.map(update, payloads))
@@ -0,0 +1,100 @@
+import threading
+import time
+import unittest
+
+from C3.apis.base import C3API, create_session
+from Common.tests.mock_server import MockHTTPServer
+
+DELAY = 0.1
+
+
+class FakeC3:
+    """ Update the DUTs like C3, the CIDs in invalid are rejected and the
+        CIDs in flaky fail with 502 once. The max requests in flight are
+        recorded.
+    """
+    def __init__(self, invalid=(), flaky=()):
+        self.invalid = invalid
+        self.flaky = set(flaky)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, body):
+        cid = path.strip('/').split('/')[0]
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(DELAY)
+        with self._lock:
+            self.in_flight -= 1
+            if cid in self.flaky:
+                self.flaky.discard(cid)
+                return 502, {}, {'detail': 'Bad Gateway'}
+        if cid in self.invalid:
+            return 400, {}, {'holder': ['Invalid holder']}
+        return 200, {}, dict(body, canonical_id=cid)
+
+
+def payloads(count):
+    return {
+        '202208-{}'.format(28150 + i): {'holder': 'someone'}
+        for i in range(count)
+    }
+
+
+class UpdateDUTsBulkTest(unittest.TestCase):
+    def _c3_api(self, server):
+        return C3API(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0)
+        )
+
+    def test_report_each_cid(self):
+        """ A failed DUT should be reported without stopping the others
+        """
+        responder = FakeC3(invalid=('202208-28151',))
+        with MockHTTPServer(responder) as server:
+            results = self._c3_api(server).update_duts_bulk(payloads(3))
+
+        self.assertEqual(
+            ['202208-28150', '202208-28151', '202208-28152'],
+            [r['cid'] for r in results])
+        self.assertEqual([True, False, True], [r['ok'] for r in results])
+        self.assertEqual(400, results[1]['status_code'])
+        self.assertIn('Invalid holder', results[1]['error'])
+        self.assertEqual(3, len(server.received))
+
+    def test_max_workers(self):
+        """ The requests in flight should not exceed max_workers
+        """
+        responder = FakeC3()
+        with MockHTTPServer(responder) as server:
+            results = self._c3_api(server).update_duts_bulk(
+                payloads(6), max_workers=2)
+
+        self.assertTrue(all(r['ok'] for r in results))
+        self.assertEqual(2, responder.max_in_flight)
+
+    def test_retry_patch(self):
+        """ The PATCH failed with 5xx should be retried by the session
+        """
+        responder = FakeC3(flaky=('202208-28150',))
+        with MockHTTPServer(responder) as server:
+            results = self._c3_api(server).update_duts_bulk(payloads(1))
+
+        self.assertTrue(results[0]['ok'])
+        self.assertEqual(
+            ['PATCH', 'PATCH'], [method for method, _, _ in server.received])
+
+    def test_no_payloads(self):
+        """ Should send nothing without payloads
+        """
+        c3_api = C3API(session=create_session(backoff_factor=0))
+
+        self.assertEqual([], c3_api.update_duts_bulk())
+        self.assertEqual([], c3_api.update_duts_bulk({}))
+
+
+if __name__ == '__main__':
+    unittest.main()
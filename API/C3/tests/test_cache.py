@@ -0,0 +1,88 @@
+import time
+import unittest
+
+from C3.apis.base import C3API, create_session
+from C3.utils.cache import ResponseCache
+from Common.tests.mock_server import MockHTTPServer
+
+ETAG = '"v1"'
+
+
+class FakeC3:
+    """ Respond the DUTs like C3, the GET responses have an ETag
+    """
+    def __init__(self):
+        self.server = None
+
+    def __call__(self, method, path, body):
+        if method == 'PATCH':
+            return 200, {}, body
+        if self.server.received_headers[-1].get('If-None-Match') == ETAG:
+            return 304, {'ETag': ETAG}, b''
+        cid = path.split('canonical_id=')[1]
+        return 200, {'ETag': ETAG}, {'results': [{'canonical_id': cid}]}
+
+
+class C3ResponseCacheTest(unittest.TestCase):
+    def _serve(self):
+        responder = FakeC3()
+        server = MockHTTPServer(responder)
+        responder.server = server
+        return server
+
+    def _c3_api(self, server, cache):
+        return C3API(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0),
+            cache=cache
+        )
+
+    def _gets(self, server):
+        return [path for method, path, _ in server.received if method == 'GET']
+
+    def test_hit(self):
+        """ The same DUT should be got once
+        """
+        with self._serve() as server:
+            c3_api = self._c3_api(server, ResponseCache())
+            first = c3_api.get_dut_by_cid('202208-28154')
+            second = c3_api.get_dut_by_cid('202208-28154')
+
+        self.assertEqual(1, len(server.received))
+        self.assertEqual(first.json(), second.json())
+
+    def test_revalidate(self):
+        """ The expired DUT should be revalidated by its ETag
+        """
+        with self._serve() as server:
+            c3_api = self._c3_api(server, ResponseCache(ttl=0.1))
+            first = c3_api.get_dut_by_cid('202208-28154')
+            time.sleep(0.2)
+            second = c3_api.get_dut_by_cid('202208-28154')
+
+        self.assertEqual(2, len(server.received))
+        self.assertEqual(ETAG, server.received_headers[1]['If-None-Match'])
+        self.assertEqual(200, second.status_code)
+        self.assertEqual(first.json(), second.json())
+
+    def test_invalidate_by_patch(self):
+        """ Updating a DUT should drop the cached response of its CID only
+        """
+        with self._serve() as server:
+            c3_api = self._c3_api(server, ResponseCache())
+            c3_api.get_dut_by_cid('202208-28154')
+            c3_api.get_dut_by_cid('202208-28155')
+            c3_api.update_dut_by_cid('202208-28154', {'holder': 'someone'})
+            c3_api.get_dut_by_cid('202208-28154')
+            c3_api.get_dut_by_cid('202208-28155')
+
+        self.assertEqual(
+            ['28154', '28155', '28154'],
+            [path[-5:] for path in self._gets(server)])
+        self.assertEqual(
+            ('PATCH', '/202208-28154/inventory/', {'holder': 'someone'}),
+            server.received[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import time
+import unittest
+
+from C3.apis.base import C3API, create_session
+from Common.rate_limit import RateLimiter, get_rate_limiter
+from Common.tests.mock_server import MockHTTPServer
+
+
+class C3RateLimitTest(unittest.TestCase):
+    def _c3_api(self, server, **kwargs):
+        return C3API(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0, **kwargs)
+        )
+
+    def test_shared_rate_limiter(self):
+        """ The session should use the RateLimiter shared with Jira and
+            GoogleSheet by default
+        """
+        adapter = create_session().get_adapter('https://')
+        self.assertIs(get_rate_limiter(), adapter.rate_limiter)
+
+    def test_session_counters(self):
+        """ The session should count the throttled and retried requests
+        """
+        statuses = [429, 200]
+
+        def responder(method, path, body):
+            return statuses.pop(0), {'Retry-After': '0'}, {'results': []}
+
+        rate_limiter = RateLimiter({})
+        with MockHTTPServer(responder) as server:
+            c3_api = self._c3_api(server, rate_limiter=rate_limiter)
+            response = c3_api.get_dut_by_cid('202208-28154')
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {'requests': 1, 'queued': 0, 'throttled': 1, 'retried': 1},
+            rate_limiter.stats()['127.0.0.1'])
+
+    def test_pause_by_retry_after(self):
+        """ The requests after a throttled one should wait for Retry-After
+        """
+        statuses = [429, 200]
+
+        def responder(method, path, body):
+            return statuses.pop(0), {'Retry-After': '0.3'}, {}
+
+        rate_limiter = RateLimiter({})
+        with MockHTTPServer(responder) as server:
+            c3_api = self._c3_api(
+                server, max_retries=0, rate_limiter=rate_limiter)
+            c3_api.update_dut_by_cid('202208-28154', {'holder': 'someone'})
+            start = time.monotonic()
+            c3_api.update_dut_by_cid('202208-28155', {'holder': 'someone'})
+            elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.25)
+        self.assertEqual(
+            {'requests': 2, 'queued': 1, 'throttled': 1, 'retried': 0},
+            rate_limiter.stats()['127.0.0.1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,17 @@
+import re
+
+from Common.cache import ResponseCache as _ResponseCache
+
+# The responses are tagged by the CIDs in their request, and invalidated by
+# the writes to the same CIDs. e.g. 202208-28154
+TAG_PATTERN = re.compile(r'\b\d{6}-\d{5}\b')
+
+
+class ResponseCache(_ResponseCache):
+    """ The ResponseCache tagged by CIDs, see Common.cache
+
+        e.g.
+            cache = ResponseCache(ttl=60, path='/tmp/c3_cache')
+            c3_api = C3API(cache=cache)
+    """
+    tag_pattern = TAG_PATTERN
@@ -0,0 +1,193 @@
+""" LRU cache with TTL for the responses of the API wrappers
+
+    The API wrappers, e.g. Jira and C3, tag the cached responses by the IDs
+    in their request, so a write request only drops the responses of the
+    same IDs. The tag_pattern finds the IDs of a service.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL = 60
+
+
+class ResponseCache:
+    """ LRU cache with TTL for the responses of read-only requests
+
+        The entries are kept in memory, and also in path if it's given so
+        that they can be reused by the next run. An expired entry with an
+        ETag is revalidated by If-None-Match instead of being dropped.
+
+        e.g.
+            cache = ResponseCache(
+                ttl=60, path='/tmp/c3_cache', tag_pattern=CID_PATTERN)
+            c3_api = C3API(cache=cache)
+    """
+    # The pattern of the IDs to tag the responses, None to tag nothing so
+    # every write drops all entries
+    tag_pattern = None
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL, path=None,
+                 tag_pattern=None):
+        """
+            Parameters:
+                maxsize {int}: The max number of entries in memory
+                ttl {float}: The seconds an entry is fresh
+                path {str}: The directory to store the entries, optional
+                tag_pattern {re.Pattern}: The pattern of the IDs to tag the
+                    responses, default is the tag_pattern of the class
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        if tag_pattern is not None:
+            self.tag_pattern = tag_pattern
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def make_key(http_method, url, params=None, payload=None):
+        """ Build the cache key from the request
+        """
+        return json.dumps(
+            [http_method.upper(), url, params or {}, payload or {}],
+            sort_keys=True
+        )
+
+    def find_tags(self, *items):
+        """ Find the tags in the URL and payload of a request
+        """
+        if self.tag_pattern is None:
+            return set()
+        text = ' '.join(
+            i if isinstance(i, str) else json.dumps(i) for i in items if i)
+        return set(self.tag_pattern.findall(text))
+
+    def _entry_path(self, key):
+        return os.path.join(
+            self.path, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def _load_entry(self, key):
+        """ Get the entry from memory, or from the disk store
+        """
+        entry = self._entries.get(key)
+        if entry is None and self.path:
+            try:
+                with open(self._entry_path(key)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._save_entry(key, entry, store=False)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def _save_entry(self, key, entry, store=True):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        if store and self.path:
+            with open(self._entry_path(key), 'w') as f:
+                json.dump(entry, f)
+
+    def get(self, key):
+        """ Get the fresh response of key
+
+            Return {tuple}: (response, etag)
+                - (response, None) if the entry is fresh
+                - (None, etag) if the entry is expired but has an ETag
+                - (None, None) if no entry
+        """
+        with self._lock:
+            entry = self._load_entry(key)
+        if entry is None:
+            return None, None
+        if entry['expires'] > time.time():
+            return _to_response(entry), None
+        return None, entry.get('etag')
+
+    def set(self, key, response, tags=()):
+        """ Cache the successful response, or refresh the entry of key if
+            the response is 304 Not Modified
+
+            Return {requests.Response}: The response to return to caller
+        """
+        with self._lock:
+            if response.status_code == 304:
+                entry = self._load_entry(key)
+                if entry is None:
+                    return response
+                entry['expires'] = time.time() + self.ttl
+                self._save_entry(key, entry)
+                return _to_response(entry)
+            if not response.ok:
+                return response
+            self._save_entry(key, {
+                'expires': time.time() + self.ttl,
+                'etag': response.headers.get('ETag'),
+                'tags': sorted(tags),
+                'status_code': response.status_code,
+                'headers': dict(response.headers),
+                'url': response.url,
+                'encoding': response.encoding,
+                'content': base64.b64encode(response.content).decode()
+            })
+        return response
+
+    def invalidate(self, tags=()):
+        """ Drop the entries tagged by any of tags after a write request
+
+            The entries without tag are dropped as well, since a write
+            might change the result of any search, e.g. a new issue.
+        """
+        tags = set(tags)
+
+        def is_stale(entry):
+            return not entry['tags'] or bool(tags & set(entry['tags']))
+
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if is_stale(e)]:
+                del self._entries[key]
+            if not self.path:
+                return
+            for name in os.listdir(self.path):
+                entry_path = os.path.join(self.path, name)
+                try:
+                    with open(entry_path) as f:
+                        if not is_stale(json.load(f)):
+                            continue
+                    os.remove(entry_path)
+                except (OSError, ValueError):
+                    pass
+
+    def clear(self):
+        """ Drop all entries
+        """
+        with self._lock:
+            self._entries.clear()
+            if self.path:
+                for name in os.listdir(self.path):
+                    os.remove(os.path.join(self.path, name))
+
+
+def _to_response(entry):
+    """ Build a new requests.Response from the cache entry
+    """
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = entry['url']
+    response.encoding = entry['encoding']
+    response._content = base64.b64decode(entry['content'])
+    return response
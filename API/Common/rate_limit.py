@@ -0,0 +1,235 @@
+""" Token bucket scheduler to keep the requests of each host under its rate
+
+    The requests take a token of their host before being sent, and wait if
+    the bucket is empty. The Retry-After and X-RateLimit-* headers of the
+    responses pause the bucket and lower its rate, since other jobs might
+    share the same quota.
+
+    The API wrappers, e.g. Jira, C3 and GoogleSheet, share the RateLimiter
+    of get_rate_limiter, so the requests and counters of all hosts are in
+    one place.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from requests.adapters import HTTPAdapter
+
+# (rate, burst): the tokens added per second and the size of bucket,
+# the hosts not listed are not limited but still adapt to the headers
+HOST_RATE_LIMITS = {
+    'warthogs.atlassian.net': (10.0, 20),
+    'certification.canonical.com': (5.0, 10),
+    'certification.staging.canonical.com': (5.0, 10),
+    # The quota is 60 requests per minute per user
+    'sheets.googleapis.com': (1.0, 10),
+}
+DEFAULT_RATE_LIMIT = (float('inf'), 1)
+# The rate is lowered by this factor on 429 and recovered on success
+THROTTLE_FACTOR = 0.5
+RECOVER_FACTOR = 1.1
+MIN_RATE = 0.5
+THROTTLED_STATUS = (429,)
+
+
+def parse_retry_after(value):
+    """ Get the seconds to wait from Retry-After, which is seconds or date
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) -
+                         datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rate_limit_reset(value):
+    """ Get the seconds to wait from X-RateLimit-Reset, which is epoch
+        seconds, seconds to wait or ISO 8601 date
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+        # Epoch seconds
+        if seconds > 1e9:
+            seconds -= time.time()
+        return max(0.0, seconds)
+    except ValueError:
+        pass
+    try:
+        reset = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return max(0.0, (reset - datetime.now(timezone.utc)).total_seconds())
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """ Take a token, return the seconds to wait before using it
+        """
+        wait = max(0.0, self.paused_until - now)
+        if self.max_rate == float('inf'):
+            return wait
+        self._refill(now)
+        self.tokens -= 1
+        if self.tokens < 0:
+            wait = max(wait, -self.tokens / self.rate)
+        return wait
+
+
+class RateLimiter:
+    """ Schedule the requests by a token bucket of each host
+
+        e.g.
+            limiter = RateLimiter({'example.com': (5, 10)})
+            limiter.acquire('example.com')
+            response = requests.get('https://example.com')
+            limiter.observe('example.com', response.status_code,
+                            response.headers)
+    """
+    def __init__(self, rate_limits=HOST_RATE_LIMITS,
+                 default_rate_limit=DEFAULT_RATE_LIMIT):
+        """
+            Parameters:
+                rate_limits {dict}: The (rate, burst) of each host
+                default_rate_limit {tuple}: The (rate, burst) of the hosts
+                    not in rate_limits, default is unlimited
+        """
+        self._rate_limits = dict(rate_limits)
+        self._default_rate_limit = default_rate_limit
+        self._buckets = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host, rate, burst):
+        """ Set the rate and burst of host
+        """
+        with self._lock:
+            self._rate_limits[host] = (rate, burst)
+            self._buckets.pop(host, None)
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(*self._rate_limits.get(
+                host, self._default_rate_limit))
+            self._stats[host] = {
+                'requests': 0, 'queued': 0, 'throttled': 0, 'retried': 0}
+        return self._buckets[host]
+
+    def acquire(self, host):
+        """ Wait until the request to host can be sent
+
+            Return {float}: The seconds waited
+        """
+        with self._lock:
+            wait = self._bucket(host).reserve(time.monotonic())
+            self._stats[host]['requests'] += 1
+            if wait:
+                self._stats[host]['queued'] += 1
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def observe(self, host, status_code, headers={}):
+        """ Adapt the bucket of host to the response
+        """
+        headers = {k.lower(): v for k, v in headers.items()}
+        retry_after = parse_retry_after(headers.get('retry-after'))
+        if headers.get('x-ratelimit-remaining') == '0':
+            retry_after = max(
+                retry_after or 0.0,
+                parse_rate_limit_reset(headers.get('x-ratelimit-reset')) or 0)
+        with self._lock:
+            bucket = self._bucket(host)
+            now = time.monotonic()
+            if retry_after:
+                bucket.paused_until = max(
+                    bucket.paused_until, now + retry_after)
+            if status_code in THROTTLED_STATUS:
+                self._stats[host]['throttled'] += 1
+                if bucket.max_rate == float('inf'):
+                    return
+                bucket._refill(now)
+                bucket.rate = max(MIN_RATE, bucket.rate * THROTTLE_FACTOR)
+            elif bucket.rate < bucket.max_rate:
+                bucket._refill(now)
+                bucket.rate = min(
+                    bucket.max_rate, bucket.rate * RECOVER_FACTOR)
+
+    def record_retry(self, host, count=1):
+        with self._lock:
+            self._bucket(host)
+            self._stats[host]['retried'] += count
+
+    def stats(self):
+        """ The counters of requests of each host
+
+            Return {dict}
+                e.g.
+                    {
+                        'warthogs.atlassian.net': {
+                            'requests': 10,
+                            'queued': 2,
+                            'throttled': 1,
+                            'retried': 1
+                        }
+                    }
+        """
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """ HTTPAdapter which sends the requests through a RateLimiter
+    """
+    def __init__(self, rate_limiter=None, **kwargs):
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        host = urlsplit(request.url).hostname
+        self.rate_limiter.acquire(host)
+        response = super().send(request, **kwargs)
+        # The requests retried by urllib3 are not sent through here
+        retries = getattr(response.raw, 'retries', None)
+        if retries is not None and retries.history:
+            self.rate_limiter.record_retry(host, len(retries.history))
+            for history in retries.history:
+                self.rate_limiter.observe(host, history.status)
+        self.rate_limiter.observe(host, response.status_code, response.headers)
+        return response
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """ Get the RateLimiter shared in this process
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
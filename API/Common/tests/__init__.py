@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Add the path of API to python path
+sys.path.insert(0, os.path.split(os.getcwd())[0])
@@ -0,0 +1,80 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockHTTPServer:
+    """ A local HTTP server which stands in for the API services, e.g. Jira
+
+        Parameters:
+            responder {callable}: Called with (method, path, body) of each
+                request, returns (status_code, headers, body). The body is
+                dumped to JSON if it's not bytes. The requests and their
+                headers are recorded in received and received_headers.
+
+        e.g.
+            with MockHTTPServer(lambda m, p, b: (200, {}, {})) as server:
+                JiraAPI(base_url=server.base_url)
+    """
+    def __init__(self, responder):
+        self.responder = responder
+        self.received = []
+        self.received_headers = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def _handler_class(self):
+        mock_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are sent apart, don't let keep-alive
+            # connections wait for the delayed ACK
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length', 0))
+                raw_body = self.rfile.read(length) if length else b''
+                body = json.loads(raw_body) if raw_body else None
+                with mock_server._lock:
+                    mock_server.received.append(
+                        (self.command, self.path, body))
+                    mock_server.received_headers.append(dict(self.headers))
+                status, headers, content = mock_server.responder(
+                    self.command, self.path, body)
+                if not isinstance(content, bytes):
+                    content = json.dumps(content).encode('utf-8')
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = _handle  # noqa: N815
+            do_POST = _handle  # noqa: N815
+            do_PUT = _handle  # noqa: N815
+            do_PATCH = _handle  # noqa: N815
+            do_DELETE = _handle  # noqa: N815
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,43 @@
+import re
+import unittest
+
+import requests
+
+from Common.cache import ResponseCache
+
+
+def response(content=b'{}'):
+    r = requests.Response()
+    r.status_code = 200
+    r.url = 'http://127.0.0.1/'
+    r._content = content
+    return r
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def test_tag_pattern(self):
+        """ Should tag the entries by the IDs matched by tag_pattern, and
+            drop only the entries of the written IDs
+        """
+        cache = ResponseCache(tag_pattern=re.compile(r'\bID-\d+\b'))
+        for key in ('ID-1', 'ID-2'):
+            cache.set(key, response(), cache.find_tags('/item/' + key))
+
+        cache.invalidate(cache.find_tags({'id': 'ID-1'}))
+
+        self.assertIsNone(cache.get('ID-1')[0])
+        self.assertEqual(b'{}', cache.get('ID-2')[0].content)
+
+    def test_no_tag_pattern(self):
+        """ Should drop all entries by any write if no tag_pattern is given
+        """
+        cache = ResponseCache()
+        cache.set('ID-1', response(), cache.find_tags('/item/ID-1'))
+
+        self.assertEqual(set(), cache.find_tags('/item/ID-1'))
+        cache.invalidate(cache.find_tags('/item/ID-2'))
+        self.assertIsNone(cache.get('ID-1')[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
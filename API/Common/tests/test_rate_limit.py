@@ -0,0 +1,84 @@
+import time
+import unittest
+
+import requests
+
+from Common.rate_limit import (
+    RateLimitedAdapter,
+    RateLimiter,
+    get_rate_limiter,
+    parse_rate_limit_reset
+)
+from Common.tests.mock_server import MockHTTPServer
+
+
+class RateLimiterTest(unittest.TestCase):
+    def test_queue_over_burst(self):
+        """ The requests over the burst should wait for tokens
+        """
+        rate_limiter = RateLimiter({'jira': (20.0, 2)})
+        start = time.monotonic()
+        for _ in range(4):
+            rate_limiter.acquire('jira')
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertEqual(2, rate_limiter.stats()['jira']['queued'])
+
+    def test_unlimited_host(self):
+        """ The hosts without rate limit should not wait
+        """
+        rate_limiter = RateLimiter({})
+        for _ in range(100):
+            self.assertEqual(0, rate_limiter.acquire('localhost'))
+
+    def test_pause_by_retry_after(self):
+        """ Retry-After should pause the host and lower its rate
+        """
+        rate_limiter = RateLimiter({'jira': (10.0, 10)})
+        rate_limiter.observe('jira', 429, {'retry-after': '0.2'})
+        start = time.monotonic()
+        rate_limiter.acquire('jira')
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(5.0, rate_limiter._buckets['jira'].rate)
+        self.assertEqual(1, rate_limiter.stats()['jira']['throttled'])
+
+    def test_parse_rate_limit_reset(self):
+        self.assertEqual(3, parse_rate_limit_reset('3'))
+        self.assertAlmostEqual(
+            10, parse_rate_limit_reset(str(time.time() + 10)), delta=1)
+        self.assertEqual(0, parse_rate_limit_reset('2000-01-01T00:00Z'))
+
+    def test_shared_rate_limiter(self):
+        """ The adapters should share one RateLimiter by default
+        """
+        self.assertIs(get_rate_limiter(), get_rate_limiter())
+        self.assertIs(
+            get_rate_limiter(), RateLimitedAdapter().rate_limiter)
+
+
+class RateLimitedAdapterTest(unittest.TestCase):
+    def test_pause_by_retry_after(self):
+        """ The next request should wait for Retry-After of the response
+        """
+        def responder(method, path, body):
+            return 429, {'Retry-After': '0.3'}, {}
+
+        rate_limiter = RateLimiter({})
+        session = requests.Session()
+        session.mount('http://', RateLimitedAdapter(rate_limiter))
+        with MockHTTPServer(responder) as server:
+            session.get(server.base_url)
+            start = time.monotonic()
+            session.get(server.base_url)
+            elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.25)
+        self.assertEqual(
+            {'requests': 2, 'queued': 1, 'throttled': 2, 'retried': 0},
+            rate_limiter.stats()['127.0.0.1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
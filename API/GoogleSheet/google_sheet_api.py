@@ -1,15 +1,151 @@
 import os
+import threading
+import time
+import google_auth_httplib2
+import httplib2
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 from google.oauth2.credentials import Credentials
 
+from Common.rate_limit import get_rate_limiter
+
 
 SERVICE_ACCOUNT_FILE = "service-account-key.json"
 CREDENTIAL_FILE = "credentials.json"
 TOKEN_FILE = "token.json"
 API_ACCOUNT_TYPE = os.environ.get("GOOGLE_API_ACCOUNT_TYPE")
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    # To get the modifiedTime of spreadsheet
+    "https://www.googleapis.com/auth/drive.metadata.readonly"
+]
+SHEETS_HOST = "sheets.googleapis.com"
+DRIVE_HOST = "www.googleapis.com"
+MAX_RETRIES = 5
+RETRY_BACKOFF_FACTOR = 1.0
+
+
+def _prepare_credential(api_type: str):
+    cred = None
+
+    if api_type == "service-account":
+        cred = service_account.Credentials.from_service_account_file(
+                    filename=SERVICE_ACCOUNT_FILE)
+    elif api_type == "user-account":
+        if os.path.exists(TOKEN_FILE):
+            cred = Credentials.from_authorized_user_file(
+                TOKEN_FILE, SCOPES
+            )
+
+        if cred and cred.valid and cred.expired and cred.refresh_token:
+            cred.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(
+                CREDENTIAL_FILE, SCOPES
+            )
+        cred = flow.run_local_server(port=0)
+
+        with open(TOKEN_FILE, 'w') as token_fp:
+            token_fp.write(cred.to_json())
+    else:
+        raise SystemError(
+                f"Unsupported API account type: {api_type}")
+
+    return cred
+
+
+_credentials = {}
+_services = {}
+_services_lock = threading.Lock()
+# The http of each thread, httplib2.Http is not thread-safe
+_thread_local = threading.local()
+
+
+def _get_thread_http(credentials):
+    """ Get the http authorized by credentials for the current thread
+
+        The requests of the shared services are sent by it, so the threads
+        don't share the connections of httplib2.
+    """
+    if not hasattr(_thread_local, 'https'):
+        _thread_local.https = {}
+    if credentials not in _thread_local.https:
+        _thread_local.https[credentials] = google_auth_httplib2.AuthorizedHttp(
+            credentials, http=httplib2.Http())
+    return _thread_local.https[credentials]
+
+
+def _get_resource(api_type: str, name: str, version: str, resource: str):
+    """ Get the resource of API name shared in this process
+
+        The credential is loaded and the service is built at the first call
+        only. The service is built from the discovery document bundled in
+        google-api-python-client, so it doesn't fetch it from network.
+    """
+    with _services_lock:
+        if (name, api_type) not in _services:
+            if api_type not in _credentials:
+                _credentials[api_type] = _prepare_credential(api_type)
+            service = build(name, version,
+                            credentials=_credentials[api_type],
+                            static_discovery=True,
+                            cache_discovery=False)
+            _services[(name, api_type)] = getattr(service, resource)()
+        return _services[(name, api_type)]
+
+
+def get_sheets_service(api_type: str):
+    """ Get the spreadsheets resource of api_type shared in this process
+    """
+    return _get_resource(api_type, 'sheets', 'v4', 'spreadsheets')
+
+
+def get_drive_service(api_type: str):
+    """ Get the files resource of Google Drive shared in this process
+    """
+    return _get_resource(api_type, 'drive', 'v3', 'files')
+
+
+def set_sheets_service(api_type: str, sheet_obj):
+    """ Set the spreadsheets resource of api_type, e.g. a fake one in tests
+    """
+    with _services_lock:
+        _services[('sheets', api_type)] = sheet_obj
+
+
+def set_drive_service(api_type: str, files_obj):
+    """ Set the files resource of api_type, e.g. a fake one in tests
+    """
+    with _services_lock:
+        _services[('drive', api_type)] = files_obj
+
+
+def clear_sheets_services():
+    """ Drop the cached credentials and services, they're rebuilt by the
+        next call
+    """
+    with _services_lock:
+        _credentials.clear()
+        _services.clear()
+
+
+def insert_dimension_request(sheet_id: int, dimension: str,
+                             start_index: int, num: int = 1) -> dict:
+    """ The request of batchUpdate to insert num empty rows or columns
+    """
+    return {
+        "insertDimension": {
+            "range": {
+                "sheetId": sheet_id,
+                "dimension": dimension,
+                "startIndex": start_index,
+                "endIndex": start_index + num
+            }
+        }
+    }
 
 
 class GoogleSheetOperator():
@@ -30,50 +166,91 @@ class GoogleSheetOperator():
         self._spreadsheet_id = value
 
     def _prepare_credential(self):
-        cred = None
-
-        if self._api_type == "service-account":
-            cred = service_account.Credentials.from_service_account_file(
-                        filename=SERVICE_ACCOUNT_FILE)
-        elif self._api_type == "user-account":
-            scopes = ["https://www.googleapis.com/auth/spreadsheets"]
-            if os.path.exists(TOKEN_FILE):
-                cred = Credentials.from_authorized_user_file(
-                    TOKEN_FILE, scopes
-                )
-
-            if cred and cred.valid and cred.expired and cred.refresh_token:
-                cred.refresh(Request())
-            else:
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    CREDENTIAL_FILE, scopes
-                )
-            cred = flow.run_local_server(port=0)
-
-            with open(TOKEN_FILE, 'w') as token_fp:
-                token_fp.write(cred.to_json())
-        else:
-            raise SystemError(
-                    f"Unsupported API account type: {self._api_type}")
-
-        return cred
+        return _prepare_credential(self._api_type)
 
     def prepare_sheet_obj(self):
-        credential = self._prepare_credential()
-        service = build('sheets', 'v4', credentials=credential)
-        self._sheet_obj = service.spreadsheets()
+        self._sheet_obj = get_sheets_service(self._api_type)
 
     def _check_service(self):
         return all([self._sheet_obj, self.spreadsheet])
 
+    def _execute(self, request, max_retries: int = MAX_RETRIES,
+                 host: str = SHEETS_HOST):
+        """ Execute the request through the shared rate limiter
+
+            The request is sent by the http of the current thread, since the
+            http of the shared services is not thread-safe. The request is
+            retried with an exponential backoff if it's rejected by the quota.
+        """
+        rate_limiter = get_rate_limiter()
+        # The requests of the fake services have no credentials
+        credentials = getattr(getattr(request, 'http', None),
+                              'credentials', None)
+        for attempt in range(max_retries + 1):
+            rate_limiter.acquire(host)
+            try:
+                if credentials is None:
+                    result = request.execute()
+                else:
+                    result = request.execute(
+                        http=_get_thread_http(credentials))
+            except HttpError as e:
+                status = e.resp.status
+                throttled = status == 429 or (
+                    status == 403 and b"rateLimitExceeded" in e.content)
+                rate_limiter.observe(
+                    host, 429 if throttled else status, e.resp)
+                if not throttled or attempt == max_retries:
+                    raise
+                rate_limiter.record_retry(host)
+                time.sleep(RETRY_BACKOFF_FACTOR * 2 ** attempt)
+            else:
+                rate_limiter.observe(host, 200)
+                return result
+
+    def get_modified_time(self) -> str:
+        """ Get the last modified time of spreadsheet from Google Drive
+
+            It's cheap to tell whether the spreadsheet has been changed
+                e.g. '2023-05-04T07:12:35.123Z'
+        """
+        if self._check_service():
+            result = self._execute(
+                get_drive_service(self._api_type).get(
+                    fileId=self.spreadsheet,
+                    fields="modifiedTime",
+                    supportsAllDrives=True),
+                host=DRIVE_HOST)
+            return result.get("modifiedTime")
+
     def get_range_data(self, data_range: str, major_dimension: str = "ROWS"):
         if self._check_service():
-            result = self._sheet_obj.values().get(
+            result = self._execute(self._sheet_obj.values().get(
                         spreadsheetId=self.spreadsheet,
                         range=data_range,
-                        majorDimension=major_dimension).execute()
+                        majorDimension=major_dimension))
             return result.get("values", [])
 
+    def get_ranges_data(self, ranges: list[str],
+                        major_dimension: str = "ROWS") -> dict:
+        """ Get the values of many ranges by one batchGet request
+
+            Return a dictionary whose keys are the given ranges
+                e.g. {'TEL-L5!1:1': [['CID', 'MAC', ...]]}
+        """
+        if self._check_service():
+            result = self._execute(self._sheet_obj.values().batchGet(
+                        spreadsheetId=self.spreadsheet,
+                        ranges=list(ranges),
+                        majorDimension=major_dimension))
+            # The ranges in response are normalized, e.g. 'TEL-L5'!A1:Z1,
+            # but they're in the same order as the request
+            return {
+                data_range: value_range.get("values", [])
+                for data_range, value_range in zip(
+                    ranges, result.get("valueRanges", []))
+            }
+
     def update_range_data(self, data: list[dict],
                           input_option: str = "USER_ENTERED"):
         if self._check_service():
@@ -81,53 +258,29 @@ class GoogleSheetOperator():
                 "valueInputOption": input_option,
                 "data": data
             }
-            result = self._sheet_obj.values().batchUpdate(
+            result = self._execute(self._sheet_obj.values().batchUpdate(
                 spreadsheetId=self.spreadsheet,
-                body=req_body).execute()
+                body=req_body))
+            return result
+
+    def batch_update(self, requests: list[dict]):
+        """ Send the requests, e.g. insertDimension, by one batchUpdate
+        """
+        if self._check_service():
+            req_body = {"requests": requests}
+            result = self._execute(self._sheet_obj.batchUpdate(
+                spreadsheetId=self.spreadsheet,
+                body=req_body))
             return result
 
     def insert_empty_rows(self,
                           sheet_id: int,
                           start_index: int,
                           num: int = 1):
-        if self._check_service():
-            req_body = {
-                "requests": [
-                    {
-                        "insertDimension": {
-                            "range": {
-                                "sheetId": sheet_id,
-                                "dimension": "ROWS",
-                                "startIndex": start_index,
-                                "endIndex": start_index + num
-                            }
-                        }
-                    }
-                ]
-            }
-            result = self._sheet_obj.batchUpdate(
-                spreadsheetId=self.spreadsheet,
-                body=req_body).execute()
-            print(result)
+        return self.batch_update([
+            insert_dimension_request(sheet_id, "ROWS", start_index, num)])
 
     def insert_empty_columns(self, sheet_id: int,
                              start_index: int, num: int = 1):
-        if self._check_service():
-            req_body = {
-                "requests": [
-                    {
-                        "insertDimension": {
-                            "range": {
-                                "sheetId": sheet_id,
-                                "dimension": "COLUMNS",
-                                "startIndex": start_index,
-                                "endIndex": start_index + num
-                            }
-                        }
-                    }
-                ]
-            }
-            result = self._sheet_obj.batchUpdate(
-                spreadsheetId=self.spreadsheet,
-                body=req_body).execute()
-            print(result)
+        return self.batch_update([
+            insert_dimension_request(sheet_id, "COLUMNS", start_index, num)])
@@ -0,0 +1,13 @@
+import os
+import sys
+
+from unittest.mock import MagicMock
+
+# Add the path of API to python path
+sys.path.insert(0, os.path.split(os.getcwd())[0])
+
+try:
+    import googleapiclient  # noqa: F401
+except ImportError:
+    # The tests of the write buffer don't need the Google API client
+    sys.modules['GoogleSheet.google_sheet_api'] = MagicMock()
@@ -0,0 +1,129 @@
+import importlib.util
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+HAS_GOOGLE_API = importlib.util.find_spec('googleapiclient') is not None
+
+if HAS_GOOGLE_API:
+    import httplib2
+    from googleapiclient.errors import HttpError
+
+    from Common.rate_limit import RateLimiter
+    from GoogleSheet import google_sheet_api
+    from GoogleSheet.google_sheet_api import GoogleSheetOperator
+
+
+class FakeRequest:
+    """ Raise the errors in order, then return the result
+    """
+    def __init__(self, errors, result=None, credentials=None):
+        self.errors = list(errors)
+        self.result = result
+        self.executed = 0
+        self.https = []
+        if credentials is not None:
+            self.http = SimpleNamespace(credentials=credentials)
+
+    def execute(self, http=None):
+        self.executed += 1
+        self.https.append(http)
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+def http_error(status, headers=None, content=b''):
+    resp = httplib2.Response({'status': status, **(headers or {})})
+    return HttpError(resp, content)
+
+
+@unittest.skipUnless(HAS_GOOGLE_API, 'The Google API client is required')
+class ExecuteTest(unittest.TestCase):
+    def setUp(self):
+        self.rate_limiter = RateLimiter({})
+        patchers = [
+            patch.object(google_sheet_api, 'get_rate_limiter',
+                         return_value=self.rate_limiter),
+            patch.object(google_sheet_api, 'RETRY_BACKOFF_FACTOR', 0),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.gs_obj = GoogleSheetOperator()
+
+    def _stats(self):
+        return self.rate_limiter.stats()[google_sheet_api.SHEETS_HOST]
+
+    def test_retry_by_retry_after(self):
+        """ The throttled request should be retried after Retry-After
+        """
+        request = FakeRequest(
+            [http_error(429, {'retry-after': '0.3'})], {'values': []})
+        start = time.monotonic()
+        result = self.gs_obj._execute(request)
+        elapsed = time.monotonic() - start
+
+        self.assertEqual({'values': []}, result)
+        self.assertEqual(2, request.executed)
+        self.assertGreaterEqual(elapsed, 0.25)
+        self.assertEqual(
+            {'requests': 2, 'queued': 1, 'throttled': 1, 'retried': 1},
+            self._stats())
+
+    def test_retry_rate_limit_exceeded(self):
+        """ The request rejected by the quota with 403 should be retried
+        """
+        request = FakeRequest(
+            [http_error(403, content=b'{"reason": "rateLimitExceeded"}')])
+        self.gs_obj._execute(request)
+
+        self.assertEqual(2, request.executed)
+        self.assertEqual(1, self._stats()['throttled'])
+
+    def test_raise_other_error(self):
+        """ The other errors should be raised without retry
+        """
+        request = FakeRequest([http_error(404)])
+        with self.assertRaises(HttpError):
+            self.gs_obj._execute(request)
+
+        self.assertEqual(1, request.executed)
+        self.assertEqual(
+            {'requests': 1, 'queued': 0, 'throttled': 0, 'retried': 0},
+            self._stats())
+
+    def test_give_up(self):
+        """ The throttled request should be raised after max_retries
+        """
+        request = FakeRequest([http_error(429)] * 3)
+        with self.assertRaises(HttpError):
+            self.gs_obj._execute(request, max_retries=2)
+
+        self.assertEqual(3, request.executed)
+        self.assertEqual(2, self._stats()['retried'])
+
+    def test_thread_http(self):
+        """ Each thread should send the requests by its own http
+        """
+        credentials = object()
+        requests = [FakeRequest([], credentials=credentials)
+                    for _ in range(3)]
+        self.gs_obj._execute(requests[0])
+        self.gs_obj._execute(requests[1])
+        thread = threading.Thread(
+            target=self.gs_obj._execute, args=(requests[2],))
+        thread.start()
+        thread.join()
+        https = [request.https[0] for request in requests]
+
+        self.assertIs(credentials, https[0].credentials)
+        self.assertIs(https[0], https[1])
+        self.assertIsNot(https[0], https[2])
+        self.assertIsNot(https[0].http, https[2].http)
+
+
+if __name__ == '__main__':
+    unittest.main()
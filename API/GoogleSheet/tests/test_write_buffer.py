@@ -0,0 +1,160 @@
+import gc
+import threading
+import unittest
+
+from GoogleSheet import write_buffer
+from GoogleSheet.write_buffer import SheetWriteBuffer
+
+
+def insert_rows(start_index):
+    return {'insertDimension': {'range': {'startIndex': start_index}}}
+
+
+class FakeOperator:
+    """ Stands in for GoogleSheetOperator, records the calls in order
+    """
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+        self.called = threading.Event()
+
+    def update_range_data(self, data, input_option="USER_ENTERED"):
+        self.calls.append(('values', input_option, data))
+        self.called.set()
+        return {'totalUpdatedCells': len(data)}
+
+    def batch_update(self, requests):
+        self.calls.append(('structure', None, requests))
+        self.called.set()
+        if self.error:
+            raise self.error
+        return {'replies': [{} for _ in requests]}
+
+
+class SheetWriteBufferTest(unittest.TestCase):
+    def setUp(self):
+        self.operator = FakeOperator()
+        self.buffer = SheetWriteBuffer(self.operator, flush_interval=None)
+
+    def tearDown(self):
+        self.buffer.close()
+
+    def test_coalesce_updates(self):
+        """ Should send the consecutive updates of the same kind by one call
+        """
+        self.buffer.update_range_data([{'range': 'A1', 'values': [[1]]}])
+        self.buffer.update_range_data([{'range': 'B1', 'values': [[2]]}])
+        self.buffer.batch_update([insert_rows(1), insert_rows(3)])
+        self.assertEqual([], self.operator.calls)
+
+        reports = self.buffer.flush()
+
+        self.assertEqual(
+            [
+                ('values', 'USER_ENTERED', [
+                    {'range': 'A1', 'values': [[1]]},
+                    {'range': 'B1', 'values': [[2]]}
+                ]),
+                ('structure', None, [insert_rows(1), insert_rows(3)])
+            ],
+            self.operator.calls
+        )
+        self.assertTrue(all(r['ok'] for r in reports))
+        self.assertEqual(reports, self.buffer.reports)
+
+    def test_keep_order(self):
+        """ Should send the values and structure batches in the queued order
+        """
+        self.buffer.update_range_data([{'range': 'A2', 'values': [[1]]}])
+        self.buffer.batch_update([insert_rows(1)])
+        self.buffer.update_range_data([{'range': 'A2', 'values': [[2]]}])
+        self.buffer.update_range_data(
+            [{'range': 'A3', 'values': [[3]]}], input_option='RAW')
+        self.buffer.flush()
+
+        self.assertEqual(
+            [
+                ('values', 'USER_ENTERED', [{'range': 'A2', 'values': [[1]]}]),
+                ('structure', None, [insert_rows(1)]),
+                ('values', 'USER_ENTERED', [{'range': 'A2', 'values': [[2]]}]),
+                ('values', 'RAW', [{'range': 'A3', 'values': [[3]]}])
+            ],
+            self.operator.calls
+        )
+
+    def test_last_write_wins(self):
+        """ Should send only the last update of the same range in a batch
+        """
+        self.buffer.update_range_data([
+            {'range': 'A1', 'values': [['old']]},
+            {'range': 'B1', 'values': [['b']]},
+            {'range': 'A1', 'values': [['new']]}
+        ])
+        reports = self.buffer.flush()
+
+        self.assertEqual(
+            [{'range': 'A1', 'values': [['new']]},
+             {'range': 'B1', 'values': [['b']]}],
+            self.operator.calls[0][2]
+        )
+        self.assertEqual(3, len(reports))
+
+    def test_not_sent_after_failure(self):
+        """ Should not send the batches after the failed one
+        """
+        self.operator.error = Exception('400 Bad Request')
+        self.buffer.update_range_data([{'range': 'A1', 'values': [[1]]}])
+        self.buffer.batch_update([insert_rows(1)])
+        self.buffer.update_range_data([{'range': 'A2', 'values': [[2]]}])
+        reports = self.buffer.flush()
+
+        self.assertEqual(
+            ['values', 'structure'], [c[0] for c in self.operator.calls])
+        self.assertEqual([True, False, False], [r['ok'] for r in reports])
+        self.assertIs(self.operator.error, reports[1]['error'])
+        self.assertTrue(reports[2]['error'].startswith('Not sent'))
+
+    def test_flush_by_size(self):
+        """ Should flush when max_requests updates are queued
+        """
+        buffer = SheetWriteBuffer(
+            self.operator, max_requests=2, flush_interval=None)
+        buffer.update_range_data([{'range': 'A1', 'values': [[1]]}])
+        self.assertEqual([], self.operator.calls)
+        buffer.update_range_data([{'range': 'A2', 'values': [[2]]}])
+        self.assertEqual(1, len(self.operator.calls))
+        buffer.close()
+
+    def test_flush_by_timer(self):
+        """ Should flush a while after the first queued update
+        """
+        buffer = SheetWriteBuffer(self.operator, flush_interval=0.05)
+        buffer.update_range_data([{'range': 'A1', 'values': [[1]]}])
+
+        self.assertTrue(self.operator.called.wait(timeout=5))
+        # Wait for the flush by timer to finish
+        buffer.close()
+        self.assertEqual(1, len(self.operator.calls))
+        self.assertEqual(1, len(buffer.reports))
+
+    def test_flush_at_exit(self):
+        """ Should flush the buffers which aren't closed at exit, and not
+            keep them alive
+        """
+        self.buffer.update_range_data([{'range': 'A1', 'values': [[1]]}])
+        write_buffer._flush_all()
+        self.assertEqual(1, len(self.operator.calls))
+
+        buffer = SheetWriteBuffer(self.operator, flush_interval=None)
+        self.assertIn(buffer, write_buffer._buffers)
+        buffer.close()
+        self.assertNotIn(buffer, write_buffer._buffers)
+
+        count = len(write_buffer._buffers)
+        SheetWriteBuffer(self.operator, flush_interval=None)
+        gc.collect()
+        self.assertEqual(count, len(write_buffer._buffers))
+
+
+if __name__ == '__main__':
+    unittest.main()
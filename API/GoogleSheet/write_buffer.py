@@ -0,0 +1,186 @@
+""" Write-behind buffer of GoogleSheetOperator
+
+    The updates are queued and sent by a few batchUpdate calls when the
+    buffer is full, a while after the first queued update, on flush() or
+    when the process exits. The consecutive value updates are coalesced into
+    one values.batchUpdate call, and the consecutive structural requests,
+    e.g. insertDimension, into one spreadsheets.batchUpdate call. The order
+    of updates is kept, since the inserted rows or columns move the cells.
+"""
+import atexit
+import threading
+import weakref
+
+from GoogleSheet.google_sheet_api import insert_dimension_request
+
+DEFAULT_MAX_REQUESTS = 100
+DEFAULT_FLUSH_INTERVAL = 5.0
+VALUES = "values"
+STRUCTURE = "structure"
+
+# The buffers to flush at exit. They're weakly referenced, so a buffer which
+# isn't closed can still be garbage collected, with its queued updates.
+_buffers = weakref.WeakSet()
+
+
+def _flush_all():
+    for buffer in list(_buffers):
+        buffer.flush()
+
+
+atexit.register(_flush_all)
+
+
+def _report(item, response=None, error=None):
+    return {
+        'item': item,
+        'ok': error is None,
+        'error': error,
+        'response': response
+    }
+
+
+class SheetWriteBuffer:
+    """ Queue the updates of a GoogleSheetOperator and send them in batches
+
+        Close the buffer or use it as a context manager, since the queued
+        updates of a buffer which is garbage collected are never sent.
+
+        e.g.
+            with SheetWriteBuffer(gs_obj) as buffer:
+                for row_index, cid in rows:
+                    buffer.update_range_data([{
+                        'range': f'TEL-L5!A{row_index}',
+                        'values': [[cid]]
+                    }])
+            for report in buffer.reports:
+                if not report['ok']:
+                    print(report['item'], report['error'])
+    """
+    def __init__(self, operator, max_requests=DEFAULT_MAX_REQUESTS,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """
+            Parameters:
+                operator {GoogleSheetOperator}: The operator to send updates
+                max_requests {int}: Flush when this many updates are queued
+                flush_interval {float}: Flush this many seconds after the
+                    first queued update, None to flush by size or manually
+        """
+        self.operator = operator
+        self.max_requests = max_requests
+        self.flush_interval = flush_interval
+        # The results of flushed updates, see flush()
+        self.reports = []
+        self._queue = []
+        self._lock = threading.RLock()
+        self._timer = None
+        _buffers.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _put(self, kind, key, item):
+        with self._lock:
+            self._queue.append((kind, key, item))
+            if len(self._queue) >= self.max_requests:
+                self.flush()
+            elif self._timer is None and self.flush_interval is not None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def update_range_data(self, data: list[dict],
+                          input_option: str = "USER_ENTERED"):
+        """ Queue the value updates, see GoogleSheetOperator
+        """
+        for value_range in data:
+            self._put(VALUES, input_option, value_range)
+
+    def batch_update(self, requests: list[dict]):
+        """ Queue the requests of spreadsheets.batchUpdate
+        """
+        for request in requests:
+            self._put(STRUCTURE, None, request)
+
+    def insert_empty_rows(self, sheet_id: int, start_index: int,
+                          num: int = 1):
+        self.batch_update([
+            insert_dimension_request(sheet_id, "ROWS", start_index, num)])
+
+    def insert_empty_columns(self, sheet_id: int, start_index: int,
+                             num: int = 1):
+        self.batch_update([
+            insert_dimension_request(sheet_id, "COLUMNS", start_index, num)])
+
+    def _send(self, kind, key, items):
+        if kind == VALUES:
+            # The later update of the same range wins
+            data = list({item['range']: item for item in items}.values())
+            return self.operator.update_range_data(
+                data=data, input_option=key)
+        return self.operator.batch_update(items)
+
+    def flush(self) -> list[dict]:
+        """ Send the queued updates
+
+            The updates are sent by batches of the consecutive updates of
+            the same kind. If a batch fails, the later batches are not sent
+            since they might depend on it, e.g. the inserted rows.
+
+            Return {list}: The result of each flushed update in the order of
+                queue, and they're also appended to reports
+                e.g.
+                    [
+                        {
+                            'item': {'range': 'TEL-L5!A2', 'values': [[1]]},
+                            'ok': True,
+                            'error': None,
+                            'response': {...}    # of the batch
+                        }
+                    ]
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            queue, self._queue = self._queue, []
+
+            batches = []
+            for kind, key, item in queue:
+                if batches and batches[-1][:2] == (kind, key):
+                    batches[-1][2].append(item)
+                else:
+                    batches.append((kind, key, [item]))
+
+            reports = []
+            error = None
+            for kind, key, items in batches:
+                response = None
+                if error is None:
+                    try:
+                        response = self._send(kind, key, items)
+                    except Exception as e:
+                        error = e
+                        reports.extend(_report(i, error=e) for i in items)
+                        continue
+                    reports.extend(_report(i, response=response)
+                                   for i in items)
+                else:
+                    reports.extend(
+                        _report(i, error=f'Not sent since {error}')
+                        for i in items)
+            if error is not None:
+                # The flushes by timer and at exit have no caller to check
+                failed = sum(not r['ok'] for r in reports)
+                print(f"Error: {failed} updates are not written: {error}")
+            self.reports.extend(reports)
+            return reports
+
+    def close(self):
+        """ Flush the queued updates and stop flushing at exit
+        """
+        self.flush()
+        _buffers.discard(self)
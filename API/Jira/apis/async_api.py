@@ -0,0 +1,217 @@
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from Jira.apis.base import (
+    DEFAULT_POOL_MAXSIZE,
+    DEFAULT_SEARCH_PAGE_SIZE,
+    JiraAPI,
+    _bulk_report,
+    _next_search_page,
+    _search_payload,
+)
+
+# The max number of requests in flight, keep it within the pool size of the
+# session so every request gets a kept-alive connection
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncJiraAPI(JiraAPI):
+    """ The asyncio version of JiraAPI
+
+        The methods sending requests are coroutines, the methods building
+        the payload are the same as JiraAPI. The requests are sent by the
+        pooled session of JiraAPI in worker threads, and a semaphore limits
+        how many of them are in flight.
+
+        e.g.
+            async def transit(keys):
+                async with AsyncJiraAPI() as jira_api:
+                    return await asyncio.gather(*[
+                        jira_api.make_transition(key, '21') for key in keys
+                    ])
+    """
+    def __init__(self, *args, concurrency=DEFAULT_CONCURRENCY, **kwargs):
+        """
+            Parameters:
+                concurrency {int}: The max number of requests in flight,
+                    should not be larger than the pool size of the session
+        """
+        super().__init__(*args, **kwargs)
+        if concurrency > DEFAULT_POOL_MAXSIZE and 'session' not in kwargs:
+            raise ValueError(
+                'concurrency should not exceed the pool size {}'.format(
+                    DEFAULT_POOL_MAXSIZE))
+        self._concurrency = concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='jira')
+        self._semaphore = None
+
+    @property
+    def concurrency(self):
+        return self._concurrency
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """ Shut down the worker threads, the shared session is kept
+        """
+        self._executor.shutdown(wait=True)
+
+    async def _run(self, func, *args, **kwargs):
+        """ Run the blocking JiraAPI method in a worker thread
+        """
+        # The semaphore has to be created in the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs))
+
+    async def update_epic(self, epic, issues_id=[], **kwargs):
+        return await self._run(
+            super().update_epic, epic, issues_id=issues_id, **kwargs)
+
+    async def get_issues(self, **kwargs):
+        return await self._run(super().get_issues, **kwargs)
+
+    async def search_issues(
+        self,
+        jql,
+        fields=['summary'],
+        page_size=DEFAULT_SEARCH_PAGE_SIZE,
+        prefetch=True
+    ):
+        """ The async generator of JiraAPI.search_issues
+
+            The pages are requested in the worker threads, so the event
+            loop isn't blocked while waiting for them.
+
+            e.g.
+                async for issue in jira_api.search_issues('project = VS'):
+                    print(issue['key'])
+        """
+        async def get_page(start_at, next_page_token):
+            response = await self.get_issues(payload=_search_payload(
+                jql, fields, page_size, start_at, next_page_token))
+            response.raise_for_status()
+            return json.loads(response.text)
+
+        next_page = None
+        try:
+            start_at = 0
+            page = await get_page(start_at, None)
+            while True:
+                issues = page.get('issues', [])
+                start_at, next_page_token, is_last = _next_search_page(
+                    page, start_at)
+
+                next_page = None
+                if not is_last:
+                    next_page = get_page(start_at, next_page_token)
+                    if prefetch:
+                        next_page = asyncio.ensure_future(next_page)
+
+                for issue in issues:
+                    yield issue
+
+                if next_page is None:
+                    return
+                page = await next_page
+                next_page = None
+        finally:
+            if isinstance(next_page, asyncio.Future):
+                next_page.cancel()
+            elif next_page is not None:
+                next_page.close()
+
+    async def create_an_issue(self, **kwargs):
+        return await self._run(super().create_an_issue, **kwargs)
+
+    async def create_issues(self, **kwargs):
+        return await self._run(super().create_issues, **kwargs)
+
+    async def add_comment_to_issue(self, key_or_id='', comment_data={}):
+        return await self._run(
+            super().add_comment_to_issue,
+            key_or_id=key_or_id,
+            comment_data=comment_data
+        )
+
+    async def make_transition(self, issue_key, transition_id):
+        return await self._run(
+            super().make_transition, issue_key, transition_id)
+
+    async def link_issue(
+        self,
+        issuelinks_type='10003',
+        id_of_inward_issue='',
+        id_of_outward_issue=''
+    ):
+        return await self._run(
+            super().link_issue,
+            issuelinks_type=issuelinks_type,
+            id_of_inward_issue=id_of_inward_issue,
+            id_of_outward_issue=id_of_outward_issue
+        )
+
+    async def _run_bulk(self, func, items, max_workers=None):
+        """ Await func with each item concurrently, bounded by concurrency
+
+            Parameters:
+                max_workers {int}: The max items in flight of this call, it
+                    can't exceed the concurrency of the instance
+
+            Return {list}: The result of each item in the order of items,
+                see JiraAPI.link_issues_bulk
+        """
+        semaphore = asyncio.Semaphore(max_workers) if max_workers else None
+
+        async def run(item):
+            if semaphore is None:
+                return await func(*item)
+            async with semaphore:
+                return await func(*item)
+
+        responses = await asyncio.gather(
+            *[run(item) for item in items], return_exceptions=True)
+        return [
+            _bulk_report(item, error=response)
+            if isinstance(response, Exception)
+            else _bulk_report(item, response=response)
+            for item, response in zip(items, responses)
+        ]
+
+    async def link_issues_bulk(
+        self,
+        links=[],
+        issuelinks_type='10003',
+        max_workers=None
+    ):
+        async def link(id_of_inward_issue, id_of_outward_issue):
+            return await self.link_issue(
+                issuelinks_type=issuelinks_type,
+                id_of_inward_issue=id_of_inward_issue,
+                id_of_outward_issue=id_of_outward_issue
+            )
+
+        return await self._run_bulk(
+            link, [tuple(pair) for pair in links], max_workers=max_workers)
+
+    async def transition_issues_bulk(
+        self,
+        issue_keys=[],
+        transition_id='',
+        max_workers=None
+    ):
+        return await self._run_bulk(
+            self.make_transition,
+            [(key, transition_id) for key in issue_keys],
+            max_workers=max_workers
+        )
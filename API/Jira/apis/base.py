@@ -2,10 +2,14 @@ import requests
 import json
 import os
 import pathlib
-import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
 
+from Jira.utils import adf
 from Jira.utils.logging_utils import init_logger, get_logger
+from Common.rate_limit import RateLimitedAdapter
 # logger
 init_logger()
 logger = get_logger(__name__)
@@ -14,6 +18,143 @@ JIRA_DIR_PATH = os.path.split(pathlib.Path(__file__).parent.resolve())[0]
 CONF_DIR_PATH = os.path.join(JIRA_DIR_PATH, 'configs')
 JIRA_CONF_DIR_PATH = os.path.join(CONF_DIR_PATH, 'jira_config')
 
+# (connect, read) timeout in seconds of each request
+DEFAULT_TIMEOUT = (10, 60)
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_FACTOR = 0.5
+DEFAULT_POOL_MAXSIZE = 16
+RETRY_STATUS_FORCELIST = (429, 500, 502, 503, 504)
+# Jira doesn't process the POST request with these status codes, so it's
+# safe to send it again without creating duplicated issues
+POST_RETRY_STATUS = (429, 503)
+# The max number of issues of each page in search_issues
+DEFAULT_SEARCH_PAGE_SIZE = 100
+# The endpoints which are read-only but requested by POST
+SEARCH_ENDPOINTS = ('/search', '/search/jql')
+# The max number of requests in flight of the bulk methods, it should not
+# exceed the pool size of the session
+DEFAULT_BULK_WORKERS = 8
+# The max number of issues Jira creates in one bulk request
+BULK_CREATE_MAX_ISSUES = 50
+
+
+class BulkCreateResponse:
+    """ The merged result of the chunks sent by JiraAPI.create_issues
+
+        It can be used like the requests.Response of /issue/bulk, i.e. it
+        has ok, status_code, headers, text, json() and raise_for_status(),
+        and the failedElementNumber of errors is the index in the
+        issueUpdates of whole request.
+
+        Attributes:
+            issues {list}: The created issues in the order of issueUpdates
+            headers {dict}: The headers of the response of first chunk
+            errors {list}: The errors of the issues failed to create
+                e.g.
+                    [{
+                        'status': 400,
+                        'elementErrors': {
+                            'errorMessages': [],
+                            'errors': {'summary': 'Field is required'}
+                        },
+                        'failedElementNumber': 51
+                    }]
+    """
+    def __init__(self, issues=None, errors=None, headers=None):
+        self.issues = list(issues or [])
+        self.errors = list(errors or [])
+        self.headers = requests.structures.CaseInsensitiveDict(headers or {})
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @property
+    def status_code(self):
+        if self.ok:
+            return 201
+        statuses = [e['status'] for e in self.errors if e['status']]
+        return max(statuses) if statuses else 400
+
+    @property
+    def text(self):
+        return json.dumps(self.json())
+
+    @property
+    def content(self):
+        return self.text.encode()
+
+    def json(self):
+        return {'issues': self.issues, 'errors': self.errors}
+
+    def raise_for_status(self):
+        """ Raise requests.HTTPError if any issue is failed to create
+        """
+        if not self.ok:
+            raise requests.HTTPError(
+                '{} Error: {} issues are failed to create: {}'.format(
+                    self.status_code, len(self.errors), self.text),
+                response=self)
+
+
+class JiraRetry(Retry):
+    """ Retry the idempotent requests on RETRY_STATUS_FORCELIST, but only
+        retry POST requests on POST_RETRY_STATUS.
+
+        The delay honors the Retry-After header, otherwise it's an
+        exponential backoff.
+    """
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if method.upper() == 'POST' and status_code in POST_RETRY_STATUS:
+            return True
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def create_session(
+        max_retries=DEFAULT_MAX_RETRIES,
+        backoff_factor=DEFAULT_BACKOFF_FACTOR,
+        pool_maxsize=DEFAULT_POOL_MAXSIZE,
+        rate_limiter=None
+):
+    """ Create a requests.Session which keeps the connections alive and
+        retries the throttled or failed requests
+
+        The requests are scheduled by rate_limiter, default is the
+        RateLimiter shared in this process.
+    """
+    retry = JiraRetry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_FORCELIST,
+        respect_retry_after_header=True,
+        # Return the last response instead of raising MaxRetryError
+        raise_on_status=False,
+    )
+    adapter = RateLimitedAdapter(
+        rate_limiter=rate_limiter,
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_shared_session():
+    """ Get the session shared by all JiraAPI instances in this process
+    """
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
 
 class JiraAPI:
     def __init__(
@@ -21,8 +162,22 @@ class JiraAPI:
             base_url='https://warthogs.atlassian.net',
             jira_api_path='rest/api/3',
             path_of_jira_board_conf=JIRA_CONF_DIR_PATH,
-            jira_board_conf='project.json'
+            jira_board_conf='project.json',
+            session=None,
+            timeout=DEFAULT_TIMEOUT,
+            cache=None
     ):
+        """
+            Parameters:
+                session {requests.Session}: The session to send requests,
+                    default is the session shared in this process.
+                    See create_session to build a session with different
+                    retry and pool settings.
+                timeout {float or tuple}: The (connect, read) timeout in
+                    seconds of each request
+                cache {Jira.utils.cache.ResponseCache}: Cache the responses
+                    of GET and search requests, it's disabled by default
+        """
         self._base_url = base_url
         self._jira_api_path = jira_api_path
         with open(os.path.join(path_of_jira_board_conf, jira_board_conf)) as f:
@@ -31,6 +186,16 @@ class JiraAPI:
         with open(os.path.join(JIRA_CONF_DIR_PATH, 'api_token.json')) as f:
             self._api_token = json.load(f)
 
+        self._session = session
+        self._timeout = timeout
+        self._cache = cache
+        self._auth = HTTPBasicAuth(
+            self._api_token['email'], self._api_token['api_token'])
+        self._headers = {
+            "Accept": "application/json",
+            "Content-Type": "application/json"
+        }
+
     @property
     def base_url(self):
         return self._base_url
@@ -47,33 +212,73 @@ class JiraAPI:
     def api_token(self):
         return self._api_token
 
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = get_shared_session()
+        return self._session
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @property
+    def cache(self):
+        return self._cache
+
     def _request(self, http_method='GET', url='', payload={}):
         """ Wrapper for requests
+
+            The request is sent through the pooled session, the throttled
+            or failed requests are retried by JiraRetry. Raise the
+            exception if no response is received.
+
+            The GET and search requests are served by the cache if it's
+            given, and the other requests invalidate the cached responses
+            of the issue keys in their URL and payload.
         """
-        auth = HTTPBasicAuth(
-            self.api_token['email'], self.api_token['api_token'])
+        if self._cache is None:
+            return self._send(http_method, url, payload)
 
-        headers = {
-            "Accept": "application/json",
-            "Content-Type": "application/json"
-        }
+        if http_method.upper() != 'GET' and \
+                not url.rstrip('/').endswith(SEARCH_ENDPOINTS):
+            response = self._send(http_method, url, payload)
+            self._cache.invalidate(self._cache.find_tags(url, payload))
+            return response
 
+        key = self._cache.make_key(http_method, url, payload=payload)
+        response, etag = self._cache.get(key)
+        if response is not None:
+            return response
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self._send(http_method, url, payload, headers)
+        return self._cache.set(
+            key, response, self._cache.find_tags(url, payload))
+
+    def _send(self, http_method='GET', url='', payload={}, headers={}):
+        """ Send the request through the pooled session
+        """
+        response = None
         try:
-            payload = json.dumps(payload)
-            response = requests.request(http_method,
-                                        url,
-                                        data=payload,
-                                        headers=headers,
-                                        auth=auth)
+            payload = adf.dumps(payload)
+            response = self.session.request(http_method,
+                                            url,
+                                            data=payload,
+                                            headers={**self._headers,
+                                                     **headers},
+                                            auth=self._auth,
+                                            timeout=self._timeout)
             if response.status_code < 200 or response.status_code > 299:
-                response.raise_for_status()
+                if response.status_code != 304:
+                    response.raise_for_status()
         except Exception as e:
             logger.error(e)
             logger.error('*' * 50)
             logger.error(payload)
             logger.error('*' * 50)
-        finally:
-            return response
+            if response is None:
+                raise
+        return response
 
     def update_epic(self, epic, issues_id=[], **kwargs):
         """ WARNNING: Deprecate method
@@ -107,6 +312,70 @@ class JiraAPI:
         response = self._request("POST", url=api_endpoint, payload=payload)
         return response
 
+    def search_issues(
+        self,
+        jql,
+        fields=['summary'],
+        page_size=DEFAULT_SEARCH_PAGE_SIZE,
+        prefetch=True
+    ):
+        """ Search issues by JQL and yield them page by page
+
+            The pages are requested by startAt, or by nextPageToken if Jira
+            returns it. The next page is requested in the background while
+            the issues of current page are being yielded, so at most two
+            pages are kept in memory. Stop iterating to stop requesting.
+
+            Parameters:
+                jql {str}: The JQL to search issues
+                fields {list}: The fields of each issue to return, keep it
+                    small for large searches
+                page_size {int}: The max number of issues of each page
+                prefetch {bool}: Request the next page in the background
+
+            Yield {dict}
+                e.g.
+                    {
+                        "id": "74064",
+                        "key": "VS-746",
+                        "fields": {"summary": "['Cres'] (fossa-corsola-abc)"}
+                    }
+
+            Raise requests.HTTPError if any page is failed to get
+        """
+        def get_page(start_at, next_page_token):
+            # Not self.get_issues, which is a coroutine on AsyncJiraAPI
+            response = JiraAPI.get_issues(self, payload=_search_payload(
+                jql, fields, page_size, start_at, next_page_token))
+            response.raise_for_status()
+            return json.loads(response.text)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            start_at = 0
+            page = get_page(start_at, None)
+            while True:
+                issues = page.get('issues', [])
+                start_at, next_page_token, is_last = _next_search_page(
+                    page, start_at)
+
+                next_page = None
+                if not is_last:
+                    if executor:
+                        next_page = executor.submit(
+                            get_page, start_at, next_page_token)
+                    else:
+                        next_page = get_page(start_at, next_page_token)
+
+                yield from issues
+
+                if next_page is None:
+                    return
+                page = next_page.result() if executor else next_page
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
     def create_an_issue(self, **kwargs):
         """ Create an issue
         """
@@ -118,13 +387,114 @@ class JiraAPI:
 
     def create_issues(self, **kwargs):
         """ Create bulk issues
+
+            The issueUpdates are sent in chunks of BULK_CREATE_MAX_ISSUES
+            concurrently, and the issues failed in a chunk are created one
+            by one again. A chunk which fails as a whole, e.g. timeout, is
+            not sent again since Jira might have created its issues.
+
+            Return {BulkCreateResponse}: The merged issues and errors. It
+                isn't a requests.Response, but has the same ok,
+                status_code, headers, text, json() and raise_for_status()
         """
         api_endpoint = "{}/{}/issue/bulk".format(
             self._base_url, self._jira_api_path)
-        payload = kwargs['payload']
-        response = self._request("POST", url=api_endpoint, payload=payload)
+        issue_updates = kwargs['payload']['issueUpdates']
+        chunk_starts = range(0, len(issue_updates), BULK_CREATE_MAX_ISSUES)
+        # The response headers of each chunk
+        chunk_headers = {}
+
+        def element_error(idx, status, element_errors):
+            return {
+                'status': status,
+                'elementErrors': element_errors,
+                'failedElementNumber': idx
+            }
 
-        return response
+        def create_chunk(start):
+            """ Return a list of (index, issue, error, retry) of the chunk
+            """
+            chunk = issue_updates[start:start + BULK_CREATE_MAX_ISSUES]
+            try:
+                response = self._request(
+                    "POST", url=api_endpoint, payload={'issueUpdates': chunk})
+                chunk_headers[start] = response.headers
+                result = json.loads(response.text)
+            except Exception as e:
+                # The chunk is rejected as a whole
+                return [
+                    (start + idx, None, element_error(
+                        start + idx, None,
+                        {'errorMessages': [str(e)], 'errors': {}}), False)
+                    for idx in range(len(chunk))
+                ]
+
+            failed = {
+                e['failedElementNumber']: e
+                for e in result.get('errors', [])
+            }
+            created = iter(result.get('issues', []))
+            results = []
+            for idx in range(len(chunk)):
+                if idx in failed:
+                    error = element_error(
+                        start + idx,
+                        failed[idx].get('status', response.status_code),
+                        failed[idx].get('elementErrors', {}))
+                    results.append((start + idx, None, error, True))
+                else:
+                    issue, error = next(created, None), None
+                    if issue is None:
+                        # Jira doesn't report the result of this element
+                        error = element_error(
+                            start + idx, response.status_code,
+                            {'errorMessages': [response.text], 'errors': {}})
+                    results.append((start + idx, issue, error, False))
+            return results
+
+        def create_one(idx):
+            try:
+                # Not self.create_an_issue, which is a coroutine on
+                # AsyncJiraAPI
+                response = JiraAPI.create_an_issue(
+                    self, payload=issue_updates[idx])
+                if response.ok:
+                    return json.loads(response.text), None
+                return None, element_error(
+                    idx, response.status_code,
+                    json.loads(response.text or '{}'))
+            except Exception as e:
+                return None, element_error(
+                    idx, None, {'errorMessages': [str(e)], 'errors': {}})
+
+        created = {}
+        errors = {}
+        retry_idx = []
+        with ThreadPoolExecutor(max_workers=max(1, min(
+                DEFAULT_BULK_WORKERS, len(chunk_starts)))) as executor:
+            for chunk_results in executor.map(create_chunk, chunk_starts):
+                for idx, issue, error, retry in chunk_results:
+                    if issue is not None:
+                        created[idx] = issue
+                    elif retry:
+                        retry_idx.append(idx)
+                    else:
+                        errors[idx] = error
+
+            # Create the failed elements one by one
+            for idx, (issue, error) in zip(
+                    retry_idx, executor.map(create_one, retry_idx)):
+                if issue is None:
+                    errors[idx] = error
+                else:
+                    created[idx] = issue
+
+        return BulkCreateResponse(
+            issues=[created[idx] for idx in sorted(created)],
+            errors=[errors[idx] for idx in sorted(errors)],
+            headers=chunk_headers[min(chunk_headers)] if chunk_headers
+            else None
+        )
 
     def create_jira_fields_template(self, task_type='Task'):
         """
@@ -208,47 +578,18 @@ class JiraAPI:
                         ]
                     }
         """
-        # fixed syntax for Jira
-        jira_hard_break = {"type": "hardBreak"}
         new_content = []
-
         for key, value, *t in desired_content:
             if t and t[0] == 'link':
-                new_content.append({
-                    'type': 'text',
-                    'text': '{}: '.format(key),
-                    'marks': [{'type': 'strong'}]
-                })
-                new_content.append({
-                    'type': 'text',
-                    'text': t[-1],
-                    'marks': [{
-                        'type': 'link',
-                        'attrs': {
-                            'href': value
-                        }
-                    }]
-                })
+                new_content.extend(adf.link_field(key, value, t[-1]))
             else:
-                new_content.append({
-                    'type': 'text',
-                    'marks': [{'type': 'strong'}],
-                    'text': '{}: '.format(key)
-                })
+                new_content.append(adf.field_title(key))
                 if value:
-                    new_content.append({
-                        'type': 'text',
-                        'text': value
-                    })
-
-            new_content.append(jira_hard_break)
+                    new_content.append(adf.text(value))
+            new_content.append(adf.HARD_BREAK)
 
         # return paragraph content
-        rp = {
-            'type': 'paragraph',
-            'content': new_content
-        }
-        return rp
+        return adf.paragraph(new_content)
 
     def create_table_content(self, desired_table={}):
         """ Used to generate the table from desired_table
@@ -375,72 +716,17 @@ class JiraAPI:
                     ]
                 }
         """
-        table = {
-            'attrs': {},
-            'type': 'table',
-            'content': []
-        }
-
-        table_row = {
-            'type': 'tableRow',
-            'content': []
-        }
-
-        table_header = {
-            'type': 'tableHeader',
-            'attrs': {},
-            'content': []
-        }
-
-        table_cell = {
-            'type': 'tableCell',
-            'attrs': {},
-            'content': [
-                {
-                    'type': 'paragraph',
-                    'content': []
-                }
-            ]
-        }
-
-        t = copy.deepcopy(table)
-        t['attrs'] = desired_table['attrs']
-
-        if 'headers' in desired_table:
-            tr = copy.deepcopy(table_row)
-            for h in desired_table['headers']:
-                p = {
-                    'type': 'paragraph',
-                    'content': [
-                        {
-                            'marks': [{'type': 'strong'}],
-                            'text': '{}'.format(h),
-                            'type': 'text'
-                        }
-                    ]
-                }
-                th = copy.deepcopy(table_header)
-                th['content'].append(p)
-                tr['content'].append(th)
-
-            # append header row to table
-            t['content'].append(tr)
-
-            # handle content rows
-            for each_row in desired_table['row_contents']:
-                tr = copy.deepcopy(table_row)
-                for each_cell in each_row:
-                    cell = copy.deepcopy(table_cell)
-                    # each_cell is not empty
-                    if each_cell:
-                        cell['content'][0]['content'].append({
-                            'type': 'text',
-                            'text': '{}'.format(each_cell)
-                        })
-                    tr['content'].append(cell)
-                t['content'].append(tr)
-
-        return t
+        if 'headers' not in desired_table:
+            return {
+                'type': 'table',
+                'attrs': desired_table['attrs'],
+                'content': []
+            }
+        return adf.table(
+            headers=desired_table['headers'],
+            rows=desired_table['row_contents'],
+            attrs=desired_table['attrs']
+        )
 
     def add_comment_to_issue(self, key_or_id='', comment_data={}):
         """ Add a comment to an issue
@@ -514,6 +800,130 @@ class JiraAPI:
         response = self._request("POST", url=api_endpoint, payload=payload)
         return response
 
+    def _run_bulk(self, func, items, max_workers=DEFAULT_BULK_WORKERS):
+        """ Call func with each item concurrently over the pooled session
+
+            The throttled requests are retried by the session, and an
+            item failed with an exception won't stop the others.
+
+            Return {list}: The result of each item in the order of items,
+                see _bulk_report
+        """
+        def run(item):
+            try:
+                return _bulk_report(item, response=func(*item))
+            except Exception as e:
+                return _bulk_report(item, error=e)
+
+        if not items:
+            return []
+        with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(run, items))
+
+    def link_issues_bulk(
+        self,
+        links=[],
+        issuelinks_type='10003',
+        max_workers=DEFAULT_BULK_WORKERS
+    ):
+        """ Link many pairs of issues concurrently
+
+            Parameters:
+                links {list}: A list of (id_of_inward_issue,
+                    id_of_outward_issue) tuples
+                    e.g. [(73438, 73437), (73439, 73437)]
+                issuelinks_type {str}: the type of link between issues
+                    10003: means "relates to"
+                max_workers {int}: The max number of requests in flight
+
+            Return {list}: The result of each link in the order of links
+                e.g.
+                    [{
+                        'item': (73438, 73437),
+                        'ok': True,
+                        'status_code': 201,
+                        'error': None,
+                        'response': <Response [201]>
+                    }]
+        """
+        def link(id_of_inward_issue, id_of_outward_issue):
+            return self.link_issue(
+                issuelinks_type=issuelinks_type,
+                id_of_inward_issue=id_of_inward_issue,
+                id_of_outward_issue=id_of_outward_issue
+            )
+
+        return self._run_bulk(
+            link, [tuple(pair) for pair in links], max_workers)
+
+    def transition_issues_bulk(
+        self,
+        issue_keys=[],
+        transition_id='',
+        max_workers=DEFAULT_BULK_WORKERS
+    ):
+        """ Make the same transition on many issues concurrently
+
+            Parameters:
+                issue_keys {list}: The keys of Jira issues
+                    e.g. ['TELOPS-1234', 'TELOPS-1235']
+                transition_id {str}: The ID of transition
+                max_workers {int}: The max number of requests in flight
+
+            Return {list}: The result of each issue in the order of
+                issue_keys, the 'item' is (issue_key, transition_id).
+                See link_issues_bulk
+        """
+        return self._run_bulk(
+            self.make_transition,
+            [(key, transition_id) for key in issue_keys],
+            max_workers
+        )
+
+
+def _search_payload(jql, fields, page_size, start_at, next_page_token):
+    """ The payload to get a page of search_issues
+    """
+    payload = {
+        'jql': jql,
+        'fields': fields,
+        'maxResults': page_size
+    }
+    if next_page_token:
+        payload['nextPageToken'] = next_page_token
+    else:
+        payload['startAt'] = start_at
+    return payload
+
+
+def _next_search_page(page, start_at):
+    """ Return the (start_at, next_page_token, is_last) after the page of
+        search_issues
+    """
+    issues = page.get('issues', [])
+    start_at += len(issues)
+    next_page_token = page.get('nextPageToken')
+    if next_page_token:
+        is_last = page.get('isLast', False)
+    else:
+        is_last = not issues or start_at >= page.get('total', 0)
+    return start_at, next_page_token, is_last
+
+
+def _bulk_report(item, response=None, error=None):
+    """ Build the result of an item of the bulk methods
+    """
+    if response is not None:
+        error = None if response.ok else response.text
+    return {
+        'item': item,
+        'ok': response is not None and response.ok,
+        'status_code': None if response is None else response.status_code,
+        'error': None if error is None else str(error),
+        'response': response
+    }
+
 
 def get_jira_members():
     """ Get the members who have the permission to access the Jira Project
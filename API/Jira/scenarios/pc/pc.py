@@ -1,15 +1,24 @@
+import copy
 import json
 import re
 import os
 import traceback
 
 from Jira.apis.base import JiraAPI, get_jira_members, JIRA_DIR_PATH
+from Jira.utils import adf
 from Jira.utils.logging_utils import get_logger
 
 from .templates.transfer_hw_template import TEMPLATE_TEST_RESULT_FIELD
 
 logger = get_logger(__name__)
 
+# The tag of a card is put in the parentheses of its summary
+# e.g. "Vostro 3520 (fossa-marill) RTS" -> "fossa-marill"
+SUMMARY_TAG_PATTERN = re.compile(r'\(([^()]*)\)')
+
+# The content of "Test Results" field of transfer to cert card
+TEST_RESULT_FIELD_DOC = adf.doc(TEMPLATE_TEST_RESULT_FIELD)
+
 
 class Error(Exception):
     """Base class for other exceptions"""
@@ -77,6 +86,9 @@ class QaPcJira():
 
         self.fixed_labels = self.project_profile['labels']['fixed']
 
+        # Index of the cards under the epic, see _load_task_index
+        self.task_index = None
+
     def _load_project_profile(self):
         """ Load the project profile from JSON
         """
@@ -91,6 +103,81 @@ class QaPcJira():
             pf = json.load(f)
             return pf['jira_content']
 
+    def _load_task_index(self):
+        """ Load the story and task cards under the epic into task_index
+
+            The tags in the parentheses of each summary are indexed, so
+            the existing cards are checked without searching Jira for each
+            platform. The newest card wins if a tag is used by many cards.
+
+            e.g.
+                {
+                    'story': {'fossa-marill': {'id': ..., 'key': ...}},
+                    'task': {'fossa-marill': {'id': ..., 'key': ...}}
+                }
+        """
+        task_index = {'story': {}, 'task': {}}
+        story_type = self.jira_api.jira_project['issue_type']['Story']
+        jql = 'project = {} AND parent = {} order by created DESC'.format(
+            self.jira_api.jira_project['key'],
+            self.jira_api.jira_project['epic'][self.epic]
+        )
+        for issue in self.jira_api.search_issues(
+                jql, fields=['summary', 'issuetype']):
+            issue_type = issue['fields']['issuetype']
+            if issue_type.get('subtask'):
+                continue
+            card = {
+                'id': issue['id'],
+                'self': issue['self'],
+                'key': issue['key'],
+                'fields': {'summary': issue['fields']['summary']}
+            }
+            for tag in SUMMARY_TAG_PATTERN.findall(card['fields']['summary']):
+                task_index['task'].setdefault(tag, card)
+                if issue_type['id'] == story_type:
+                    task_index['story'].setdefault(tag, card)
+
+        logger.info('Loaded {} tags of "{}" epic'.format(
+            len(task_index['task']), self.epic))
+        self.task_index = task_index
+
+    def _add_to_task_index(self, issue={}, summary='', task_type='Task'):
+        """ Add the created card to task_index
+
+            Parameters:
+                issue {dict}: The created issue returned by Jira
+                summary {str}: The summary of created issue
+                task_type {str}: 'Story' or 'Task'
+        """
+        if self.task_index is None:
+            return
+        card = {
+            'id': issue['id'],
+            'self': issue['self'],
+            'key': issue['key'],
+            'fields': {'summary': summary}
+        }
+        for tag in SUMMARY_TAG_PATTERN.findall(summary):
+            self.task_index['task'][tag] = card
+            if task_type == 'Story':
+                self.task_index['story'][tag] = card
+
+    def _get_indexed_task(self, tag='', task_type='task'):
+        """ Get the card by tag from task_index
+
+            Return {dict}: The card, or {} if no card has the tag
+        """
+        card = self.task_index[task_type].get(tag)
+        return copy.deepcopy(card) if card else {}
+
+    def _index_found_task(self, tag, card, task_type='task'):
+        """ Add the card found by searching Jira to task_index, so it isn't
+            searched again
+        """
+        if self.task_index is not None:
+            self.task_index[task_type][tag] = copy.deepcopy(card)
+
     # FIXME: Should integrate with _api_get_task_by_tag method
     def _api_get_story_task_by_tag(self, tag=''):
         """ Get the story task by tag
@@ -107,23 +194,27 @@ class QaPcJira():
                         "key": "VS-746",
                         "fields": { "summary": "['Cres'] (fossa-corsola-abc)" }
                     }
+
+            The card is got from task_index if it's loaded. Jira is still
+            searched if the tag isn't in task_index, since the card might
+            be out of the epic.
         """
+        if tag and self.task_index is not None:
+            card = self._get_indexed_task(tag, 'story')
+            if card:
+                return card
         if tag:
-            payload = {
-                'jql': 'project = {} AND summary ~ "\\"{}\\"" AND '
+            jql = 'project = {} AND summary ~ "\\"{}\\"" AND ' \
                 'issuetype = Story order by created DESC'.format(
                     self.jira_api.jira_project['key'], tag
-                ),
-                'fields': ['summary'],
-            }
-            response = self.jira_api.get_issues(payload=payload)
-            candidates = json.loads(response.text)
-            for c in candidates['issues']:
+                )
+            for c in self.jira_api.search_issues(jql, fields=['summary']):
                 if '({})'.format(tag) in c['fields']['summary']:
                     try:
                         del c['expand']
                     except Exception:
                         pass
+                    self._index_found_task(tag, c, 'story')
                     return c
         return {}
 
@@ -142,23 +233,27 @@ class QaPcJira():
                         "key": "VS-746",
                         "fields": { "summary": "['Cres'] (fossa-corsola-abc)" }
                     }
+
+            The card is got from task_index if it's loaded. Jira is still
+            searched if the tag isn't in task_index, since the card might
+            be out of the epic.
         """
+        if tag and self.task_index is not None:
+            card = self._get_indexed_task(tag, 'task')
+            if card:
+                return card
         if tag:
-            payload = {
-                'jql': 'project = {} AND summary ~ "{}" AND '
+            jql = 'project = {} AND summary ~ "{}" AND ' \
                 'type in standardIssueTypes() order by created DESC'.format(
                     self.jira_api.jira_project['key'], tag
-                ),
-                'fields': ['summary'],
-            }
-            response = self.jira_api.get_issues(payload=payload)
-            candidates = json.loads(response.text)
-            for c in candidates['issues']:
+                )
+            for c in self.jira_api.search_issues(jql, fields=['summary']):
                 if '({})'.format(tag) in c['fields']['summary']:
                     try:
                         del c['expand']
                     except Exception:
                         pass
+                    self._index_found_task(tag, c, 'task')
                     return c
         return {}
 
@@ -428,6 +523,7 @@ class QaPcJira():
             logger.warn('  - Story task ... Fail')
             return {}
         story_task = json.loads(response.text)
+        self._add_to_task_index(story_task, fields['summary'], 'Story')
 
         return story_task
 
@@ -439,6 +535,8 @@ class QaPcJira():
         """
         rts_milestone = self.project_profile['milestones']['rts']
         issue_updates = []  # Put tasks in this list
+        # All milestone tasks have the same description
+        rts_description = self._generate_rts_description()
 
         for idx in range(len(rts_milestone)):
             # Template of "fields" payload in Jira's request
@@ -461,8 +559,7 @@ class QaPcJira():
                 }
 
             # Assign the description content
-            fields['description']['content'].append(
-                self._generate_rts_description())
+            fields['description']['content'].append(rts_description)
 
             # Assign lable to rts task
             fields['labels'] = self.fixed_labels.copy()
@@ -485,12 +582,15 @@ class QaPcJira():
             return {}
 
         milestone_tasks = json.loads(response.text)['issues']
+        for task, issue_update in zip(milestone_tasks, issue_updates):
+            self._add_to_task_index(task, issue_update['fields']['summary'])
         issue_ids = [int(task['id']) for task in milestone_tasks]
-        for issue_id in issue_ids:
-            self.jira_api.link_issue(
-                id_of_inward_issue=issue_id,
-                id_of_outward_issue=story_task['id']
-            )
+        link_results = self.jira_api.link_issues_bulk(
+            links=[(issue_id, story_task['id']) for issue_id in issue_ids])
+        for result in link_results:
+            if not result['ok']:
+                logger.warn('  Failed to link task {} to story: {}'.format(
+                    result['item'][0], result['error']))
 
         return milestone_tasks
 
@@ -537,6 +637,7 @@ class QaPcJira():
             return
 
         issue_id = json.loads(response.text)['id']
+        self._add_to_task_index(json.loads(response.text), fields['summary'])
         self.jira_api.link_issue(
             id_of_inward_issue=issue_id,
             id_of_outward_issue=story_task['id']
@@ -587,6 +688,7 @@ class QaPcJira():
             return
 
         issue_id = json.loads(response.text)['id']
+        self._add_to_task_index(json.loads(response.text), fields['summary'])
         self.jira_api.link_issue(
             id_of_inward_issue=issue_id,
             id_of_outward_issue=story_task['id']
@@ -618,11 +720,8 @@ class QaPcJira():
             self._generate_transfer_cert_description())
 
         # Add the content into the Test Result field
-        fields[self.jira_api.jira_project['card_fields']['Test Results']] = {
-            "version": 1,
-            "type": "doc",
-            "content": TEMPLATE_TEST_RESULT_FIELD
-        }
+        fields[self.jira_api.jira_project['card_fields']['Test Results']] = \
+            TEST_RESULT_FIELD_DOC
 
         # Assign Epic
         fields['parent'] = {
@@ -637,6 +736,7 @@ class QaPcJira():
             return
 
         issue_id = json.loads(response.text)['id']
+        self._add_to_task_index(json.loads(response.text), fields['summary'])
         self.jira_api.link_issue(
             id_of_inward_issue=issue_id,
             id_of_outward_issue=story_task['id']
@@ -783,6 +883,14 @@ class QaPcJira():
                     traceback.print_exception(type(e), e, e.__traceback__))
 
     def create_card(self):
+        # Check the existing cards by the index instead of searching Jira
+        # for each platform, or search Jira if the index is failed to load
+        try:
+            self._load_task_index()
+        except Exception as e:
+            logger.warn('Failed to load the task index since {}'.format(e))
+            self.task_index = None
+
         fn = {
             'rts': self._rts_handler,
             'prts': self._prts_handler,
@@ -949,24 +1057,27 @@ class StellaJira(QaPcJira):
                         "key": "VS-746",
                         "fields": { "summary": "['Cres'] (fossa-corsola-abc)" }
                     }
+
+            The card is got from task_index if it's loaded, otherwise
+            search Jira since the platform_tag might be in the description
         """
+        if lp_tag and self.task_index is not None:
+            story_task = self._get_indexed_task(lp_tag, 'story')
+            if story_task:
+                return story_task
         if lp_tag and platform_tag:
-            payload = {
-                'jql': 'project = {} AND summary ~ "{}" OR '
-                'description ~ "{}" AND issuetype = Story '
+            jql = 'project = {} AND summary ~ "{}" OR ' \
+                'description ~ "{}" AND issuetype = Story ' \
                 'order by created DESC'.format(
                     self.jira_api.jira_project['key'], lp_tag, platform_tag
-                ),
-                'fields': ['summary'],
-            }
-            response = self.jira_api.get_issues(payload=payload)
-            candidates = json.loads(response.text)
-            for c in candidates['issues']:
+                )
+            for c in self.jira_api.search_issues(jql, fields=['summary']):
                 if '({})'.format(lp_tag) in c['fields']['summary']:
                     try:
                         del c['expand']
                     except Exception:
                         pass
+                    self._index_found_task(lp_tag, c, 'story')
                     return c
         return {}
 
@@ -0,0 +1,36 @@
+""" Measure calls/sec of JiraAPI against a local mock Jira server
+
+    Compare the pooled keep-alive session with a fresh connection per
+    call, which is how JiraAPI worked before it had a session.
+
+    $ python -m tests.dev_bench_session
+"""
+import time
+
+import requests
+
+from Jira.apis.base import JiraAPI, create_session
+from Jira.tests.mock_server import MockJiraServer
+
+CALLS = 300
+
+
+class _NoPoolSession:
+    """ Open a new connection for every request like requests.request
+    """
+    def request(self, *args, **kwargs):
+        return requests.request(*args, **kwargs)
+
+
+def bench(jira_api, calls=CALLS):
+    start = time.perf_counter()
+    for _ in range(calls):
+        jira_api.get_issues(payload={'jql': 'project = VS'})
+    return calls / (time.perf_counter() - start)
+
+
+with MockJiraServer(lambda m, p, b: (200, {}, {'issues': []})) as server:
+    pooled = JiraAPI(base_url=server.base_url, session=create_session())
+    no_pool = JiraAPI(base_url=server.base_url, session=_NoPoolSession())
+    print('Pooled session: {:8.1f} calls/sec'.format(bench(pooled)))
+    print('No pool:        {:8.1f} calls/sec'.format(bench(no_pool)))
@@ -0,0 +1,6 @@
+from Common.tests.mock_server import MockHTTPServer
+
+
+class MockJiraServer(MockHTTPServer):
+    """ A local HTTP server which stands in for Jira, see MockHTTPServer
+    """
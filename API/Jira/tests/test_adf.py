@@ -0,0 +1,41 @@
+import json
+import unittest
+
+from Jira.utils import adf
+
+
+class ADFTest(unittest.TestCase):
+    def test_table(self):
+        """ Empty values should be empty cells
+        """
+        table = adf.table(['CID'], [('202303-12345',), ('',)])
+
+        self.assertEqual(3, len(table['content']))
+        self.assertEqual(
+            adf.text('CID', adf.STRONG_MARKS),
+            table['content'][0]['content'][0]['content'][0]['content'][0])
+        self.assertEqual(
+            [adf.text('202303-12345')],
+            table['content'][1]['content'][0]['content'][0]['content'])
+        self.assertEqual(
+            [], table['content'][2]['content'][0]['content'][0]['content'])
+
+    def test_memoized_fragments(self):
+        """ The same fragment should be built once
+        """
+        self.assertIs(adf.field_title('PM'), adf.field_title('PM'))
+        self.assertIs(
+            adf.link_field('Bug List', 'https://bugs', 'Bug List'),
+            adf.link_field('Bug List', 'https://bugs', 'Bug List'))
+
+    def test_dumps(self):
+        """ Should be compact and loaded back as the same node
+        """
+        node = adf.doc([adf.paragraph([adf.text('a'), adf.HARD_BREAK])])
+
+        self.assertNotIn(' ', adf.dumps(node))
+        self.assertEqual(node, json.loads(adf.dumps(node)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from Jira.apis.async_api import AsyncJiraAPI
+from Jira.apis.base import create_session
+from Jira.tests.mock_server import MockJiraServer
+
+DELAY = 0.2
+
+
+class SlowResponder:
+    """ Respond after DELAY seconds and record the max requests in flight
+    """
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, path, body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(DELAY)
+        with self._lock:
+            self.in_flight -= 1
+        return 204, {}, b''
+
+
+class AsyncJiraAPITest(unittest.TestCase):
+    def _gather_transitions(self, server, keys, concurrency):
+        async def transit():
+            async with AsyncJiraAPI(
+                base_url=server.base_url,
+                session=create_session(),
+                concurrency=concurrency
+            ) as jira_api:
+                return await asyncio.gather(*[
+                    jira_api.make_transition(key, '21') for key in keys
+                ])
+
+        return asyncio.run(transit())
+
+    def test_gather_transitions(self):
+        """ Transitions should be sent concurrently
+        """
+        keys = ['VS-{}'.format(i) for i in range(8)]
+        responder = SlowResponder()
+        with MockJiraServer(responder) as server:
+            start = time.perf_counter()
+            responses = self._gather_transitions(server, keys, 8)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual([204] * 8, [r.status_code for r in responses])
+        self.assertLess(elapsed, DELAY * len(keys) / 2)
+        self.assertEqual(
+            sorted('/rest/api/3/issue/{}/transitions'.format(k) for k in keys),
+            sorted(path for _, path, _ in server.received)
+        )
+
+    def test_bounded_concurrency(self):
+        """ The requests in flight should not exceed the concurrency
+        """
+        responder = SlowResponder()
+        with MockJiraServer(responder) as server:
+            self._gather_transitions(
+                server, ['VS-{}'.format(i) for i in range(6)], 2)
+
+        self.assertEqual(2, responder.max_in_flight)
+
+    def test_bulk_max_workers(self):
+        """ The requests in flight of a bulk call should not exceed its
+            max_workers
+        """
+        async def transit():
+            async with AsyncJiraAPI(
+                base_url=server.base_url,
+                session=create_session(),
+                concurrency=8
+            ) as jira_api:
+                return await jira_api.transition_issues_bulk(
+                    issue_keys=['VS-{}'.format(i) for i in range(6)],
+                    transition_id='21',
+                    max_workers=2
+                )
+
+        responder = SlowResponder()
+        with MockJiraServer(responder) as server:
+            reports = asyncio.run(transit())
+
+        self.assertTrue(all(r['ok'] for r in reports))
+        self.assertEqual(2, responder.max_in_flight)
+
+    def test_link_issue_payload(self):
+        """ Should send the same payload as JiraAPI.link_issue
+        """
+        async def link():
+            async with AsyncJiraAPI(base_url=server.base_url) as jira_api:
+                return await jira_api.link_issue(
+                    id_of_inward_issue='1', id_of_outward_issue='2')
+
+        with MockJiraServer(lambda m, p, b: (201, {}, b'')) as server:
+            response = asyncio.run(link())
+
+        self.assertEqual(201, response.status_code)
+        method, path, body = server.received[0]
+        self.assertEqual(('POST', '/rest/api/3/issueLink'), (method, path))
+        self.assertEqual({'id': '1'}, body['inwardIssue'])
+        self.assertEqual({'id': '2'}, body['outwardIssue'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import unittest
+
+from Jira.apis.async_api import AsyncJiraAPI
+from Jira.apis.base import JiraAPI, create_session
+from Jira.tests.mock_server import MockJiraServer
+
+
+def responder(method, path, body):
+    """ Fail the transition of VS-2, accept the others
+    """
+    if path.endswith('/issue/VS-2/transitions'):
+        return 400, {}, {'errorMessages': ['Invalid transition']}
+    return 204, {}, b''
+
+
+class BulkAPITest(unittest.TestCase):
+    def _jira_api(self, server):
+        return JiraAPI(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0)
+        )
+
+    def test_transition_issues_bulk(self):
+        """ Should report the result of each issue in order
+        """
+        keys = ['VS-1', 'VS-2', 'VS-3']
+        with MockJiraServer(responder) as server:
+            results = self._jira_api(server).transition_issues_bulk(
+                issue_keys=keys, transition_id='21')
+
+        self.assertEqual(
+            [('VS-1', '21'), ('VS-2', '21'), ('VS-3', '21')],
+            [r['item'] for r in results])
+        self.assertEqual([True, False, True], [r['ok'] for r in results])
+        self.assertEqual(400, results[1]['status_code'])
+        self.assertIn('Invalid transition', results[1]['error'])
+        self.assertEqual(3, len(server.received))
+
+    def test_link_issues_bulk(self):
+        """ Should send a link request for each pair
+        """
+        with MockJiraServer(responder) as server:
+            results = self._jira_api(server).link_issues_bulk(
+                links=[(1, 10), (2, 10)])
+
+        self.assertTrue(all(r['ok'] for r in results))
+        inward_ids = [body['inwardIssue']['id'] for _, _, body in
+                      server.received]
+        self.assertEqual([1, 2], sorted(inward_ids))
+
+    def test_connection_error(self):
+        """ An item failed with an exception should be reported
+        """
+        with MockJiraServer(responder) as server:
+            jira_api = self._jira_api(server)
+        # The server is closed
+        results = jira_api.transition_issues_bulk(
+            issue_keys=['VS-1'], transition_id='21')
+
+        self.assertFalse(results[0]['ok'])
+        self.assertIsNone(results[0]['status_code'])
+        self.assertTrue(results[0]['error'])
+
+    def test_async_transition_issues_bulk(self):
+        """ AsyncJiraAPI should return the same report
+        """
+        async def transit(server):
+            async with AsyncJiraAPI(base_url=server.base_url) as jira_api:
+                return await jira_api.transition_issues_bulk(
+                    issue_keys=['VS-1', 'VS-2'], transition_id='21')
+
+        with MockJiraServer(responder) as server:
+            results = asyncio.run(transit(server))
+
+        self.assertEqual([True, False], [r['ok'] for r in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
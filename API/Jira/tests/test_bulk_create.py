@@ -0,0 +1,165 @@
+import asyncio
+import json
+import unittest
+
+import requests
+
+from Jira.apis.async_api import AsyncJiraAPI
+from Jira.apis.base import (
+    BULK_CREATE_MAX_ISSUES,
+    BulkCreateResponse,
+    JiraAPI,
+    create_session,
+)
+from Jira.tests.mock_server import MockJiraServer
+
+
+class FakeBulkCreate:
+    """ Create the issues like Jira, the summaries in invalid can't be
+        created, and the summaries in flaky fail only in the bulk request
+    """
+    def __init__(self, invalid=(), flaky=()):
+        self.invalid = invalid
+        self.flaky = flaky
+        self.next_id = iter(range(1, 1000))
+
+    def issue(self):
+        issue_id = next(self.next_id)
+        return {'id': str(issue_id), 'key': 'VS-{}'.format(issue_id)}
+
+    def __call__(self, method, path, body):
+        if path.endswith('/issue/bulk'):
+            issues, errors = [], []
+            for idx, update in enumerate(body['issueUpdates']):
+                summary = update['fields']['summary']
+                if summary in self.invalid or summary in self.flaky:
+                    errors.append({
+                        'status': 400,
+                        'elementErrors': {'errors': {'summary': 'invalid'}},
+                        'failedElementNumber': idx
+                    })
+                else:
+                    issues.append(self.issue())
+            return (400 if errors else 201), {}, {
+                'issues': issues, 'errors': errors}
+        if path.endswith('/issue'):
+            if body['fields']['summary'] in self.invalid:
+                return 400, {}, {'errors': {'summary': 'invalid'}}
+            return 201, {}, self.issue()
+        return 404, {}, {}
+
+
+def issue_updates(count):
+    return [
+        {'fields': {'summary': 'S{}'.format(i)}, 'update': {}}
+        for i in range(count)
+    ]
+
+
+class BulkCreateTest(unittest.TestCase):
+    def _create(self, server, count):
+        jira_api = JiraAPI(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0)
+        )
+        return jira_api.create_issues(
+            payload={'issueUpdates': issue_updates(count)})
+
+    def test_split_into_chunks(self):
+        """ Should not send more than BULK_CREATE_MAX_ISSUES in a request
+        """
+        count = BULK_CREATE_MAX_ISSUES * 2 + 1
+        with MockJiraServer(FakeBulkCreate()) as server:
+            response = self._create(server, count)
+
+        self.assertTrue(response.ok)
+        self.assertEqual(201, response.status_code)
+        self.assertEqual(count, len(response.json()['issues']))
+        self.assertEqual(
+            [BULK_CREATE_MAX_ISSUES, BULK_CREATE_MAX_ISSUES, 1],
+            sorted((len(body['issueUpdates']) for _, _, body in
+                    server.received), reverse=True))
+
+    def test_retry_failed_elements(self):
+        """ Should create the failed elements one by one, and report the
+            index in the whole request of the ones failed again
+        """
+        responder = FakeBulkCreate(invalid=('S52',), flaky=('S1', 'S60'))
+        with MockJiraServer(responder) as server:
+            response = self._create(server, 61)
+
+        self.assertFalse(response.ok)
+        self.assertEqual(400, response.status_code)
+        self.assertEqual(60, len(response.issues))
+        self.assertEqual(
+            [52], [e['failedElementNumber'] for e in response.errors])
+        self.assertEqual(
+            ['S1', 'S52', 'S60'],
+            sorted(body['fields']['summary'] for _, path, body in
+                   server.received if path.endswith('/issue')))
+
+    def test_async_retry_failed_elements(self):
+        """ Should create the failed elements one by one by AsyncJiraAPI
+        """
+        async def create():
+            async with AsyncJiraAPI(
+                base_url=server.base_url,
+                session=create_session(backoff_factor=0)
+            ) as jira_api:
+                return await jira_api.create_issues(
+                    payload={'issueUpdates': issue_updates(3)})
+
+        with MockJiraServer(FakeBulkCreate(flaky=('S1',))) as server:
+            response = asyncio.run(create())
+
+        self.assertTrue(response.ok)
+        self.assertEqual(3, len(response.issues))
+        self.assertEqual(
+            ['S1'],
+            [body['fields']['summary'] for _, path, body in
+             server.received if path.endswith('/issue')])
+
+    def test_chunk_rejected(self):
+        """ Should not send the issues of a chunk failed as a whole again
+        """
+        def responder(method, path, body):
+            return 500, {}, {'errorMessages': ['Internal server error']}
+
+        with MockJiraServer(responder) as server:
+            response = self._create(server, 3)
+
+        self.assertFalse(response.ok)
+        self.assertEqual(
+            [0, 1, 2], [e['failedElementNumber'] for e in response.errors])
+        self.assertEqual(1, len(server.received))
+
+    def test_response_compatibility(self):
+        """ Should be usable like the requests.Response of /issue/bulk
+        """
+        def responder(method, path, body):
+            status, _, result = FakeBulkCreate(invalid=('S1',))(
+                method, path, body)
+            return status, {'X-Request-Id': 'abc'}, result
+
+        with MockJiraServer(responder) as server:
+            response = self._create(server, 2)
+
+        self.assertEqual(400, response.status_code)
+        self.assertEqual('abc', response.headers['x-request-id'])
+        self.assertEqual(response.json(), json.loads(response.content))
+        with self.assertRaises(requests.HTTPError) as ctx:
+            response.raise_for_status()
+        self.assertIs(response, ctx.exception.response)
+
+    def test_no_shared_defaults(self):
+        """ The responses should not share the default lists
+        """
+        first, second = BulkCreateResponse(), BulkCreateResponse()
+        first.issues.append({'key': 'VS-1'})
+
+        self.assertEqual([], second.issues)
+        BulkCreateResponse(issues=[{'key': 'VS-2'}]).raise_for_status()
+
+
+if __name__ == '__main__':
+    unittest.main()
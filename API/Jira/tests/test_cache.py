@@ -0,0 +1,85 @@
+import tempfile
+import time
+import unittest
+
+from Jira.apis.base import JiraAPI, create_session
+from Jira.tests.mock_server import MockJiraServer
+from Jira.utils.cache import ResponseCache
+
+
+def responder(method, path, body):
+    if path.endswith('/search'):
+        return 200, {}, {'issues': [{'key': 'CQT-1'}]}
+    return 204, {}, b''
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def _jira_api(self, server, cache):
+        return JiraAPI(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0),
+            cache=cache
+        )
+
+    def _get_card(self, jira_api, key='CQT-1'):
+        return jira_api.get_issues(
+            payload={'jql': 'issuekey = "{}"'.format(key)})
+
+    def test_hit(self):
+        """ The same search should be sent once
+        """
+        with MockJiraServer(responder) as server:
+            jira_api = self._jira_api(server, ResponseCache())
+            first = self._get_card(jira_api)
+            second = self._get_card(jira_api)
+
+        self.assertEqual(1, len(server.received))
+        self.assertEqual(first.json(), second.json())
+
+    def test_invalidate_by_write(self):
+        """ A write to the issue should drop its cached responses only
+        """
+        with MockJiraServer(responder) as server:
+            jira_api = self._jira_api(server, ResponseCache())
+            self._get_card(jira_api, 'CQT-1')
+            self._get_card(jira_api, 'CQT-2')
+            jira_api.make_transition('CQT-1', '21')
+            self._get_card(jira_api, 'CQT-1')
+            self._get_card(jira_api, 'CQT-2')
+
+        self.assertEqual(4, len(server.received))
+        self.assertEqual('issuekey = "CQT-1"', server.received[-1][2]['jql'])
+
+    def test_revalidate_by_etag(self):
+        """ An expired response with ETag should be revalidated
+        """
+        def etag_responder(method, path, body):
+            if len(server.received) > 1:
+                return 304, {'ETag': '"v1"'}, b''
+            return 200, {'ETag': '"v1"'}, {'issues': []}
+
+        with MockJiraServer(etag_responder) as server:
+            jira_api = self._jira_api(server, ResponseCache(ttl=0.1))
+            self._get_card(jira_api)
+            time.sleep(0.2)
+            response = self._get_card(jira_api)
+
+        self.assertEqual(2, len(server.received))
+        self.assertEqual('"v1"', server.received_headers[1]['If-None-Match'])
+        self.assertEqual(200, response.status_code)
+        self.assertEqual({'issues': []}, response.json())
+
+    def test_disk_store(self):
+        """ The responses stored on disk should be reused by a new cache
+        """
+        with tempfile.TemporaryDirectory() as path:
+            with MockJiraServer(responder) as server:
+                for _ in range(2):
+                    cache = ResponseCache(path=path)
+                    self._get_card(self._jira_api(server, cache))
+
+        self.assertEqual(1, len(server.received))
+
+
+if __name__ == '__main__':
+    unittest.main()
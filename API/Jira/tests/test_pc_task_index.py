@@ -0,0 +1,125 @@
+import json
+import unittest
+from unittest.mock import patch
+
+from Jira.apis.base import JiraAPI, create_session
+from Jira.scenarios.pc.pc import SomervilleJira
+from Jira.tests.mock_server import MockJiraServer
+
+MEMBERS = {'<Your launchpad ID>': {'jira_uid': 'reporter-uid'}}
+STORY = {'id': '10634', 'subtask': False}
+TASK = {'id': '10635', 'subtask': False}
+
+
+def issue(key, summary, issue_type):
+    return {
+        'id': key.split('-')[1],
+        'self': 'https://jira/rest/api/3/issue/{}'.format(key),
+        'key': key,
+        'fields': {'summary': summary, 'issuetype': issue_type}
+    }
+
+
+EPIC_ISSUES = [
+    issue('VS-3', '[PRTS] GG 16 (prts_jellycat-bbq_2023-01-20) test', TASK),
+    issue('VS-2', 'GG 16 (jellycat-bbq) IEV Full', TASK),
+    issue('VS-1', 'GG 16 (jellycat-bbq)', STORY),
+]
+# The cards which have the tag but are out of the epic
+OUTSIDE_ISSUES = [
+    issue('VS-9', 'GG 14 (fossa-outside)', STORY),
+]
+
+
+class TaskIndexTest(unittest.TestCase):
+    def setUp(self):
+        with patch('Jira.scenarios.pc.pc.get_jira_members',
+                   return_value=MEMBERS):
+            self.somerville = SomervilleJira({'prts': []})
+        self.created = iter(range(100, 200))
+
+    def responder(self, method, path, body):
+        if path.endswith('/search'):
+            issues = EPIC_ISSUES if 'parent =' in body['jql'] \
+                else OUTSIDE_ISSUES
+            return 200, {}, {
+                'startAt': body['startAt'],
+                'total': len(issues),
+                'issues': issues[body['startAt']:]
+            }
+        if path.endswith('/issue'):
+            key = 'VS-{}'.format(next(self.created))
+            return 201, {}, {'id': key[3:], 'key': key, 'self': key}
+        return 201, {}, b''
+
+    def _load(self, server):
+        self.somerville.jira_api = JiraAPI(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0)
+        )
+        self.somerville._load_task_index()
+
+    def test_lookup_without_search(self):
+        """ Existing cards should be found by the index only, and a tag
+            missing from the index is searched once
+        """
+        with MockJiraServer(self.responder) as server:
+            self._load(server)
+            search_count = len(server.received)
+            self.somerville.current_stage = 'prts'
+            self.somerville.current_platform = {
+                'platform_tag': 'jellycat-bbq', 'request_date': '2023-01-20'}
+
+            story = self.somerville._get_story_task_by_tag()
+            prts = self.somerville._get_general_task_by_tag()
+            indexed_count = len(server.received)
+            missing = self.somerville._api_get_task_by_tag('fossa-none')
+
+        self.assertEqual(search_count, indexed_count)
+        self.assertEqual(search_count + 1, len(server.received))
+        self.assertEqual('VS-1', story['key'])
+        self.assertEqual('VS-3', prts['key'])
+        self.assertEqual({}, missing)
+        self.assertIn(
+            'parent = 69110', json.dumps(server.received[0][2]['jql']))
+
+    def test_card_out_of_epic(self):
+        """ The card out of the epic should be found by searching Jira
+            instead of being created again
+        """
+        with MockJiraServer(self.responder) as server:
+            self._load(server)
+            story = self.somerville._api_get_story_task_by_tag(
+                'fossa-outside')
+            search_count = len(server.received)
+            again = self.somerville._api_get_story_task_by_tag(
+                'fossa-outside')
+
+        self.assertEqual('VS-9', story['key'])
+        self.assertEqual('VS-9', again['key'])
+        self.assertIn('summary ~', server.received[-1][2]['jql'])
+        self.assertEqual(search_count, len(server.received))
+        self.assertFalse(
+            any(path.endswith('/issue') for _, path, _ in server.received))
+
+    def test_created_card_is_indexed(self):
+        """ The card created during the run should be found by the index
+        """
+        with MockJiraServer(self.responder) as server:
+            self._load(server)
+            self.somerville.current_stage = 'rts'
+            self.somerville.current_platform = {
+                'platform_name': ['New 14'],
+                'product_name': ['N14'],
+                'platform_tag': 'fossa-new',
+                'pm': '', 'fe': '', 'swe': '',
+            }
+            self.assertEqual({}, self.somerville._get_story_task_by_tag())
+            story = self.somerville._create_story_task()
+
+        self.assertEqual(
+            story['key'], self.somerville._get_story_task_by_tag()['key'])
+
+
+if __name__ == '__main__':
+    unittest.main()
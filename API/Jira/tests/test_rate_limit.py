@@ -0,0 +1,40 @@
+import unittest
+
+from Common.rate_limit import RateLimiter, get_rate_limiter
+from Jira.apis.base import JiraAPI, create_session
+from Jira.tests.mock_server import MockJiraServer
+
+
+class SessionRateLimitTest(unittest.TestCase):
+    def test_shared_rate_limiter(self):
+        """ The session should use the RateLimiter shared with C3 and
+            GoogleSheet by default
+        """
+        adapter = create_session().get_adapter('https://')
+        self.assertIs(get_rate_limiter(), adapter.rate_limiter)
+
+    def test_session_counters(self):
+        """ The session should count the throttled and retried requests
+        """
+        statuses = [429, 200]
+
+        def responder(method, path, body):
+            return statuses.pop(0), {'Retry-After': '0'}, {'issues': []}
+
+        rate_limiter = RateLimiter({})
+        with MockJiraServer(responder) as server:
+            jira_api = JiraAPI(
+                base_url=server.base_url,
+                session=create_session(
+                    backoff_factor=0, rate_limiter=rate_limiter)
+            )
+            jira_api.get_issues(payload={'jql': 'project = VS'})
+
+        stats = rate_limiter.stats()['127.0.0.1']
+        self.assertEqual(
+            {'requests': 1, 'queued': 0, 'throttled': 1, 'retried': 1},
+            stats)
+
+
+if __name__ == '__main__':
+    unittest.main()
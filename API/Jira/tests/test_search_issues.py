@@ -0,0 +1,154 @@
+import asyncio
+import time
+import unittest
+
+from Jira.apis.async_api import AsyncJiraAPI
+from Jira.apis.base import JiraAPI, create_session
+from Jira.tests.mock_server import MockJiraServer
+
+ISSUES = [
+    {'id': str(i), 'key': 'VS-{}'.format(i), 'fields': {'summary': str(i)}}
+    for i in range(7)
+]
+
+
+def start_at_responder(method, path, body):
+    """ Page the issues by startAt like /rest/api/3/search
+    """
+    start, size = body['startAt'], body['maxResults']
+    return 200, {}, {
+        'startAt': start,
+        'maxResults': size,
+        'total': len(ISSUES),
+        'issues': ISSUES[start:start + size]
+    }
+
+
+def next_page_token_responder(method, path, body):
+    """ Page the issues by nextPageToken like /rest/api/3/search/jql
+    """
+    start, size = int(body.get('nextPageToken', 0)), body['maxResults']
+    page = {'issues': ISSUES[start:start + size]}
+    if start + size < len(ISSUES):
+        page['nextPageToken'] = str(start + size)
+        page['isLast'] = False
+    else:
+        page['isLast'] = True
+    return 200, {}, page
+
+
+class SearchIssuesTest(unittest.TestCase):
+    def _search(self, server, **kwargs):
+        jira_api = JiraAPI(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0)
+        )
+        return jira_api.search_issues('project = VS', **kwargs)
+
+    def test_page_by_start_at(self):
+        """ Should yield the issues of all pages
+        """
+        for prefetch in (True, False):
+            with MockJiraServer(start_at_responder) as server:
+                issues = list(
+                    self._search(server, page_size=3, prefetch=prefetch))
+
+            self.assertEqual(ISSUES, issues)
+            self.assertEqual(
+                [0, 3, 6], [body['startAt'] for _, _, body in server.received])
+
+    def test_page_by_next_page_token(self):
+        """ Should follow nextPageToken until the last page
+        """
+        with MockJiraServer(next_page_token_responder) as server:
+            issues = list(self._search(server, page_size=3))
+
+        self.assertEqual(ISSUES, issues)
+        self.assertEqual(
+            [None, '3', '6'],
+            [body.get('nextPageToken') for _, _, body in server.received])
+
+    def test_fields_projection(self):
+        """ Should request only the given fields
+        """
+        with MockJiraServer(start_at_responder) as server:
+            list(self._search(server, fields=['summary', 'status']))
+
+        self.assertEqual(
+            ['summary', 'status'], server.received[0][2]['fields'])
+
+    def test_stop_early(self):
+        """ Should not request the pages after the prefetched one
+        """
+        with MockJiraServer(start_at_responder) as server:
+            for issue in self._search(server, page_size=2):
+                break
+            issue_count = len(server.received)
+
+        self.assertLessEqual(issue_count, 2)
+
+    def test_raise_on_error(self):
+        """ Should raise instead of returning partial results
+        """
+        def responder(method, path, body):
+            if body['startAt']:
+                return 400, {}, {'errorMessages': ['bad request']}
+            return start_at_responder(method, path, body)
+
+        with MockJiraServer(responder) as server:
+            with self.assertRaises(Exception):
+                list(self._search(server, page_size=3))
+
+    def _async_search(self, server, ticks=None, **kwargs):
+        async def tick():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def search():
+            ticker = asyncio.ensure_future(tick()) if ticks is not None \
+                else None
+            async with AsyncJiraAPI(
+                base_url=server.base_url,
+                session=create_session(backoff_factor=0)
+            ) as jira_api:
+                issues = [
+                    issue async for issue in
+                    jira_api.search_issues('project = VS', **kwargs)
+                ]
+            if ticker:
+                ticker.cancel()
+            return issues
+
+        return asyncio.run(search())
+
+    def test_async_api(self):
+        """ Should page the issues by the async generator of AsyncJiraAPI
+        """
+        for prefetch in (True, False):
+            with MockJiraServer(start_at_responder) as server:
+                issues = self._async_search(
+                    server, page_size=3, prefetch=prefetch)
+
+            self.assertEqual(ISSUES, issues)
+            self.assertEqual(
+                [0, 3, 6], [body['startAt'] for _, _, body in server.received])
+
+    def test_async_api_not_block(self):
+        """ The event loop should keep running while the pages are requested
+        """
+        def responder(method, path, body):
+            time.sleep(0.2)
+            return start_at_responder(method, path, body)
+
+        ticks = []
+        with MockJiraServer(responder) as server:
+            issues = self._async_search(server, ticks=ticks, page_size=3)
+
+        self.assertEqual(ISSUES, issues)
+        # The ticker runs about every 10ms during the 3 slow pages
+        self.assertGreater(len(ticks), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from Jira.apis.base import JiraAPI, create_session
+from Jira.tests.mock_server import MockJiraServer
+
+
+class JiraSessionTest(unittest.TestCase):
+    def _jira_api(self, server):
+        return JiraAPI(
+            base_url=server.base_url,
+            session=create_session(backoff_factor=0),
+            timeout=5
+        )
+
+    def test_retry_after_throttled(self):
+        """ Should resend the request after 429 and return the final response
+        """
+        statuses = [429, 429, 200]
+
+        def responder(method, path, body):
+            return statuses.pop(0), {'Retry-After': '0'}, {'issues': []}
+
+        with MockJiraServer(responder) as server:
+            response = self._jira_api(server).get_issues(
+                payload={'jql': 'project = VS'})
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(3, len(server.received))
+
+    def test_no_retry_post_on_server_error(self):
+        """ Should not resend a POST request which might be processed
+        """
+        def responder(method, path, body):
+            return 500, {}, {'errorMessages': ['oops']}
+
+        with MockJiraServer(responder) as server:
+            response = self._jira_api(server).create_an_issue(
+                payload={'fields': {}})
+
+        self.assertEqual(500, response.status_code)
+        self.assertEqual(1, len(server.received))
+
+    def test_retry_get_on_server_error(self):
+        """ Should resend the idempotent request on 5xx
+        """
+        statuses = [502, 200]
+
+        def responder(method, path, body):
+            return statuses.pop(0), {}, {}
+
+        with MockJiraServer(responder) as server:
+            jira_api = self._jira_api(server)
+            response = jira_api._request(
+                'GET', url='{}/rest/api/3/myself'.format(server.base_url))
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(2, len(server.received))
+
+    def test_shared_session(self):
+        """ JiraAPI instances should share the same session by default
+        """
+        self.assertIs(JiraAPI().session, JiraAPI().session)
+
+
+if __name__ == '__main__':
+    unittest.main()
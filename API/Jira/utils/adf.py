@@ -0,0 +1,98 @@
+""" Builder of Atlassian Document Format (ADF)
+
+    The nodes are built by plain dict literals instead of copying the
+    templates. The constant nodes, e.g. STRONG and HARD_BREAK, and the
+    memoized fragments are shared between documents, don't modify them.
+
+    ref: https://developer.atlassian.com/cloud/jira/platform/apis/document/
+"""
+import functools
+import json
+
+STRONG = {'type': 'strong'}
+STRONG_MARKS = [STRONG]
+HARD_BREAK = {'type': 'hardBreak'}
+
+
+def text(value, marks=None):
+    """ A text node, e.g. text('Model Name: ', STRONG_MARKS)
+    """
+    if marks:
+        return {'type': 'text', 'text': value, 'marks': marks}
+    return {'type': 'text', 'text': value}
+
+
+def link(value, href):
+    """ A text node linked to href
+    """
+    return {
+        'type': 'text',
+        'text': value,
+        'marks': [{'type': 'link', 'attrs': {'href': href}}]
+    }
+
+
+def paragraph(content=None):
+    return {'type': 'paragraph', 'content': content or []}
+
+
+def table_header(value):
+    return {
+        'type': 'tableHeader',
+        'attrs': {},
+        'content': [paragraph([text('{}'.format(value), STRONG_MARKS)])]
+    }
+
+
+def table_cell(value=''):
+    """ A table cell, it's empty if value is empty
+    """
+    return {
+        'type': 'tableCell',
+        'attrs': {},
+        'content': [paragraph([text('{}'.format(value))] if value else [])]
+    }
+
+
+def table_row(cells):
+    return {'type': 'tableRow', 'content': cells}
+
+
+def table(headers=(), rows=(), attrs=None):
+    """ A table with a header row and the rows of values
+
+        Parameters:
+            headers {list}: The titles of header row
+            rows {list}: A list of tuples, each tuple is the values of a row
+            attrs {dict}: The attrs of table
+    """
+    content = [table_row([table_header(h) for h in headers])]
+    content.extend(
+        table_row([table_cell(value) for value in row]) for row in rows)
+    return {'type': 'table', 'attrs': attrs or {}, 'content': content}
+
+
+def doc(content):
+    return {'type': 'doc', 'version': 1, 'content': content}
+
+
+@functools.lru_cache(maxsize=None)
+def field_title(key):
+    """ The bold "<key>: " text, memoized since the titles are repeated in
+        every card
+    """
+    return text('{}: '.format(key), STRONG_MARKS)
+
+
+@functools.lru_cache(maxsize=256)
+def link_field(key, href, link_text):
+    """ The memoized "<key>: <link_text>" nodes, e.g. the bug list link of
+        a platform which is put in all its cards
+    """
+    return (field_title(key), link(link_text, href))
+
+
+def dumps(node):
+    """ Serialize the node compactly
+    """
+    return json.dumps(node, separators=(',', ':'), check_circular=False)
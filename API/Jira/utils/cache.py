@@ -0,0 +1,17 @@
+import re
+
+from Common.cache import ResponseCache as _ResponseCache
+
+# The responses are tagged by the Jira issue keys in their request, and
+# invalidated by the writes to the same issue keys. e.g. CQT-1234
+TAG_PATTERN = re.compile(r'\b[A-Z][A-Z0-9]+-\d+\b')
+
+
+class ResponseCache(_ResponseCache):
+    """ The ResponseCache tagged by Jira issue keys, see Common.cache
+
+        e.g.
+            cache = ResponseCache(ttl=60, path='/tmp/jira_cache')
+            jira_api = JiraAPI(cache=cache)
+    """
+    tag_pattern = TAG_PATTERN
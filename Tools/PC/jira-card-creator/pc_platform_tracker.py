@@ -384,7 +384,11 @@ def get_somerville_platform_tracker(google_sheet_conf={}):
     test_obj.spreadsheet = google_sheet_conf["sheet_link"]
 
     rts_range = google_sheet_conf["rts_range"]
-    key_data = test_obj.get_range_data(rts_range, major_dimension="ROWS")
+    prts_range = google_sheet_conf["prts_range"]
+    # Get RTS and PRTS data by one request
+    ranges_data = test_obj.get_ranges_data(
+        [rts_range, prts_range], major_dimension="ROWS")
+    key_data = ranges_data[rts_range]
     mapping = SomervillePlatformRecord._expand_mapping(
         SomervillePlatformRecord.rts_mapping()
     )
@@ -401,8 +405,7 @@ def get_somerville_platform_tracker(google_sheet_conf={}):
         except ValueError as err:
             logging.warning(err)
 
-    prts_range = google_sheet_conf["prts_range"]
-    key_data = test_obj.get_range_data(prts_range, major_dimension="ROWS")
+    key_data = ranges_data[prts_range]
     mapping = SomervillePlatformRecord._expand_mapping(
         SomervillePlatformRecord.prts_mapping()
     )
@@ -17,7 +17,7 @@
 
 # Name of virtual environment
 VENV="jira-creator-env"
-DEPENDENCIES=("Jira" "GoogleSheet")
+DEPENDENCIES=("Common" "Jira" "GoogleSheet")
 
 # Check dependency api
 check_dependency_api()
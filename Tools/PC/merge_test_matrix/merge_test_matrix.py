@@ -3,12 +3,47 @@
 import os
 import argparse
 import copy
+import csv
+import functools
+import glob
+import hashlib
+import html
 import operator
 import json
 import re
+import sys
 import tarfile
+import time
+import urllib.request
 import xlsxwriter
-from collections import OrderedDict
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson:
+    JSON_DECODER = "orjson"
+    _json_loads = orjson.loads
+elif ujson:
+    JSON_DECODER = "ujson"
+    _json_loads = ujson.loads
+else:
+    JSON_DECODER = "json"
+    _json_loads = json.loads
 
 
 TEST_RESULT_PATTERN = r"^\S*-initial-test.json$"
@@ -37,6 +72,77 @@ TEST_MATRIX_MAPPING = OrderedDict(
         "Test scope": None,
     }
 )
+# Row titles of the v2 test matrix and the InitialResultParser property
+# which provides the value of each row. None means the cell is left empty.
+TEST_MATRIX_V2_FIELDS = OrderedDict(
+    {
+        "Platform Name": "platform_name",
+        "Configuration": "sku",
+        "BIOS": "bios",
+        "CPU": "cpu",
+        "Chipset": None,
+        "Memory": "memory",
+        "Video (onboard)": "onboard_gpu",
+        "Video (add-on)": "discrete_gpu",
+        "Audio": "audio",
+        "NIC": "ethernet",
+        "WLAN": "wlan",
+        "Bluetooth": "bluetooth",
+        "WWAN": "wwan",
+        "Screen": "touchscreen",
+        "Panel Resolution": "panel",
+        "Touchpad": "touchpad",
+        "Webcam": "webcam",
+        "Fingerprint": "fingerprint",
+        "Disk": "disk",
+        "Other Special peipherals": None,
+        "Test scope": None,
+    }
+)
+PARQUET_BATCH_SIZE = 64
+DEFAULT_JOBS = 4
+# Keys of initial test result which are read to generate the test matrix,
+# they are never dropped by the key filter of load_initial_result
+MATRIX_REQUIRED_KEYS = frozenset(
+    [
+        "Platform",
+        "SKU",
+        "BiosVersion",
+        "CPU",
+        "RAM",
+        "GPU",
+        "Audio",
+        "Ethernet",
+        "WLAN",
+        "Bluetooth",
+        "WWAN",
+        "Fingerprint",
+        "Touchpad",
+        "Touchscreen",
+        "Panel-Resolution",
+        "Webcam",
+        "Disk",
+    ]
+)
+_JSON_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+# Match everything till the next bracket which is not inside a string
+_JSON_NESTING_RE = re.compile(
+    rb'[^"\[\]{}]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"\[\]{}]*)*[\[\]{}]'
+)
+_JSON_SCALAR_RE = re.compile(rb"[^,}\]\s]*")
+_JSON_WHITESPACE_RE = re.compile(rb"\s*")
+HTTP_TIMEOUT = 60
+SKU_TITLE = "Configuration"
+DIFF_ADDED = "added"
+DIFF_REMOVED = "removed"
+DIFF_CHANGED = "changed"
+DIFF_DUPLICATED = "duplicated"
+DIFF_BG_COLORS = {
+    DIFF_ADDED: "lime",
+    DIFF_REMOVED: "silver",
+    DIFF_CHANGED: "yellow",
+    DIFF_DUPLICATED: "orange",
+}
 
 
 class InitialResultParser:
@@ -156,6 +262,47 @@ class InitialResultParser:
         else:
             return "N/A"
 
+    def components(self):
+        """Return the normalized hardware components of the SKU.
+
+        Each component kind maps to a sorted tuple of devices, so the
+        result doesn't depend on the device order in the initial test
+        result. Empty and "N/A" values are dropped.
+        """
+        gpus = self._data.get("GPU") or []
+        wlans = self._data.get("WLAN") or []
+        components = OrderedDict(
+            {
+                "CPU": [self.cpu],
+                "Memory": [self.memory],
+                "GPU": [tmp["device"] for tmp in gpus],
+                "Audio": self.audio.split("\n"),
+                "NIC": self.ethernet.split("\n"),
+                "WLAN": [
+                    f"{tmp['device']} sub_id: {tmp['sub_id']}" for tmp in wlans
+                ],
+                "Bluetooth": self.bluetooth.split("\n"),
+                "WWAN": [self.wwan],
+                "Screen": self.touchscreen.split("\n"),
+                "Panel Resolution": [self.panel],
+                "Touchpad": self.touchpad.split("\n"),
+                "Webcam": self.webcam.split("\n"),
+                "Fingerprint": [self.fingerprint],
+                "Disk": self.disk.split("\n"),
+            }
+        )
+        for kind, items in components.items():
+            components[kind] = tuple(
+                sorted(
+                    {
+                        " ".join(str(item).split())
+                        for item in items
+                        if item and str(item).strip() not in ["", "N/A"]
+                    }
+                )
+            )
+        return components
+
 
 SUPT_BG_COLORS = [
     "cyan",
@@ -268,6 +415,15 @@ def _find_extra_keys(test_results):
     return extra_keys
 
 
+def _format_extra_value(value):
+    """Convert the value of an extra key to the string shown in a cell."""
+    if isinstance(value, list):
+        return "\n".join([str(v) for v in value])
+    elif value is None:
+        return "N/A"
+    return str(value)
+
+
 def generate_test_matrix(test_results, filename, no_highlight):
     filename += ".xlsx"
 
@@ -419,29 +575,7 @@ def generate_test_matrix_v2(test_results, filename, no_highlight):
         worksheet.set_column(0, 0, 25)
         worksheet.set_column(1, 10, 50)
 
-        titles = [
-            "Platform Name",
-            "Configuration",
-            "BIOS",
-            "CPU",
-            "Chipset",
-            "Memory",
-            "Video (onboard)",
-            "Video (add-on)",
-            "Audio",
-            "NIC",
-            "WLAN",
-            "Bluetooth",
-            "WWAN",
-            "Screen",
-            "Panel Resolution",
-            "Touchpad",
-            "Webcam",
-            "Fingerprint",
-            "Disk",
-            "Other Special peipherals",
-            "Test scope",
-        ]
+        titles = list(TEST_MATRIX_V2_FIELDS.keys())
 
         # Add empty row separator and extra keys after "Test scope"
         if extra_keys:
@@ -528,14 +662,7 @@ def generate_test_matrix_v2(test_results, filename, no_highlight):
 
             # Write extra keys data (starting at row 22)
             for i, extra_key in enumerate(extra_keys):
-                extra_value = data.get(extra_key, "N/A")
-                # Convert to string if needed
-                if isinstance(extra_value, list):
-                    extra_value = "\n".join([str(v) for v in extra_value])
-                elif extra_value is None:
-                    extra_value = "N/A"
-                else:
-                    extra_value = str(extra_value)
+                extra_value = _format_extra_value(data.get(extra_key, "N/A"))
 
                 worksheet.write(
                     22 + i,
@@ -670,52 +797,603 @@ def generate_test_matrix_v2(test_results, filename, no_highlight):
                         )
 
 
-def _collect_test_results(folder_path, extension):
-    compress_files = os.listdir(folder_path)
-    initial_results = []
-    for cfile in compress_files:
-        if cfile.endswith(extension):
-            with tarfile.open(
-                os.path.sep.join([folder_path, cfile]), mode="r:gz"
-            ) as so:
-                print("\nChecking the content in {} tarball".format(cfile))
-                for filename in so.getmembers():
-                    # Validate path to prevent path traversal attacks
-                    if ".." in filename.name or filename.name.startswith("/"):
-                        print(
-                            "Skipping suspicious file path: {}".format(
-                                filename.name
-                            )
-                        )
-                        continue
+def find_matrix_extra_keys(test_results):
+    """Find the extra keys of the matrix model.
+
+    The v2 xlsx shows raw rows for extra keys which are already parsed into
+    the v2 fields, e.g. BiosVersion for BIOS or WLAN. The model keeps the
+    parsed value only, so a change of them is not reported twice.
+    """
+    return [
+        key
+        for key in _find_extra_keys(test_results)
+        if key not in TEST_MATRIX_V2_FIELDS
+        and key not in MATRIX_REQUIRED_KEYS
+    ]
+
+
+def build_matrix_titles(extra_keys):
+    """Return the column titles of the matrix model."""
+    return list(TEST_MATRIX_V2_FIELDS.keys()) + list(extra_keys)
+
+
+def iter_matrix_records(test_results, extra_keys):
+    """Yield one record per SKU with the same values as the v2 xlsx matrix.
+
+    Each record is an OrderedDict keyed by the titles returned from
+    build_matrix_titles, so every exporter consumes the same model.
+    """
+    for data in test_results:
+        parser = InitialResultParser(data)
+        record = OrderedDict()
+        for title, attr in TEST_MATRIX_V2_FIELDS.items():
+            value = getattr(parser, attr) if attr else ""
+            record[title] = "" if value is None else str(value)
+        for extra_key in extra_keys:
+            record[extra_key] = _format_extra_value(
+                data.get(extra_key, "N/A")
+            )
+        yield record
+
+
+def export_csv(titles, records, filename):
+    """Write one row per SKU, the first row is the titles."""
+    with open(filename, "w", newline="") as fp:
+        writer = csv.DictWriter(fp, fieldnames=titles)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+
+
+def export_json_lines(titles, records, filename):
+    """Write one JSON object per SKU and per line."""
+    with open(filename, "w") as fp:
+        for record in records:
+            fp.write(json.dumps(record, ensure_ascii=False))
+            fp.write("\n")
+
+
+def export_html(titles, records, filename):
+    """Write a static HTML table laid out like the xlsx matrix.
+
+    Titles are the first column and each SKU is a column, so the columns
+    are collected before the rows can be written.
+    """
+    columns = [list(record.values()) for record in records]
+
+    def _cell(tag, value):
+        value = html.escape(value).replace("\n", "<br>")
+        return "<{0}>{1}</{0}>".format(tag, value)
+
+    with open(filename, "w") as fp:
+        fp.write(
+            "<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+            "<title>Test Matrix</title>\n</head>\n<body>\n"
+            "<table border=\"1\">\n"
+        )
+        for idx, title in enumerate(titles):
+            tag = "th" if idx in [0, 1] else "td"
+            cells = [_cell("th", title)]
+            cells.extend(_cell(tag, column[idx]) for column in columns)
+            fp.write("<tr>{}</tr>\n".format("".join(cells)))
+        fp.write("</table>\n</body>\n</html>\n")
+
+
+def export_parquet(titles, records, filename):
+    """Write a columnar parquet file, it needs pyarrow to be installed."""
+    if pyarrow is None:
+        raise SystemExit(
+            "pyarrow is required to export {}, please install it".format(
+                filename
+            )
+        )
+    schema = pyarrow.schema([(title, pyarrow.string()) for title in titles])
+    with pyarrow.parquet.ParquetWriter(filename, schema) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= PARQUET_BATCH_SIZE:
+                writer.write_table(
+                    pyarrow.Table.from_pylist(batch, schema=schema)
+                )
+                batch = []
+        if batch:
+            writer.write_table(pyarrow.Table.from_pylist(batch, schema=schema))
+
+
+MATRIX_EXPORTERS = OrderedDict(
+    {
+        ".csv": export_csv,
+        ".jsonl": export_json_lines,
+        ".html": export_html,
+        ".parquet": export_parquet,
+    }
+)
+
+
+def export_test_matrix(test_results, output, no_highlight, old_format):
+    """Export the test matrix to the format given by the output extension.
+
+    An output without a supported extension, e.g. the default
+    "test_matrix", is written as xlsx like before.
+    """
+    filename, extension = os.path.splitext(output)
+    if extension == ".xlsx" or extension not in MATRIX_EXPORTERS:
+        filename = filename if extension == ".xlsx" else output
+        if old_format:
+            generate_test_matrix(test_results, filename, no_highlight)
+        else:
+            generate_test_matrix_v2(test_results, filename, no_highlight)
+        return
+
+    extra_keys = find_matrix_extra_keys(test_results)
+    MATRIX_EXPORTERS[extension](
+        build_matrix_titles(extra_keys),
+        iter_matrix_records(test_results, extra_keys),
+        output,
+    )
+
+
+def load_matrix_records(source, extension=".tar.gz"):
+    """Load the matrix records of a test matrix to compare with.
+
+    The source could be a folder of initial test tarballs, a JSON file
+    which contains a list of initial test results, or a JSON Lines file
+    exported by this tool.
+    """
+    if os.path.isdir(source):
+        test_results = _collect_test_results(source, extension)
+    else:
+        with open(source) as fp:
+            if source.endswith(".jsonl"):
+                test_results = [
+                    json.loads(line) for line in fp if line.strip()
+                ]
+            else:
+                test_results = json.load(fp)
+        # Exported records are already in the matrix model
+        if test_results and SKU_TITLE in test_results[0]:
+            return test_results
+
+    extra_keys = find_matrix_extra_keys(test_results)
+    return list(iter_matrix_records(test_results, extra_keys))
+
+
+def _hash_cell(value):
+    return hashlib.blake2b(
+        str(value).encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def _index_matrix_records(records):
+    """Index the records by SKU and hash every cell of them.
+
+    The first record of a SKU is indexed. Return the index and a Counter of
+    the SKUs which have more than one record.
+    """
+    index = OrderedDict()
+    counts = Counter()
+    for record in records:
+        sku = record.get(SKU_TITLE)
+        counts[sku] += 1
+        if sku in index:
+            continue
+        hashes = {title: _hash_cell(value) for title, value in record.items()}
+        index[sku] = (record, hashes)
+    duplicates = Counter({sku: n for sku, n in counts.items() if n > 1})
+    return index, duplicates
+
+
+def diff_test_matrix(old_records, new_records):
+    """Compute the field level changes between two test matrices.
+
+    SKUs are aligned by the Configuration title through a dictionary and
+    cells are compared by their hashes, so the cost is linear to the
+    number of cells.
+
+    Return a list of (sku, change, field, old_value, new_value) tuples,
+    change is one of DIFF_ADDED, DIFF_REMOVED, DIFF_CHANGED and
+    DIFF_DUPLICATED. A SKU with more than one record in a matrix is compared
+    by its first record and reported as DIFF_DUPLICATED with the number of
+    its records in the old and new matrices.
+    """
+    old_index, old_duplicates = _index_matrix_records(old_records)
+    new_index, new_duplicates = _index_matrix_records(new_records)
+    empty_hash = _hash_cell("")
+    changes = []
+
+    for sku in old_duplicates.keys() | new_duplicates.keys():
+        changes.append(
+            (
+                sku,
+                DIFF_DUPLICATED,
+                SKU_TITLE,
+                "{} records".format(old_duplicates[sku])
+                if sku in old_duplicates
+                else "",
+                "{} records".format(new_duplicates[sku])
+                if sku in new_duplicates
+                else "",
+            )
+        )
 
-                    expected_file = re.search(
-                        TEST_RESULT_PATTERN, filename.name
+    for sku, (new_record, new_hashes) in new_index.items():
+        if sku not in old_index:
+            changes.append((sku, DIFF_ADDED, "", "", ""))
+            continue
+        old_record, old_hashes = old_index[sku]
+        for title, new_hash in new_hashes.items():
+            if old_hashes.get(title, empty_hash) != new_hash:
+                changes.append(
+                    (
+                        sku,
+                        DIFF_CHANGED,
+                        title,
+                        old_record.get(title, ""),
+                        new_record[title],
                     )
-                    if expected_file:
-                        print(
-                            "Loading initial test result from"
-                            "{}".format(filename)
-                        )
-                        try:
-                            data = json.loads(so.extractfile(filename).read())
-                            initial_results.append(data)
-                        except json.JSONDecodeError as e:
-                            print(
-                                "Failed to parse JSON from {}: {}".format(
-                                    filename.name, e
-                                )
-                            )
-                            continue
+                )
+        for title in old_hashes.keys() - new_hashes.keys():
+            if old_hashes[title] != empty_hash:
+                changes.append(
+                    (sku, DIFF_CHANGED, title, old_record[title], "")
+                )
+
+    for sku in old_index.keys() - new_index.keys():
+        changes.append((sku, DIFF_REMOVED, "", "", ""))
+
+    return sorted(changes, key=lambda change: (str(change[0]), change[1]))
+
+
+def generate_delta_sheet(changes, filename):
+    """Write the changes from diff_test_matrix to a highlighted sheet."""
+    filename += ".xlsx"
+
+    with xlsxwriter.Workbook(filename) as workbook:
+        worksheet = workbook.add_worksheet("Delta")
+        worksheet.set_column(0, 1, 25)
+        worksheet.set_column(2, 2, 25)
+        worksheet.set_column(3, 4, 75)
+
+        header_format = WorkbookFormater.header_format(workbook)
+        for col, title in enumerate(
+            ["SKU", "Change", "Field", "Old value", "New value"]
+        ):
+            worksheet.write(0, col, title, header_format)
+
+        formats = {
+            change: WorkbookFormater.custom_format(workbook, bg_color=color)
+            for change, color in DIFF_BG_COLORS.items()
+        }
+        for row, change in enumerate(changes, start=1):
+            cell_format = formats[change[1]]
+            for col, value in enumerate(change):
+                worksheet.write(row, col, value, cell_format)
+            lines = max(str(value).count("\n") for value in change)
+            if lines:
+                worksheet.set_row(row, 15 * (lines + 1))
+
+
+def analyze_components(test_results):
+    """Analyze the hardware components across all SKUs.
+
+    Return a dictionary with
+        component_counts: {kind: Counter({component: number of SKUs})}
+        clusters: [(fingerprint, [SKU, ...])], SKUs with identical hardware
+                  share a fingerprint, the biggest cluster comes first
+        coverage: [(SKU, number of newly covered components)], a greedy
+                  pick of SKUs which covers every component at least once
+    """
+    component_counts = OrderedDict()
+    clusters = OrderedDict()
+    sku_components = OrderedDict()
+
+    for data in test_results:
+        sku = data.get("SKU")
+        components = InitialResultParser(data).components()
+        for kind, items in components.items():
+            component_counts.setdefault(kind, Counter()).update(items)
+
+        fingerprint = hashlib.blake2b(
+            json.dumps(components).encode("utf-8"), digest_size=8
+        ).hexdigest()
+        if fingerprint not in clusters:
+            # The first SKU of a cluster represents its hardware
+            sku_components[sku] = {
+                (kind, item)
+                for kind, items in components.items()
+                for item in items
+            }
+        clusters.setdefault(fingerprint, []).append(sku)
+
+    coverage = []
+    uncovered = set().union(*sku_components.values())
+    while uncovered:
+        sku, covered = max(
+            sku_components.items(),
+            key=lambda item: len(item[1] & uncovered),
+        )
+        coverage.append((sku, len(covered & uncovered)))
+        uncovered -= covered
+
+    return {
+        "component_counts": component_counts,
+        "clusters": sorted(
+            clusters.items(), key=lambda item: len(item[1]), reverse=True
+        ),
+        "coverage": coverage,
+    }
+
+
+def generate_analytics_sheet(analytics, filename):
+    """Write the result of analyze_components to a summary workbook."""
+    filename += ".xlsx"
+
+    with xlsxwriter.Workbook(filename) as workbook:
+        header_format = WorkbookFormater.header_format(workbook)
+        default_format = WorkbookFormater.default_format(workbook)
+
+        worksheet = workbook.add_worksheet("Components")
+        worksheet.set_column(0, 0, 20)
+        worksheet.set_column(1, 1, 75)
+        worksheet.set_column(2, 2, 12)
+        for col, title in enumerate(["Kind", "Component", "SKUs"]):
+            worksheet.write(0, col, title, header_format)
+        row = 0
+        for kind, counts in analytics["component_counts"].items():
+            for component, count in counts.most_common():
+                row += 1
+                worksheet.write(row, 0, kind, default_format)
+                worksheet.write(row, 1, component, default_format)
+                worksheet.write(row, 2, count, default_format)
+
+        worksheet = workbook.add_worksheet("Clusters")
+        worksheet.set_column(0, 0, 20)
+        worksheet.set_column(1, 1, 12)
+        worksheet.set_column(2, 2, 75)
+        for col, title in enumerate(["Fingerprint", "SKUs", "SKU list"]):
+            worksheet.write(0, col, title, header_format)
+        for row, (fingerprint, skus) in enumerate(
+            analytics["clusters"], start=1
+        ):
+            worksheet.write(row, 0, fingerprint, default_format)
+            worksheet.write(row, 1, len(skus), default_format)
+            worksheet.write(row, 2, ", ".join(skus), default_format)
+
+        worksheet = workbook.add_worksheet("Coverage")
+        worksheet.set_column(0, 0, 25)
+        worksheet.set_column(1, 1, 25)
+        for col, title in enumerate(["SKU", "New components"]):
+            worksheet.write(0, col, title, header_format)
+        for row, (sku, covered) in enumerate(analytics["coverage"], start=1):
+            worksheet.write(row, 0, sku, default_format)
+            worksheet.write(row, 1, covered, default_format)
+
+
+def local_dir_sources(folder_path, extension):
+    """Return the sources of tarballs in a local folder.
+
+    A source is a (name, opener) tuple, the opener returns a binary file
+    object which is read as a stream by collect_test_results.
+    """
+    sources = []
+    for cfile in os.listdir(folder_path):
+        if cfile.endswith(extension):
+            sources.append(
+                (
+                    cfile,
+                    functools.partial(
+                        open, os.path.sep.join([folder_path, cfile]), "rb"
+                    ),
+                )
+            )
         else:
             print(
                 "the extension file name is not expected. tarbal: "
                 "{}".format(cfile)
             )
+    return sources
+
+
+def glob_sources(pattern):
+    """Return the sources of tarballs matched by a glob pattern."""
+    return [
+        (path, functools.partial(open, path, "rb"))
+        for path in sorted(glob.glob(pattern, recursive=True))
+        if os.path.isfile(path)
+    ]
+
+
+def url_sources(urls, timeout=HTTP_TIMEOUT):
+    """Return the sources of tarballs on HTTP(S) servers.
+
+    The response is read as a stream, nothing is staged to the disk.
+    """
+    return [
+        (url, functools.partial(urllib.request.urlopen, url, timeout=timeout))
+        for url in urls
+    ]
+
+
+def resolve_sources(specs, extension):
+    """Resolve the source strings given by the user.
+
+    A string could be an HTTP(S) URL, a glob pattern, a folder of
+    tarballs, a tarball or "-" to read one source string per line from
+    stdin.
+    """
+    sources = []
+    for spec in specs:
+        if spec == "-":
+            sources.extend(
+                resolve_sources(
+                    [line.strip() for line in sys.stdin if line.strip()],
+                    extension,
+                )
+            )
+        elif spec.startswith(("http://", "https://")):
+            sources.extend(url_sources([spec]))
+        elif os.path.isdir(spec):
+            sources.extend(local_dir_sources(spec, extension))
+        elif glob.has_magic(spec):
+            sources.extend(glob_sources(spec))
+        else:
+            sources.append((spec, functools.partial(open, spec, "rb")))
+    return sources
+
+
+def _skip_json_value(content, pos):
+    """Return the end position of the JSON value starting at pos.
+
+    The value is only scanned, strings are skipped as a whole by the regex
+    so large subtrees cost little more than a memory scan.
+    """
+    first = content[pos:pos + 1]
+    if first == b'"':
+        return _JSON_STRING_RE.match(content, pos).end()
+    if first not in (b"{", b"["):
+        return _JSON_SCALAR_RE.match(content, pos).end()
+
+    depth = 0
+    for token in _JSON_NESTING_RE.finditer(content, pos):
+        if content[token.end() - 1] in b"{[":
+            depth += 1
+        else:
+            depth -= 1
+            if not depth:
+                return token.end()
+    raise ValueError("Unterminated JSON value at {}".format(pos))
+
+
+def _filter_json_object(content, skip_keys, max_value_size):
+    """Decode a JSON object but skip the unwanted top-level values.
+
+    A value is skipped when its key is in skip_keys, or its raw size is
+    larger than max_value_size. Keys in MATRIX_REQUIRED_KEYS are kept.
+    """
+    data = {}
+    pos = _JSON_WHITESPACE_RE.match(content, 0).end()
+    if content[pos:pos + 1] != b"{":
+        raise ValueError("Expect a JSON object")
+    pos = _JSON_WHITESPACE_RE.match(content, pos + 1).end()
+    if content[pos:pos + 1] == b"}":
+        return data
+
+    while True:
+        key_match = _JSON_STRING_RE.match(content, pos)
+        if not key_match:
+            raise ValueError("Expect a key at {}".format(pos))
+        key = _json_loads(key_match.group())
+        pos = _JSON_WHITESPACE_RE.match(content, key_match.end()).end()
+        if content[pos:pos + 1] != b":":
+            raise ValueError("Expect ':' at {}".format(pos))
+        start = _JSON_WHITESPACE_RE.match(content, pos + 1).end()
+        end = _skip_json_value(content, start)
+
+        if key in MATRIX_REQUIRED_KEYS or (
+            key not in skip_keys
+            and (max_value_size is None or end - start <= max_value_size)
+        ):
+            data[key] = _json_loads(content[start:end])
+
+        pos = _JSON_WHITESPACE_RE.match(content, end).end()
+        delimiter = content[pos:pos + 1]
+        if delimiter == b"}":
+            return data
+        if delimiter != b",":
+            raise ValueError("Expect ',' or '}}' at {}".format(pos))
+        pos = _JSON_WHITESPACE_RE.match(content, pos + 1).end()
+
+
+def load_initial_result(content, skip_keys=(), max_value_size=None):
+    """Decode the bytes of an initial test result.
+
+    orjson or ujson is used when it is installed. With skip_keys or
+    max_value_size the top-level values are filtered before decoding, see
+    _filter_json_object.
+    """
+    if skip_keys or max_value_size is not None:
+        return _filter_json_object(content, set(skip_keys), max_value_size)
+    return _json_loads(content)
+
+
+def _load_test_results_from_tarball(name, fileobj, loader):
+    """Load the initial test results from a gzip tarball stream."""
+    initial_results = []
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as so:
+        print("\nChecking the content in {} tarball".format(name))
+        for filename in so:
+            # Validate path to prevent path traversal attacks
+            if ".." in filename.name or filename.name.startswith("/"):
+                print(
+                    "Skipping suspicious file path: {}".format(filename.name)
+                )
+                continue
+
+            expected_file = re.search(TEST_RESULT_PATTERN, filename.name)
+            if expected_file:
+                print("Loading initial test result from {}".format(filename))
+                try:
+                    data = loader(so.extractfile(filename).read())
+                    initial_results.append(data)
+                except ValueError as e:
+                    print(
+                        "Failed to parse JSON from {}: {}".format(
+                            filename.name, e
+                        )
+                    )
+                    continue
+    return initial_results
+
+
+def collect_test_results(
+    sources, jobs=DEFAULT_JOBS, loader=load_initial_result, benchmark=False
+):
+    """Load the initial test results from the sources concurrently.
+
+    At most "jobs" tarballs are opened at the same time. A source which
+    cannot be read is reported and skipped. With benchmark, the time to
+    load each tarball is printed at the end.
+    """
+
+    def _load(source):
+        name, opener = source
+        start = time.perf_counter()
+        try:
+            with opener() as fileobj:
+                results = _load_test_results_from_tarball(
+                    name, fileobj, loader
+                )
+        except (OSError, tarfile.TarError) as e:
+            print("Failed to load {}: {}".format(name, e))
+            results = []
+        return name, results, time.perf_counter() - start
+
+    initial_results = []
+    timings = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for name, results, elapsed in executor.map(_load, sources):
+            initial_results.extend(results)
+            timings.append((name, len(results), elapsed))
+
+    if benchmark:
+        print("\nJSON decoder: {}".format(JSON_DECODER))
+        for name, count, elapsed in timings:
+            print("{:>10.4f}s {:>3} results {}".format(elapsed, count, name))
+        print(
+            "{:>10.4f}s {:>3} results in {} tarballs".format(
+                time.perf_counter() - start, len(initial_results), len(timings)
+            )
+        )
 
     return sorted(initial_results, key=operator.itemgetter("SKU"))
 
 
+def _collect_test_results(folder_path, extension):
+    return collect_test_results(local_dir_sources(folder_path, extension))
+
+
 def _register_arguments():
 
     description = "This utiltiy is generate the test matrix \
@@ -725,9 +1403,81 @@ def _register_arguments():
     )
     parser.add_argument("-p", "--path", type=str, default=os.getcwd())
     parser.add_argument("-fe", "--file-extension", type=str, default=".tar.gz")
-    parser.add_argument("-o", "--output", type=str, default="test_matrix")
+    parser.add_argument(
+        "-s",
+        "--source",
+        type=str,
+        action="append",
+        help="Where to load the tarballs, it could be a folder, a tarball, "
+        "a glob pattern,\nan HTTP(S) URL or \"-\" to read them from stdin "
+        "line by line.\nRepeat it to load several sources. "
+        "Default is the --path folder.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="How many tarballs are loaded concurrently. Default is "
+        "{}".format(DEFAULT_JOBS),
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        action="append",
+        help="The output file, the format is decided by the extension: "
+        "{}.\nDefault is test_matrix.xlsx. "
+        "Repeat it to export several formats in one pass.".format(
+            ", ".join([".xlsx"] + list(MATRIX_EXPORTERS.keys()))
+        ),
+    )
     parser.add_argument("--no-highlight", action="store_true", default=False)
+    parser.add_argument(
+        "--diff-against",
+        type=str,
+        help="The old test matrix to compare with. It could be a folder of "
+        "initial test tarballs,\na JSON file of initial test results or a "
+        "JSON Lines file exported by this tool.",
+    )
+    parser.add_argument(
+        "--diff-output",
+        type=str,
+        default="test_matrix_delta",
+        help="The file name of the delta sheet. Default is "
+        "test_matrix_delta.xlsx",
+    )
     parser.add_argument("--old-format", action="store_true", default=False)
+    parser.add_argument(
+        "--analytics",
+        type=str,
+        nargs="?",
+        const="test_matrix_analytics",
+        help="Write the component frequency, hardware clusters and a "
+        "minimal coverage set\nof SKUs to a summary workbook. "
+        "Default name is test_matrix_analytics.xlsx",
+    )
+    parser.add_argument(
+        "--skip-key",
+        type=str,
+        action="append",
+        default=[],
+        help="Don't decode this top-level key of initial test results. "
+        "Repeat it to skip several keys.",
+    )
+    parser.add_argument(
+        "--max-value-size",
+        type=int,
+        help="Don't decode the top-level values whose raw JSON is larger "
+        "than this size in bytes.\nThe keys used by the test matrix are "
+        "always decoded.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="Print the time to load each tarball",
+    )
 
     return parser.parse_args()
 
@@ -740,11 +1490,46 @@ def main():
         else os.path.sep.join([os.getcwd(), args.path])
     )
     print(path)
-    test_results = _collect_test_results(path, args.file_extension)
-    if args.old_format:
-        generate_test_matrix(test_results, args.output, args.no_highlight)
-    else:
-        generate_test_matrix_v2(test_results, args.output, args.no_highlight)
+    sources = resolve_sources(args.source or [path], args.file_extension)
+    loader = functools.partial(
+        load_initial_result,
+        skip_keys=args.skip_key,
+        max_value_size=args.max_value_size,
+    )
+    test_results = collect_test_results(
+        sources, args.jobs, loader, args.benchmark
+    )
+    for output in args.output or ["test_matrix"]:
+        export_test_matrix(
+            test_results, output, args.no_highlight, args.old_format
+        )
+
+    if args.diff_against:
+        old_records = load_matrix_records(
+            args.diff_against, args.file_extension
+        )
+        extra_keys = find_matrix_extra_keys(test_results)
+        changes = diff_test_matrix(
+            old_records, iter_matrix_records(test_results, extra_keys)
+        )
+        generate_delta_sheet(changes, args.diff_output)
+        print(
+            "Found {} changes against {}".format(
+                len(changes), args.diff_against
+            )
+        )
+
+    if args.analytics:
+        analytics = analyze_components(test_results)
+        generate_analytics_sheet(analytics, args.analytics)
+        print(
+            "{} SKUs in {} hardware clusters, {} SKUs cover all "
+            "components".format(
+                len(test_results),
+                len(analytics["clusters"]),
+                len(analytics["coverage"]),
+            )
+        )
 
 
 if __name__ == "__main__":
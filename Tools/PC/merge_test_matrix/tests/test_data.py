@@ -0,0 +1,49 @@
+INITIAL_TEST_RESULTS = [
+    {
+        "Platform": "Fake Platform 14",
+        "SKU": "SKU1",
+        "BiosVersion": "0.1.2",
+        "CPU": "Intel(R) Core(TM) Ultra 7 155H",
+        "RAM": "16GB",
+        "GPU": [
+            {"device": "Intel Corporation Meteor Lake-P [Intel Arc Graphics]"}
+        ],
+        "Audio": [
+            {"device": "Audio device Meteor Lake-P HD Audio",
+             "driver": "sof-audio-pci-intel-mtl"}
+        ],
+        "Ethernet": [],
+        "WLAN": [{"device": "Intel Corporation Wi-Fi 6E", "sub_id": "0094"}],
+        "Bluetooth": ["Intel Corp. AX211 Bluetooth"],
+        "WWAN": "N/A",
+        "Touchscreen": [],
+        "Panel-Resolution": "1920x1200",
+        "Touchpad": [{"device": "SYNA3107:00 06CB:CF11 Touchpad"}],
+        "Webcam": ["Integrated_Webcam_FHD"],
+        "Fingerprint": "N/A",
+        "Disk": ["Disk device nvme0n1 512GB"],
+        "Kernel": "6.8.0-1010-oem",
+    },
+    {
+        "Platform": "Fake Platform 14",
+        "SKU": "SKU2",
+        "BiosVersion": "0.1.2",
+        "CPU": "Intel(R) Core(TM) Ultra 5 125U",
+        "RAM": "8GB",
+        "GPU": [
+            {"device": "Intel Corporation Meteor Lake-P [Intel Graphics]"},
+            {"device": "NVIDIA Corporation AD107M [GeForce RTX 4060]"},
+        ],
+        "Audio": [],
+        "Ethernet": [{"device": "Realtek RTL8111/8168"}],
+        "WLAN": [],
+        "Bluetooth": [],
+        "WWAN": "N/A",
+        "Touchscreen": [{"device": "ELAN2514:00 04F3:2D84"}],
+        "Panel-Resolution": "2560x1600",
+        "Touchpad": [],
+        "Webcam": [],
+        "Fingerprint": "Goodix 27c6:6594",
+        "Disk": ["Disk device nvme0n1 1TB", "Disk device sda 64GB"],
+    },
+]
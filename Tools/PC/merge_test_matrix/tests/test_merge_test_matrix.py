@@ -0,0 +1,268 @@
+import copy
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from merge_test_matrix import (
+    DIFF_ADDED,
+    DIFF_CHANGED,
+    DIFF_DUPLICATED,
+    DIFF_REMOVED,
+    InitialResultParser,
+    analyze_components,
+    build_matrix_titles,
+    diff_test_matrix,
+    export_test_matrix,
+    find_matrix_extra_keys,
+    iter_matrix_records,
+    load_initial_result,
+    load_matrix_records,
+)
+from .test_data import INITIAL_TEST_RESULTS
+
+
+class MatrixModelTest(unittest.TestCase):
+    def test_records_follow_titles(self):
+        """ Each record should contain every title in the same order
+        """
+        titles = build_matrix_titles(["Kernel"])
+        records = list(iter_matrix_records(INITIAL_TEST_RESULTS, ["Kernel"]))
+
+        self.assertEqual(2, len(records))
+        for record in records:
+            self.assertEqual(titles, list(record.keys()))
+        self.assertEqual("6.8.0-1010-oem", records[0]["Kernel"])
+        self.assertEqual("N/A", records[1]["Kernel"])
+        self.assertEqual(
+            "NVIDIA Corporation AD107M [GeForce RTX 4060]",
+            records[1]["Video (add-on)"],
+        )
+        self.assertEqual("", records[0]["Chipset"])
+
+
+class ExportTestMatrixTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp_dir.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self._tmp_dir.name, name)
+
+    def test_export_csv(self):
+        """ Should write a header row and one row per SKU
+        """
+        output = self._path("matrix.csv")
+        export_test_matrix(INITIAL_TEST_RESULTS, output, False, False)
+
+        with open(output, newline="") as fp:
+            rows = list(csv.DictReader(fp))
+        self.assertEqual(["SKU1", "SKU2"], [r["Configuration"] for r in rows])
+        self.assertEqual(
+            "Disk device nvme0n1 1TB\nDisk device sda 64GB", rows[1]["Disk"]
+        )
+
+    def test_export_json_lines(self):
+        """ Should write one JSON object per line
+        """
+        output = self._path("matrix.jsonl")
+        export_test_matrix(INITIAL_TEST_RESULTS, output, False, False)
+
+        with open(output) as fp:
+            records = [json.loads(line) for line in fp]
+        self.assertEqual(2, len(records))
+        self.assertEqual("16GB", records[0]["Memory"])
+
+    def test_export_html(self):
+        """ Should escape the values and keep the titles in first column
+        """
+        output = self._path("matrix.html")
+        export_test_matrix(INITIAL_TEST_RESULTS, output, False, False)
+
+        with open(output) as fp:
+            content = fp.read()
+        self.assertIn("<tr><th>Platform Name</th>", content)
+        self.assertIn("Realtek RTL8111/8168", content)
+        self.assertIn("Meteor Lake-P [Intel Arc Graphics]", content)
+        self.assertNotIn("\n<br>", content)
+
+
+class DiffTestMatrixTest(unittest.TestCase):
+    def _records(self, test_results):
+        return list(
+            iter_matrix_records(
+                test_results, find_matrix_extra_keys(test_results)
+            )
+        )
+
+    def test_no_change(self):
+        """ Should find nothing when the matrices are the same
+        """
+        records = self._records(INITIAL_TEST_RESULTS)
+        self.assertEqual([], diff_test_matrix(records, records))
+
+    def test_field_level_changes(self):
+        """ Should align SKUs by key and report the changed fields only
+        """
+        new_results = copy.deepcopy(INITIAL_TEST_RESULTS)
+        new_results[0]["BiosVersion"] = "0.2.0"
+        new_results[0]["Kernel"] = "6.11.0-1001-oem"
+        new_results[1]["SKU"] = "SKU3"
+        # Reverse the order to make sure the SKUs are aligned by key
+        new_results.reverse()
+
+        changes = diff_test_matrix(
+            self._records(INITIAL_TEST_RESULTS), self._records(new_results)
+        )
+
+        self.assertEqual(
+            [
+                ("SKU1", DIFF_CHANGED, "BIOS", "0.1.2", "0.2.0"),
+                (
+                    "SKU1",
+                    DIFF_CHANGED,
+                    "Kernel",
+                    "6.8.0-1010-oem",
+                    "6.11.0-1001-oem",
+                ),
+                ("SKU2", DIFF_REMOVED, "", "", ""),
+                ("SKU3", DIFF_ADDED, "", "", ""),
+            ],
+            changes,
+        )
+
+    def test_duplicated_skus(self):
+        """ Should report the SKUs with more than one record instead of
+            letting the last one win
+        """
+        old_results = INITIAL_TEST_RESULTS + [
+            dict(INITIAL_TEST_RESULTS[0], BiosVersion="9.9.9")
+        ]
+
+        changes = diff_test_matrix(
+            self._records(old_results),
+            self._records(INITIAL_TEST_RESULTS),
+        )
+
+        self.assertEqual(
+            [("SKU1", DIFF_DUPLICATED, "Configuration", "2 records", "")],
+            changes,
+        )
+
+    def test_load_exported_json_lines(self):
+        """ Should load the records exported by this tool as they are
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "old.jsonl")
+            export_test_matrix(INITIAL_TEST_RESULTS, output, False, False)
+            old_records = load_matrix_records(output)
+
+        self.assertEqual(
+            ["SKU1", "SKU2"], [r["Configuration"] for r in old_records]
+        )
+
+    def test_load_initial_test_results_json(self):
+        """ Should convert a JSON list of initial test results to records
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "old.json")
+            with open(source, "w") as fp:
+                json.dump(INITIAL_TEST_RESULTS, fp)
+            old_records = load_matrix_records(source)
+
+        self.assertEqual(
+            [],
+            diff_test_matrix(old_records, self._records(INITIAL_TEST_RESULTS)),
+        )
+
+
+class AnalyzeComponentsTest(unittest.TestCase):
+    def test_components_are_normalized(self):
+        """ The device order shouldn't change the components
+        """
+        data = copy.deepcopy(INITIAL_TEST_RESULTS[1])
+        components = InitialResultParser(data).components()
+        data["Disk"].reverse()
+        data["GPU"].reverse()
+
+        self.assertEqual(components, InitialResultParser(data).components())
+        self.assertEqual((), components["Audio"])
+        self.assertEqual(("Goodix 27c6:6594",), components["Fingerprint"])
+
+    def test_count_cluster_and_cover(self):
+        """ Should count components, cluster identical SKUs and pick the
+            SKUs which cover all components
+        """
+        duplicate = copy.deepcopy(INITIAL_TEST_RESULTS[0])
+        duplicate["SKU"] = "SKU1-dup"
+        duplicate["BiosVersion"] = "0.1.3"
+        duplicate["GPU"] = list(reversed(duplicate["GPU"]))
+        test_results = INITIAL_TEST_RESULTS + [duplicate]
+
+        analytics = analyze_components(test_results)
+
+        self.assertEqual(
+            2,
+            analytics["component_counts"]["Webcam"]["Integrated_Webcam_FHD"],
+        )
+        self.assertEqual(
+            1, analytics["component_counts"]["Disk"]["Disk device sda 64GB"]
+        )
+        self.assertEqual(
+            [["SKU1", "SKU1-dup"], ["SKU2"]],
+            [skus for _, skus in analytics["clusters"]],
+        )
+        self.assertEqual(
+            ["SKU1", "SKU2"], sorted(sku for sku, _ in analytics["coverage"])
+        )
+
+
+class LoadInitialResultTest(unittest.TestCase):
+    def setUp(self):
+        data = copy.deepcopy(INITIAL_TEST_RESULTS[0])
+        data["dmesg"] = ["[ 0.0] \"quoted\" {not json} ]["] * 100
+        data["lspci"] = {"raw": {"nested": [1, 2.5, None, True, "a,b}"]}}
+        data["Count"] = 3
+        data["Enabled"] = False
+        self.data = data
+        self.content = json.dumps(data, indent=2).encode("utf-8")
+
+    def test_load_all(self):
+        """ Should decode the whole payload without filter
+        """
+        self.assertEqual(self.data, load_initial_result(self.content))
+
+    def test_skip_keys(self):
+        """ Should drop the skipped keys and keep the others
+        """
+        expected = copy.deepcopy(self.data)
+        del expected["dmesg"]
+        del expected["lspci"]
+
+        self.assertEqual(
+            expected,
+            load_initial_result(self.content, skip_keys=["dmesg", "lspci"]),
+        )
+
+    def test_max_value_size(self):
+        """ Should drop the large values except the keys used by matrix
+        """
+        data = load_initial_result(self.content, max_value_size=60)
+
+        self.assertNotIn("dmesg", data)
+        self.assertNotIn("lspci", data)
+        self.assertEqual(3, data["Count"])
+        self.assertFalse(data["Enabled"])
+        # Required keys are kept even though they are larger than the limit
+        self.assertEqual(self.data["Audio"], data["Audio"])
+
+    def test_invalid_payload(self):
+        """ Should raise ValueError for broken payload
+        """
+        with self.assertRaises(ValueError):
+            load_initial_result(b'{"SKU": "1", "dmesg": [', skip_keys=["a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
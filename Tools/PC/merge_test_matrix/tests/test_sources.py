@@ -0,0 +1,100 @@
+import functools
+import io
+import json
+import os
+import tarfile
+import tempfile
+import threading
+import unittest
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from merge_test_matrix import (
+    collect_test_results,
+    glob_sources,
+    resolve_sources,
+    url_sources,
+)
+from .test_data import INITIAL_TEST_RESULTS
+
+
+def create_tarball(path, data):
+    """ Create a tarball which contains an initial test result
+    """
+    content = json.dumps(data).encode("utf-8")
+    with tarfile.open(path, mode="w:gz") as tar:
+        info = tarfile.TarInfo(
+            "{}/{}-initial-test.json".format(data["SKU"], data["SKU"])
+        )
+        info.size = len(content)
+        tar.addfile(info, io.BytesIO(content))
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class SourcesTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp_dir.cleanup)
+        self.names = []
+        for data in reversed(INITIAL_TEST_RESULTS):
+            name = "{}.tar.gz".format(data["SKU"])
+            create_tarball(os.path.join(self._tmp_dir.name, name), data)
+            self.names.append(name)
+
+    def _skus(self, test_results):
+        return [data["SKU"] for data in test_results]
+
+    def test_local_dir(self):
+        """ Should load all tarballs in the folder and sort them by SKU
+        """
+        sources = resolve_sources([self._tmp_dir.name], ".tar.gz")
+        self.assertEqual(
+            ["SKU1", "SKU2"], self._skus(collect_test_results(sources))
+        )
+
+    def test_glob(self):
+        """ Should only load the tarballs matched by the pattern
+        """
+        sources = glob_sources(os.path.join(self._tmp_dir.name, "*1.tar.gz"))
+        self.assertEqual(["SKU1"], self._skus(collect_test_results(sources)))
+
+    def test_stdin_list(self):
+        """ Should read one source per line from stdin
+        """
+        paths = "\n".join(
+            os.path.join(self._tmp_dir.name, name) for name in self.names
+        )
+        with patch("sys.stdin", io.StringIO(paths + "\n\n")):
+            sources = resolve_sources(["-"], ".tar.gz")
+        self.assertEqual(2, len(sources))
+        self.assertEqual(
+            ["SKU1", "SKU2"], self._skus(collect_test_results(sources))
+        )
+
+    def test_http_urls(self):
+        """ Should stream the tarballs from an HTTP server and skip the
+            tarball which cannot be downloaded
+        """
+        handler = functools.partial(
+            _QuietHandler, directory=self._tmp_dir.name
+        )
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        base_url = "http://127.0.0.1:{}".format(server.server_address[1])
+        urls = ["{}/{}".format(base_url, name) for name in self.names]
+        urls.append("{}/not-exist.tar.gz".format(base_url))
+
+        test_results = collect_test_results(url_sources(urls), jobs=2)
+        self.assertEqual(["SKU1", "SKU2"], self._skus(test_results))
+
+
+if __name__ == "__main__":
+    unittest.main()
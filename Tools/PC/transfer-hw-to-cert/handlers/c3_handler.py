@@ -1,45 +1,137 @@
 import os
 
 from C3.apis.base import C3API, C3Location
+from C3.utils.cache import ResponseCache
 from utils.common import parse_location
+from utils.journal import C3_RETURN, C3_UPDATE, payload_hash
+
+# The DUTs looked up on C3 during a run, the updates of a DUT drop its
+# cached responses
+C3_CACHE = ResponseCache(ttl=30)
 
 
 def init_c3_api() -> object:
-    c3 = C3API() if os.path.exists('./configs/production_c3.txt') \
-        else C3API(
-        base_url='https://certification.staging.canonical.com/api/v1/hardware')
+    if os.path.exists('./configs/production_c3.txt'):
+        return C3API(cache=C3_CACHE)
+    return C3API(
+        base_url='https://certification.staging.canonical.com/api/v1/hardware',
+        cache=C3_CACHE)
+
+
+class BulkUpdateError(Exception):
+    """ Some DUTs are failed to update, results has the result of each DUT
+    """
+    def __init__(self, message: str, results: list[dict]):
+        super().__init__(message)
+        self.results = results
+
+
+def _check_bulk_results(results: list[dict]) -> list[dict]:
+    """ Print the result of each DUT, and raise an exception after all DUTs
+        are updated if any of them is failed
+    """
+    failed = []
+    for r in results:
+        if r['ok']:
+            print(f"Updated {r['cid']}")
+        else:
+            print(f"Failed to update {r['cid']}. Reason: {r['error']}")
+            failed.append(r['cid'])
+    if failed:
+        raise BulkUpdateError(
+            f"Error: update failed for {len(failed)} of {len(results)} "
+            f"DUTs: {', '.join(failed)}", results)
+    return results
+
+
+def build_dut_payload(dut: dict, new_holder: str) -> dict:
+    """ The payload to update the holder and location of DUT on C3
+    """
+    return {
+        'holder': new_holder,
+        'location': C3Location[
+            parse_location(dut['location'])['Lab'].replace('-', '_')].value
+    }
+
+
+def build_returned_dut_payload(status: str) -> dict:
+    """ The payload to update the location and status of returned DUT on C3
+    """
+    return {
+        'location': C3Location.Return.value,
+        'status': status,
+    }
 
-    return c3
 
+def _update_duts(payloads: dict, journal=None, step: str = '') -> list[dict]:
+    """ Update the DUTs not in the journal, and record the updated ones
 
-def update_duts_info_on_c3(data: list[dict], new_holder: str):
+        A DUT is in the journal only if it's updated with the same payload,
+        so the DUT whose payload is changed since previous run is updated.
+
+        @return: the result of each DUT, the DUTs in the journal are ok and
+                 skipped
+    """
+    skipped = []
+    if journal is not None:
+        skipped = [
+            cid for cid, payload in payloads.items()
+            if journal.result(step, cid) == payload_hash(payload)
+        ]
+        payloads = {
+            cid: payload for cid, payload in payloads.items()
+            if cid not in skipped
+        }
+    if skipped:
+        print(f"Skip {', '.join(skipped)} since they're updated")
+
+    results = []
+    if payloads:
+        print(f"Updating {', '.join(payloads)}")
+        results = init_c3_api().update_duts_bulk(payloads)
+        if journal is not None:
+            for r in results:
+                if r['ok']:
+                    journal.record(
+                        step, r['cid'], payload_hash(payloads[r['cid']]))
+    results.extend(
+        {
+            'cid': cid,
+            'ok': True,
+            'status_code': None,
+            'error': None,
+            'response': None,
+            'skipped': True
+        } for cid in skipped)
+    return _check_bulk_results(results)
+
+
+def update_duts_info_on_c3(data: list[dict], new_holder: str,
+                           journal=None) -> list[dict]:
     """ Update DUTS' information on C3 webstie
         Currently, we update the holder and location
+
+        @param:journal, skip the DUTs updated by previous run in the Journal
+                        and record the updated DUTs to it
+
+        @return: the result of each DUT, see C3API.update_duts_bulk
     """
-    c3 = init_c3_api()
-    for dut in data:
-        payload = {
-            'holder': new_holder,
-            'location': C3Location[
-                parse_location(dut['location'])['Lab'].replace('-', '_')].value
-        }
-        print(f"Updating {dut['cid']}")
-        res = c3.update_dut_by_cid(cid=dut['cid'], payload=payload)
-        if res.status_code < 200 or res.status_code > 299:
-            raise Exception('Error: update failed')
+    payloads = {
+        dut['cid']: build_dut_payload(dut, new_holder) for dut in data
+    }
+    return _update_duts(payloads, journal, C3_UPDATE)
 
 
-def update_returned_duts_info_on_c3(data: list[dict], status: str):
+def update_returned_duts_info_on_c3(data: list[dict], status: str,
+                                    journal=None) -> list[dict]:
     """ Update DUTS' information on C3 website
         For the returned DUTs, we update the location and the status
+
+        @param:journal, see update_duts_info_on_c3
+
+        @return: the result of each DUT, see C3API.update_duts_bulk
     """
-    c3 = init_c3_api()
-    for dut in data:
-        payload = {
-            'location': C3Location.Return.value,
-            'status': status,
-        }
-        print(f"Updating {dut['cid']}")
-        res = c3.update_dut_by_cid(cid=dut['cid'], payload=payload)
-        if res.status_code < 200 or res.status_code > 299:
-            raise Exception('Error: update failed')
+    payloads = {
+        dut['cid']: build_returned_dut_payload(status) for dut in data
+    }
+    return _update_duts(payloads, journal, C3_RETURN)
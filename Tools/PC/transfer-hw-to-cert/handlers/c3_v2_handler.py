@@ -1,4 +1,14 @@
+""" The C3 handler on the C3 relay service, which links the DUTs to the
+    labresources of C3 v2
+
+    main.py and qa_pipeline.py still use handlers.c3_handler on the C3 v1
+    API, since the relay service (modules.c3_relay_service) isn't shipped
+    with this tool and has no journal support yet.
+"""
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 from modules.c3_relay_service.relay_service import (
     convert_to_c3_location_status,
     get_labresource_list,
@@ -10,6 +20,36 @@ from modules.c3_relay_service.relay_service import (
 )
 from utils.common import parse_location
 
+# The max number of DUTs updated at the same time
+MAX_WORKERS = 8
+# Only query the labresources in TEL-L4 and TEL-L10
+LABRESOURCE_POSITION = LabPosition("TEL-L4,TEL-L10", None, 0, 0)
+# The labresource list is shared by the workers, and detach_labresource
+# isn't known to be thread-safe on it
+_detach_lock = threading.Lock()
+
+
+def _detach_labresource(cid: str, labresources: list) -> dict:
+    with _detach_lock:
+        return detach_labresource(cid, labresources)
+
+
+def _update_duts(update_dut, data: list[dict]) -> list[str]:
+    """ Run update_dut for each DUT with bounded concurrency, a failed DUT
+        doesn't stop the others
+
+        :returns: the CIDs failed with an exception
+    """
+    def run(dut):
+        try:
+            update_dut(dut)
+        except Exception as e:
+            logging.error(f"update CID:{dut['cid']} failed: {repr(e)}")
+            return dut["cid"]
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        return [cid for cid in executor.map(run, data) if cid]
+
 
 def update_duts_info_on_c3(data: list[dict], new_holder: str):
     """
@@ -20,16 +60,16 @@ def update_duts_info_on_c3(data: list[dict], new_holder: str):
 
     :new_holder: holder launchpad name
 
-    :returns: None
+    :returns: the CIDs failed with an exception
     """
-    # limit the query in the TEL-L4 and TEL-L10
-    pos = LabPosition("TEL-L4,TEL-L10", None, 0, 0)
-    labresources = get_labresource_list(pos, "DUT")
-    for dut in data:
+    # The labresources are listed once for all DUTs
+    labresources = get_labresource_list(LABRESOURCE_POSITION, "DUT")
+
+    def update_dut(dut):
         cid = dut["cid"]
         logging.info(f"Updating {cid}")
         # detach labresource
-        resp = detach_labresource(cid, labresources)
+        resp = _detach_labresource(cid, labresources)
         if resp["canonical_id"]:
             logging.error(f"detach labresource from CID:{cid} failed")
         loc = parse_location(dut["location"])
@@ -55,6 +95,8 @@ def update_duts_info_on_c3(data: list[dict], new_holder: str):
             except AttributeError as e:
                 logging.error(f"position:[{pos}] error:{repr(e)}")
 
+    return _update_duts(update_dut, data)
+
 
 def update_returned_duts_info_on_c3(data: list[dict], status: str):
     """
@@ -65,16 +107,16 @@ def update_returned_duts_info_on_c3(data: list[dict], status: str):
 
     :status: status (useless, it should be removed after C3 V1 API deprecated)
 
-    :returns: None
+    :returns: the CIDs failed with an exception
     """
-    # limit the query in the TEL-L4 and TEL-L10
-    pos = LabPosition("TEL-L4,TEL-L10", None, 0, 0)
-    labresources = get_labresource_list(pos, "DUT")
-    for dut in data:
+    # The labresources are listed once for all DUTs
+    labresources = get_labresource_list(LABRESOURCE_POSITION, "DUT")
+
+    def update_dut(dut):
         cid = dut["cid"]
         logging.info(f"Updating {cid}")
         # detach labresource
-        resp = detach_labresource(cid, labresources)
+        resp = _detach_labresource(cid, labresources)
         if resp["canonical_id"]:
             logging.error(f"detach labresource from CID:{cid} failed")
         else:
@@ -87,3 +129,5 @@ def update_returned_duts_info_on_c3(data: list[dict], status: str):
                     logging.error(f"update status:[{status}] failed")
             except AttributeError as e:
                 logging.error(f"position:[{pos}] error:{repr(e)}")
+
+    return _update_duts(update_dut, data)
@@ -1,11 +1,18 @@
+import os
+import random
+import time
+
 from utils.common import (
     is_valid_cid,
     is_valid_location,
     read_json_config,
     parse_location
 )
+from utils.sheet_mirror import SheetMirror
+from utils.table_index import TableIndex, location_of, pad_rows
 
 from GoogleSheet.google_sheet_api import GoogleSheetOperator
+from GoogleSheet.write_buffer import SheetWriteBuffer
 
 """
     This python script handles the procedure of filling the DUT's information
@@ -13,6 +20,24 @@ from GoogleSheet.google_sheet_api import GoogleSheetOperator
 """
 
 GOOGLE_SHEET_CONF = read_json_config('./configs/google_sheet_link.json')
+# The local snapshot of the Cert Lab Google Sheet, it's downloaded again only
+# when the sheet has been modified
+SHEET_MIRROR_PATH = os.environ.get(
+    'CERT_LAB_SHEET_MIRROR',
+    os.path.expanduser('~/.cache/transfer-hw-to-cert/cert_lab_sheet.json')
+)
+# The times to read, check and write the sheet if the target cells are
+# changed by others meanwhile
+MAX_WRITE_ATTEMPTS = 3
+WRITE_RETRY_DELAY = (1, 3)
+
+
+class SheetWriteConflict(Exception):
+    """ The target cells are changed after the sheet was read
+    """
+    def __init__(self, conflicts: list):
+        self.conflicts = conflicts
+        super().__init__(f"Error: the target cells are changed: {conflicts}")
 
 
 def create_google_sheet_instance():
@@ -70,9 +95,12 @@ def is_valid_input_data(data: list[dict]) -> tuple[bool, list]:
     return not len(invalid_list), invalid_list
 
 
-def get_sheet_data() -> dict:
+def get_sheet_data(use_mirror: bool = True) -> dict:
     """ Get the data from Google Sheet and generate the customized dictionary
 
+        @param:use_mirror, read the local snapshot of the sheet if the sheet
+                           hasn't been modified since it was downloaded
+
         @reutrn: return a customized dictionary which contains the index of
                 header and the indexed_table.
 
@@ -83,6 +111,7 @@ def get_sheet_data() -> dict:
             # indexed_table: use the location as key to build an hash table,
                              there are some values can help us find the target
                              cell quickly.
+            # cid_index: the location of each CID in the indexed_table
 
             { 'TEL-L5': {
                 'headers': {
@@ -101,6 +130,10 @@ def get_sheet_data() -> dict:
                         'CID': '202304-23456',
                         'Certified_OEM_Image': '',
                         'row_index': 3},
+                },
+                'cid_index': {
+                    '202112-39487': 'TEL-L5-F01-S1-P1',
+                    '202304-23456': 'TEL-L5-F01-S1-P2'
                 }
             }
     """
@@ -110,39 +143,53 @@ def get_sheet_data() -> dict:
     wanted_headers = [
         'CID', 'Certified_OEM_Image', 'Lab', 'Frame', 'Shelf', 'Partition']
 
+    offset = 2  # offest is the bias of start row number at google sheet
+
+    # Get the header and data of all tables by one request
     # t is TEL-L3, TEL-L5 or TEL-L6
+    reader = SheetMirror(gs_obj, SHEET_MIRROR_PATH) if use_mirror else gs_obj
+    ranges_data = reader.get_ranges_data(
+        [r for t in GOOGLE_SHEET_CONF['tables']
+         for r in (f'{t}!1:1', f'{t}!A{offset}:Z')],
+        major_dimension="ROWS")
+
     for t in GOOGLE_SHEET_CONF['tables']:
-        sheet_data[t] = {}
         # Get the first row (a.k.a header), such as CID, Lab, Frame ...
-        headers = gs_obj.get_range_data(f'{t}!1:1', major_dimension="ROWS")
-        # Generate the mapping of headers
-        columns = {}
-        for wh in wanted_headers:
-            columns[wh] = headers[0].index(wh)
-        sheet_data[t]['headers'] = columns
-
-        # Get data without header
-        offset = 2  # offest is the bias of start row number at google sheet
-        data = gs_obj.get_range_data(
-            f'{t}!A{offset}:Z', major_dimension="ROWS")
-
-        # Build the indexed table (indexed by Location)
-        indexed_table = {}
-        for idx, v in enumerate(data):
-            location = (
-                f"{v[columns['Lab']]}-{v[columns['Frame']]}-"
-                f"{'S' + v[columns['Shelf']]}-{'P' + v[columns['Partition']]}"
-            )
-            indexed_table[location] = {
-                'row_index': idx + offset,
-                'CID': v[columns['CID']],
-                'Certified_OEM_Image': v[columns['Certified_OEM_Image']]
-            }
-        sheet_data[t]['indexed_table'] = indexed_table
+        headers = ranges_data[f'{t}!1:1']
+        # Build the mapping of headers and the indexed table (indexed by
+        # Location and CID) from the data without header
+        index = TableIndex(
+            headers[0], ranges_data[f'{t}!A{offset}:Z'], wanted_headers,
+            offset)
+        sheet_data[t] = {
+            'headers': index.columns,
+            'indexed_table': index.by_location,
+            'cid_index': index.by_cid
+        }
 
     return sheet_data
 
 
+def find_location_by_cid(cid: str, sheet_data: dict) -> tuple:
+    """ Find the DUT of cid in all tables
+
+        @param:sheet_data, a dictionary which is from get_sheet_data function
+
+        @return: (table, location, record), or (None, None, None) if the CID
+                 is not on the sheet
+            e.g.
+                ('TEL-L5', 'TEL-L5-F01-S1-P1', {
+                    'CID': '202112-39487',
+                    'Certified_OEM_Image': '',
+                    'row_index': 2})
+    """
+    for table, table_data in sheet_data.items():
+        location = table_data['cid_index'].get(cid)
+        if location:
+            return table, location, table_data['indexed_table'][location]
+    return None, None, None
+
+
 def are_candidated_sheet_cells_empty(
         data: list[dict], sheet_data: dict) -> tuple[bool, list]:
     """ Check the cells are empty on Cert Lab Google Sheet
@@ -196,7 +243,53 @@ def are_candidated_sheet_cells_empty(
     return all_empty, non_empty_list
 
 
-def fill_in_google_sheet(data: list[dict], sheet_data: dict) -> bool:
+def find_changed_rows(gs_obj, data: list[dict], sheet_data: dict) -> list:
+    """ Read the target rows again by one request and compare them with
+        sheet_data, which was read before
+
+        @param:gs_obj, the GoogleSheetOperator of Cert Lab Google Sheet
+        @param:data, see fill_in_google_sheet
+        @param:sheet_data, a dictionary which is from get_sheet_data function
+
+        @return: the changed rows. A row is changed if it's not the location
+                 any more, e.g. rows are inserted above it, or its CID or
+                 Certified_OEM_Image is changed.
+    """
+    targets = {}
+    for d in data:
+        table = parse_location(d['location'])['Lab']
+        row_index = sheet_data[table]['indexed_table'][d['location']][
+            'row_index']
+        targets[f'{table}!A{row_index}:Z{row_index}'] = (table, d)
+
+    ranges_data = gs_obj.get_ranges_data(list(targets), major_dimension="ROWS")
+
+    changed_rows = []
+    for data_range, (table, d) in targets.items():
+        headers = sheet_data[table]['headers']
+        expected = sheet_data[table]['indexed_table'][d['location']]
+        row = pad_rows(
+            ranges_data.get(data_range) or [[]],
+            max(headers.values()) + 1)[0]
+        location = location_of(
+            row[headers['Lab']], row[headers['Frame']],
+            row[headers['Shelf']], row[headers['Partition']])
+        if (
+            location != d['location']
+            or row[headers['CID']] != expected['CID']
+            or row[headers['Certified_OEM_Image']]
+            != expected['Certified_OEM_Image']
+        ):
+            changed_rows.append({
+                'location': d['location'],
+                'range': data_range,
+                'CID': row[headers['CID']]
+            })
+    return changed_rows
+
+
+def fill_in_google_sheet(data: list[dict], sheet_data: dict,
+                         conditional: bool = False) -> bool:
     """ Fill the data in the Google Sheet
 
         @param:data, a list contains the bunch of dictionary data, each
@@ -216,10 +309,21 @@ def fill_in_google_sheet(data: list[dict], sheet_data: dict) -> bool:
                             }
                         ]
         @param:sheet_data, a dictionary which is from get_sheet_data function
+        @param:conditional, read the target rows again right before writing,
+                            and raise SheetWriteConflict without writing if
+                            they're changed since sheet_data was read
+
+        The cells are written by a SheetWriteBuffer, which sends them by a
+        few batchUpdate calls, and the error of the first failed call is
+        raised.
     """
     gs_obj = create_google_sheet_instance()
-    batch_update_data = []
+    if conditional:
+        changed_rows = find_changed_rows(gs_obj, data, sheet_data)
+        if changed_rows:
+            raise SheetWriteConflict(changed_rows)
 
+    buffer = SheetWriteBuffer(gs_obj, flush_interval=None)
     for d in data:
         table = parse_location(d['location'])['Lab']
         headers = sheet_data[table]['headers']
@@ -227,22 +331,24 @@ def fill_in_google_sheet(data: list[dict], sheet_data: dict) -> bool:
         row_index = indexed_table[d['location']]['row_index']
         cid_column_chr = chr(65 + headers['CID'])
         gm_image_link_chr = chr(65 + headers['Certified_OEM_Image'])
-        # append cid data who is to be filled in
+        # queue cid data who is to be filled in
         cid_data = {
             'range': f'{table}!{cid_column_chr}{row_index}',
             'values': [[d['cid']]]
         }
-        batch_update_data.append(cid_data)
 
-        # append gm_image_link_data data who is to be filled in
+        # queue gm_image_link_data data who is to be filled in
         gm_image_link_data = {
             'range': f'{table}!{gm_image_link_chr}{row_index}',
             'values': [[d['gm_image_link']]]
         }
-        batch_update_data.append(gm_image_link_data)
+        buffer.update_range_data([cid_data, gm_image_link_data])
+    buffer.close()
 
-    res = gs_obj.update_range_data(data=batch_update_data)
-    print(res)
+    failed = [r for r in buffer.reports if not r['ok']]
+    if failed:
+        raise failed[0]['error']
+    print(f"{len(buffer.reports)} cells are filled in the Google Sheet")
 
 
 def update_cert_lab_google_sheet(data: list[dict]) -> dict:
@@ -276,23 +382,32 @@ def update_cert_lab_google_sheet(data: list[dict]) -> dict:
             f"Error: input data is invalid. Invalid data list: {invalid_list}"
         )
 
-    # Get Google Sheet data
-    sheet_data = get_sheet_data()
+    for attempt in range(1, MAX_WRITE_ATTEMPTS + 1):
+        # Get Google Sheet data, don't trust the snapshot after a conflict
+        sheet_data = get_sheet_data(use_mirror=attempt == 1)
 
-    # Check those cells are empty
-    empty, non_empty_list = are_candidated_sheet_cells_empty(
-        data,
-        sheet_data
-    )
-
-    if not empty:
-        raise Exception(
-            f"Error: some cells aren't empty. Non empty list: {non_empty_list}"
+        # Check those cells are empty
+        empty, non_empty_list = are_candidated_sheet_cells_empty(
+            data,
+            sheet_data
         )
 
-    # fill the data to google sheet
-    response = fill_in_google_sheet(data, sheet_data)
-    return response
+        if not empty:
+            raise Exception(
+                "Error: some cells aren't empty. "
+                f"Non empty list: {non_empty_list}"
+            )
+
+        # fill the data to google sheet if the cells are still the same,
+        # so the jobs transferring DUTs at the same time don't overwrite
+        # each other
+        try:
+            return fill_in_google_sheet(data, sheet_data, conditional=True)
+        except SheetWriteConflict as e:
+            if attempt == MAX_WRITE_ATTEMPTS:
+                raise
+            print(f"{e}, retry ({attempt}/{MAX_WRITE_ATTEMPTS - 1})")
+            time.sleep(random.uniform(*WRITE_RETRY_DELAY))
 
 
 if __name__ == '__main__':
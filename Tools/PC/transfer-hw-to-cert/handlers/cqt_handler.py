@@ -5,6 +5,11 @@
 import json
 
 from Jira.apis.base import JiraAPI
+from Jira.utils.cache import ResponseCache
+
+# The same card is read by get_content_from_a_jira_card and
+# get_result_table_from_a_jira_card, fetch it once in a short while
+JIRA_CARD_CACHE = ResponseCache(ttl=30)
 
 
 def get_content_from_a_jira_card(key: str) -> dict:
@@ -147,7 +152,7 @@ def api_get_jira_card(key: str) -> tuple[dict, str]:
             @parsed, the respone returned from Jira API.
             @field, the 'Test reulst' field in specific Jira project.
     """
-    jira_api = JiraAPI()
+    jira_api = JiraAPI(cache=JIRA_CARD_CACHE)
     payload = {
         'jql':
         f"project = {jira_api.jira_project['key']} AND issuekey = \"{key}\"",
@@ -1,7 +1,44 @@
-import requests
 import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 HIC_URL = 'http://10.102.180.14:5000'
+# The CID at the end of the SKU name. e.g. Varc-PV-SKU6-1_202302-31212
+SKU_CID_PATTERN = re.compile(r'_(\d{6}-\d{5})$')
+# The max number of deletions sent at the same time
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF_FACTOR = 0.5
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """ Get the session shared in this process, which keeps the connections
+        to HIC alive and retries the failed requests
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=RETRY_BACKOFF_FACTOR,
+                status_forcelist=(500, 502, 503, 504),
+                allowed_methods=('GET',)
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1, pool_maxsize=MAX_WORKERS,
+                max_retries=retry)
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
 
 
 def query_database() -> dict:
@@ -15,10 +52,7 @@ def query_database() -> dict:
     """
     mapping = {}
     try:
-        response = requests.request(
-            'GET',
-            f'{HIC_URL}/q'
-        )
+        response = get_session().get(f'{HIC_URL}/q')
         if response.status_code < 200 or response.status_code > 299:
             response.raise_for_status()
         return response.json()
@@ -29,6 +63,48 @@ def query_database() -> dict:
     return mapping
 
 
+def build_cid_index(mapping: dict) -> dict:
+    """ Build the reverse index of the mapping from query_database
+
+        @return, a dictionary whose key is CID
+            {
+                "202302-31212": {
+                    "sku_name": "Varc-PV-SKU6-1_202302-31212",
+                    "mac_addresses": ["48:9e:bd:ea:d3:d4"]
+                }
+            }
+    """
+    index = {}
+    for mac, sku_name in mapping.items():
+        match = SKU_CID_PATTERN.search(sku_name)
+        if not match:
+            continue
+        dut = index.setdefault(
+            match.group(1), {'sku_name': sku_name, 'mac_addresses': []})
+        dut['mac_addresses'].append(mac)
+    return index
+
+
+def _find_dut_by_substring(cid: str, mapping: dict) -> dict:
+    """ Find the DUT whose SKU name contains cid anywhere, for the SKU names
+        not indexed by build_cid_index, e.g. TRM-DVT1_202304-31528_rework
+
+        @return, the DUT like the values of build_cid_index, or None
+    """
+    dut = None
+    for mac, sku_name in mapping.items():
+        if cid in sku_name:
+            if dut is None:
+                dut = {'sku_name': sku_name, 'mac_addresses': []}
+            dut['mac_addresses'].append(mac)
+    return dut
+
+
+def _delete_mac(mac: str):
+    response = get_session().get(f'{HIC_URL}/d?db=sku&k={mac}')
+    response.raise_for_status()
+
+
 def delete_duts(cids: list[str]) -> None:
     """ Remove DUTs from HIC site
 
@@ -42,23 +118,18 @@ def delete_duts(cids: list[str]) -> None:
     # Query database to get whole records
     mapping = query_database()
 
+    cid_index = build_cid_index(mapping)
     duts = []
     for cid in cids:
-        temp_d = {
-            'sku_name': '',
-            'mac_addresses': []
-        }
-        # Find designated DUT from mapping
-        # Get its mac addresses into temp_d
-        for k, v in mapping.items():
-            if cid in v:
-                temp_d['sku_name'] = v
-                temp_d['mac_addresses'].append(k)
-        if not temp_d['sku_name']:
+        # Find designated DUT and its mac addresses from the index, or scan
+        # the SKU names whose CID is not at the end
+        dut = cid_index.get(cid) or _find_dut_by_substring(cid, mapping)
+        if not dut:
             print(f"Ignore {cid} since there\'s no record on HIC")
             continue
-        if temp_d['sku_name']:
-            duts.append(temp_d)
+        if cid not in cid_index:
+            print(f"Found {cid} in the SKU name {dut['sku_name']}")
+        duts.append(dut)
 
     if len(duts) == 0:
         print('All of the following DUTs have been removed')
@@ -68,19 +139,15 @@ def delete_duts(cids: list[str]) -> None:
     print('Will remove the following DUTs from HIC...')
     print(json.dumps(duts, indent=2))
 
+    targets = [(d, mac) for d in duts for mac in d['mac_addresses']]
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(_delete_mac, mac) for _, mac in targets]
+
     success = 1
-    for d in duts:
-        for mac in d['mac_addresses']:
-            try:
-                response = requests.request(
-                    'GET',
-                    f'{HIC_URL}/d?db=sku&k={mac}'
-                )
-                if response.status_code < 200 or response.status_code > 299:
-                    response.raise_for_status()
-            except Exception as e:
-                success = 0
-                print(f"Error: Unable to remove {d['sku_name']} ({mac})")
-                print(e)
+    for (d, mac), future in zip(targets, futures):
+        if future.exception():
+            success = 0
+            print(f"Error: Unable to remove {d['sku_name']} ({mac})")
+            print(future.exception())
     if not success:
         print('Error: Some DUTs cannot be removed from HIC!')
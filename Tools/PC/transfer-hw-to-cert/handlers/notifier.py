@@ -4,6 +4,9 @@ from Jira.templates.bot_comment import generate_bot_message
 
 def add_comment(comment_type: str, key: str, data: dict) -> None:
     """ Add comment to specific Jira issue
+
+        @param:data, the jenkins_job_link and the optional report, which is
+                     a list of lines
     """
     jira_api = JiraAPI()
 
@@ -28,6 +31,12 @@ def add_comment(comment_type: str, key: str, data: dict) -> None:
             }
         ]
     }]
+    # The lines of result report, e.g. from qa_pipeline.format_report
+    for line in data.get('report', []):
+        my_content.append({
+            'type': 'paragraph',
+            'content': [{'type': 'text', 'text': line}]
+        })
 
     title_type = 'Successful' if comment_type == 'success' else 'Failed'
     comment_content = generate_bot_message(
@@ -0,0 +1,94 @@
+'''
+    The planner of transfer-hw-to-cert
+
+    It computes the API calls of a run without sending them. The steps done
+    by previous run, which are in the journal, are not planned.
+'''
+from handlers.c3_handler import build_dut_payload, build_returned_dut_payload
+from utils.journal import (
+    C3_RETURN,
+    C3_UPDATE,
+    TELOPS_CREATE,
+    TELOPS_TRANSITION,
+    payload_hash,
+)
+
+
+def _call(service: str, method: str, target: str, payload: dict) -> dict:
+    return {
+        'service': service,
+        'method': method,
+        'target': target,
+        'payload': payload
+    }
+
+
+def plan_qa_process(cqt_card: str, card_data: dict, new_holder: str,
+                    journal) -> list[dict]:
+    """ Plan the API calls of qa_process
+
+        @param:cqt_card, the key of the CQT card. e.g. CQT-1234
+        @param:card_data, the validated data from get_candidate_duts
+        @param:new_holder, the DUT holder on C3
+        @param:journal, the Journal of cqt_card
+
+        @return: the API calls
+            e.g.
+                [
+                    {
+                        'service': 'C3',
+                        'method': 'PATCH',
+                        'target': '202304-12345',
+                        'payload': {'holder': 'kevinyeh', 'location': 22}
+                    },
+                    {
+                        'service': 'TELOPS',
+                        'method': 'POST',
+                        'target': 'create card of 202304-12345',
+                        'payload': {
+                            'summary': 'CID#202304-12345 transferred to ...',
+                            'link': 'CQT-1234'
+                        }
+                    },
+                    {
+                        'service': 'TELOPS',
+                        'method': 'POST',
+                        'target': 'transition card of 202304-12345',
+                        'payload': {'transition': 'To Do Cert LAB'}
+                    }
+                ]
+    """
+    calls = []
+    for dut in card_data['data']:
+        payload = build_dut_payload(dut, new_holder)
+        if journal.result(C3_UPDATE, dut['cid']) != payload_hash(payload):
+            calls.append(_call('C3', 'PATCH', dut['cid'], payload))
+
+    transition = {'transition': 'To Do Cert LAB'}
+    for dut in card_data['data']:
+        cid = dut['cid']
+        key = journal.result(TELOPS_CREATE, cid)
+        if not journal.done(TELOPS_CREATE, cid):
+            calls.append(_call(
+                'TELOPS', 'POST', f'create card of {cid}', {
+                    'summary': f'CID#{cid} transferred to Cert Lab',
+                    'link': cqt_card
+                }))
+            calls.append(_call(
+                'TELOPS', 'POST', f'transition card of {cid}', transition))
+        elif not journal.done(TELOPS_TRANSITION, key):
+            calls.append(_call(
+                'TELOPS', 'POST', f'transition {key}', transition))
+    return calls
+
+
+def plan_returned_process(cid_list: list[str], status: str,
+                          journal) -> list[dict]:
+    """ Plan the API calls of returned_process, see plan_qa_process
+    """
+    payload = build_returned_dut_payload(status)
+    return [
+        _call('C3', 'PATCH', cid, payload)
+        for cid in cid_list
+        if journal.result(C3_RETURN, cid) != payload_hash(payload)
+    ]
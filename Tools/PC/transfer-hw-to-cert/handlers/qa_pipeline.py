@@ -0,0 +1,150 @@
+'''
+    The pipeline of QA procedure
+
+    The C3 update and the TELOPS card creation don't depend on each other
+    once the DUTs are validated, so they run at the same time. The result of
+    both is collected to a report for the bot comment.
+'''
+from concurrent.futures import ThreadPoolExecutor
+
+from handlers.c3_handler import BulkUpdateError, update_duts_info_on_c3
+from handlers.telops_handler import (
+    CardCreationError,
+    create_send_dut_to_cert_card_in_telops
+)
+
+
+def _stage_report(items: list[dict] = [], error: Exception = None) -> dict:
+    return {
+        'ok': error is None,
+        'error': None if error is None else str(error),
+        'items': items
+    }
+
+
+def run_c3_stage(data: list[dict], new_holder: str, journal=None) -> dict:
+    """ Update the holder and location of DUTs on C3
+
+        @return: the report of stage, each item is the result of a DUT
+    """
+    try:
+        results = update_duts_info_on_c3(
+            data=data, new_holder=new_holder, journal=journal)
+    except BulkUpdateError as e:
+        results, error = e.results, e
+    except Exception as e:
+        return _stage_report(error=e)
+    else:
+        error = None
+    items = [
+        {
+            'name': r['cid'],
+            'ok': r['ok'],
+            'error': None if r['ok'] else str(r['error'])
+        } for r in results
+    ]
+    return _stage_report(items, error)
+
+
+def run_telops_stage(cqt_card: str, card_data: dict, journal=None) -> dict:
+    """ Create the cards of DUTs to TELOPS board
+
+        @return: the report of stage, each item is a created card
+    """
+    try:
+        keys = create_send_dut_to_cert_card_in_telops(
+            cqt_card=cqt_card,
+            description_original_data=card_data['description_original_data'],
+            assignee_original_id=card_data['assignee_original_id'],
+            data=card_data['data'],
+            journal=journal,
+        )
+    except CardCreationError as e:
+        keys, error = e.created_keys, e
+    except Exception as e:
+        return _stage_report(error=e)
+    else:
+        error = None
+    items = [{'name': k, 'ok': True, 'error': None} for k in keys]
+    return _stage_report(items, error)
+
+
+def run_qa_process(cqt_card: str, card_data: dict, new_holder: str,
+                   journal=None) -> dict:
+    """ Update C3 and create the TELOPS cards at the same time
+
+        @param:cqt_card, the key of the CQT card. e.g. CQT-1234
+        @param:card_data, the validated data from get_candidate_duts
+        @param:new_holder, the DUT holder on C3
+        @param:journal, the Journal of cqt_card to skip the steps done by
+                        previous run
+
+        @return: the report of stages
+            e.g.
+                {
+                    'ok': False,
+                    'stages': {
+                        'C3': {
+                            'ok': False,
+                            'error': 'Error: update failed for 1 of 2 ...',
+                            'items': [
+                                {
+                                    'name': '202304-12345',
+                                    'ok': False,
+                                    'error': '404 Not Found'
+                                },
+                                ...
+                            ]
+                        },
+                        'TELOPS': {
+                            'ok': True,
+                            'error': None,
+                            'items': [
+                                {
+                                    'name': 'TELOPS-123',
+                                    'ok': True,
+                                    'error': None
+                                }
+                            ]
+                        }
+                    }
+                }
+    """
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            'C3': executor.submit(
+                run_c3_stage, card_data['data'], new_holder, journal),
+            'TELOPS': executor.submit(
+                run_telops_stage, cqt_card, card_data, journal),
+        }
+        stages = {name: f.result() for name, f in futures.items()}
+    return {
+        'ok': all(stage['ok'] for stage in stages.values()),
+        'stages': stages
+    }
+
+
+def format_report(report: dict) -> list[str]:
+    """ The lines of report for the bot comment
+
+        e.g.
+            [
+                'C3: 1 succeeded (202304-12346)',
+                '- 202304-12345: 404 Not Found',
+                'TELOPS: 1 succeeded (TELOPS-123)'
+            ]
+    """
+    lines = []
+    for name, stage in report['stages'].items():
+        items = stage['items']
+        succeeded = [i['name'] for i in items if i['ok']]
+        summary = f"{name}: {len(succeeded)} succeeded"
+        if succeeded:
+            summary += f" ({', '.join(succeeded)})"
+        lines.append(summary)
+        lines.extend(
+            f"- {i['name']}: {i['error']}" for i in items if not i['ok'])
+        # The stage is failed but not by any item, e.g. the API is down
+        if not stage['ok'] and all(i['ok'] for i in items):
+            lines.append(f"- {stage['error']}")
+    return lines
@@ -5,14 +5,25 @@
 import json
 
 from Jira.apis.base import JiraAPI
+from utils.journal import TELOPS_CREATE, TELOPS_TRANSITION
+
+
+class CardCreationError(Exception):
+    """ Some cards are failed to create, created_keys has the keys of the
+        cards created
+    """
+    def __init__(self, message: str, created_keys: list = None):
+        super().__init__(message)
+        self.created_keys = list(created_keys or [])
 
 
 def create_send_dut_to_cert_card_in_telops(
         cqt_card: str,
         description_original_data: object,
         assignee_original_id: object,
-        data: list
-        ) -> None:
+        data: list,
+        journal=None
+        ) -> list[str]:
     """ Create card to TELOPS board for contractor using, the type of card is
         "DUT Send To Cert"
 
@@ -29,9 +40,27 @@ def create_send_dut_to_cert_card_in_telops(
                         'Location': ''
                     },
                 ]
+
+        @param:journal, skip the cards created and moved by previous run in
+                        the Journal and record the created and moved cards
+                        to it
+
+        @return: the keys of created cards. e.g. ['TELOPS-123']
     """
     issue_updates = []  # Put tasks in this list
 
+    # The cards created by previous run
+    created_keys = []
+    if journal is not None:
+        created_keys = [
+            journal.result(TELOPS_CREATE, d['cid']) for d in data
+            if journal.done(TELOPS_CREATE, d['cid'])
+        ]
+        data = [d for d in data if not journal.done(TELOPS_CREATE, d['cid'])]
+        if created_keys:
+            print(f"Skip creating {', '.join(created_keys)} since they're "
+                  "created")
+
     telops_jira_api = JiraAPI(
         path_of_jira_board_conf='./configs',
         jira_board_conf='jira_telops.json'
@@ -56,27 +85,62 @@ def create_send_dut_to_cert_card_in_telops(
             target_issues=[{'key': cqt_card}])
 
         issue_updates.append({'fields': fields, 'update': update_link})
-    response = telops_jira_api.create_issues(
-        payload={'issueUpdates': issue_updates})
-
-    if response.ok:
-        print(json.dumps(response.json(), indent=2))
-        print('Created the following cards to TELOPS board successfully')
+    response = None
+    if issue_updates:
+        response = telops_jira_api.create_issues(
+            payload={'issueUpdates': issue_updates})
 
+        # The cards created successfully even if some others are failed
+        created_issues = response.json()['issues']
+        if created_issues:
+            print(json.dumps(created_issues, indent=2))
+            print('Created the following cards to TELOPS board successfully')
+
+        # The created issues are in the order of issue updates
+        failed_numbers = {
+            e['failedElementNumber'] for e in response.json()['errors']}
+        created_cids = [
+            d['cid'] for idx, d in enumerate(data)
+            if idx not in failed_numbers
+        ]
+        for cid, issue in zip(created_cids, created_issues):
+            created_keys.append(issue['key'])
+            if journal is not None:
+                journal.record(TELOPS_CREATE, cid, issue['key'])
+
+    # Move the cards created by this and previous run
+    issue_keys = [
+        k for k in created_keys
+        if journal is None or not journal.done(TELOPS_TRANSITION, k)
+    ]
+    if issue_keys:
         # Get the transition ID number which is from the TELOPS board
         transition_data = telops_jira_api.jira_project['transition_data']
         transition_id = transition_data.get('To Do Cert LAB')
 
-        created_issues = response.json()['issues']
-
-        for created_issue in created_issues:
-            # Assign status with 'To Do Cert LAB'
-            response = telops_jira_api.make_transition(
-                created_issue['key'], transition_id)
-    else:
+        # Assign status with 'To Do Cert LAB'
+        results = telops_jira_api.transition_issues_bulk(
+            issue_keys=issue_keys,
+            transition_id=transition_id)
+        for r in results:
+            if not r['ok']:
+                print(f"Warning: Failed to move {r['item'][0]} to "
+                      f"'To Do Cert LAB'. Reason: {r['error']}")
+            elif journal is not None:
+                journal.record(TELOPS_TRANSITION, r['item'][0])
+
+    if response is not None and not response.ok:
+        # Only print the issue updates failed to create
+        failed_updates = [
+            issue_updates[e['failedElementNumber']]
+            for e in response.json()['errors']
+        ]
         print('*' * 50)
-        print(json.dumps(issue_updates, indent=2))
-        raise Exception(
-            'Error: Failed to create card to TELOPS board',
-            f"Reason: {response.text}"
+        print(json.dumps(failed_updates, indent=2))
+        raise CardCreationError(
+            'Error: Failed to create card to TELOPS board. '
+            f"Reason: {json.dumps(response.json()['errors'])}",
+            created_keys=created_keys
         )
+
+    return created_keys
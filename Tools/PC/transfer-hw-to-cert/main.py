@@ -5,13 +5,14 @@ from handlers.cqt_handler import (
     get_candidate_duts,
     get_returned_cid_info_from_a_jira,
 )
-from handlers.telops_handler import create_send_dut_to_cert_card_in_telops
-from handlers.c3_handler import (
-    update_duts_info_on_c3,
-    update_returned_duts_info_on_c3,
-)
+from handlers.c3_handler import update_returned_duts_info_on_c3
+from handlers.qa_pipeline import run_qa_process, format_report
 from handlers.notifier import add_comment
+from handlers.planner import plan_qa_process, plan_returned_process
 from utils.common import is_valid_cid, is_valid_location
+from utils.journal import Journal
+
+RETURNED_STATUS = "Returned to partner/customer"
 
 
 def register_arguments():
@@ -45,6 +46,13 @@ def register_arguments():
         choices=["qa_process", "contractor_process", "returned_process"],
         default="qa_process",
     )
+    parser.add_argument(
+        "-p",
+        "--plan",
+        help="Print the API calls of this run without sending them. "
+        "The steps done by previous runs are skipped",
+        action="store_true",
+    )
     return parser.parse_args()
 
 
@@ -52,6 +60,9 @@ def main():
     args = register_arguments()
 
     key = args.key
+    report = None
+    # The steps done by previous runs of the same Jira card are skipped
+    journal = Journal(key)
     try:
         if args.scenario == "qa_process":
             print("-" * 5 + "Retrieving data from Jira Card" + "-" * 5)
@@ -75,32 +86,43 @@ def main():
             for d in data["data"]:
                 d["gm_image_link"] = gm_image_link
 
-            # Update DUT holder and location on C3
-            print("-" * 5 + "Updating C3" + "-" * 5)
-            update_duts_info_on_c3(
-                data=data["data"], new_holder=args.c3_holder
-            )
+            if args.plan:
+                plan = plan_qa_process(key, data, args.c3_holder, journal)
+                print(json.dumps(plan, indent=2))
+                return
 
-            # Create Jira card to TELOPS board
+            # Update DUT holder and location on C3, and create Jira card to
+            # TELOPS board at the same time
             # No matter the process is qa_process or contractor process
             # There's always need cards in TELOPS board
-            print("-" * 5 + "Creating card to TELOPS board" + "-" * 5)
-            create_send_dut_to_cert_card_in_telops(
+            print("-" * 5 + "Updating C3 and creating card to TELOPS board"
+                  + "-" * 5)
+            report = run_qa_process(
                 cqt_card=key,
-                description_original_data=data["description_original_data"],
-                assignee_original_id=data["assignee_original_id"],
-                data=data["data"],
+                card_data=data,
+                new_holder=args.c3_holder,
+                journal=journal,
             )
+            print("\n".join(format_report(report)))
+            if not report["ok"]:
+                raise Exception(f"Error: QA process failed for {key}")
         if args.scenario == "returned_process":
             # Get CID information from Jira card
             cid_list = get_returned_cid_info_from_a_jira(args.key)
+            if args.plan:
+                plan = plan_returned_process(
+                    cid_list, RETURNED_STATUS, journal)
+                print(json.dumps(plan, indent=2))
+                return
+
             # Update DUT location, status and holder on C3
             print("-" * 5 + "Updating C3" + "-" * 5)
-            for cid in cid_list:
-                # Update DUT info on C3 for each CID
-                update_returned_duts_info_on_c3(
-                    data=[{"cid": cid}], status="Returned to partner/customer"
-                )
+            # Update DUT info on C3 for all CIDs at once
+            update_returned_duts_info_on_c3(
+                data=[{"cid": cid} for cid in cid_list],
+                status=RETURNED_STATUS,
+                journal=journal,
+            )
 
             #  notify: leave successful comment to Jira card
             add_comment(
@@ -109,11 +131,16 @@ def main():
                 data={"jenkins_job_link": args.jenkins_job_link},
             )
     except Exception:
+        if args.plan:
+            raise
         # notify: leave failed comment to Jira card
         add_comment(
             comment_type="error",
             key=key,
-            data={"jenkins_job_link": args.jenkins_job_link},
+            data={
+                "jenkins_job_link": args.jenkins_job_link,
+                "report": format_report(report) if report else [],
+            },
         )
         raise
 
@@ -3,4 +3,9 @@ import sys
 from unittest.mock import MagicMock
 
 sys.modules['Jira.apis.base'] = MagicMock()
+sys.modules['Jira.utils.cache'] = MagicMock()
 sys.modules['GoogleSheet.google_sheet_api'] = MagicMock()
+sys.modules['GoogleSheet.write_buffer'] = MagicMock()
+sys.modules['C3.apis.base'] = MagicMock()
+sys.modules['C3.utils.cache'] = MagicMock()
+sys.modules['modules.c3_relay_service.relay_service'] = MagicMock()
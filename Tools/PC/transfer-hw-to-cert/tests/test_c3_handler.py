@@ -0,0 +1,94 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Make sure mock_import must need to be imported before our own modules
+from . import mock_import  # noqa: F401
+
+from handlers.c3_handler import (
+    C3_CACHE,
+    init_c3_api,
+    update_duts_info_on_c3,
+    update_returned_duts_info_on_c3
+)
+from utils.journal import C3_RETURN, C3_UPDATE, Journal
+
+
+@patch('handlers.c3_handler.init_c3_api')
+class UpdateReturnedDUTsInfoOnC3Test(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal = Journal('CQT-1234', self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _mock_update(self, mock_init_c3_api):
+        mock_c3 = mock_init_c3_api()
+        mock_c3.update_duts_bulk.side_effect = lambda payloads: [
+            {'cid': cid, 'ok': True, 'status_code': 200, 'error': None,
+             'response': None} for cid in payloads]
+        return mock_c3
+
+    def test_skip_journaled_duts(self, mock_init_c3_api):
+        """ Should only update the DUTs not updated by previous run, and
+            record the updated ones
+        """
+        mock_c3 = self._mock_update(mock_init_c3_api)
+        data = [{'cid': '202304-12345'}, {'cid': '202304-12346'}]
+        update_returned_duts_info_on_c3(
+            data=data[:1], status='Returned', journal=self.journal)
+
+        results = update_returned_duts_info_on_c3(
+            data=data, status='Returned', journal=self.journal)
+
+        self.assertEqual(
+            ['202304-12346'],
+            list(mock_c3.update_duts_bulk.call_args.args[0]))
+        self.assertEqual(
+            ['202304-12346', '202304-12345'], [r['cid'] for r in results])
+        self.assertTrue(all(r['ok'] for r in results))
+        self.assertEqual(
+            ['202304-12345', '202304-12346'],
+            self.journal.targets(C3_RETURN))
+
+    @patch(
+        'handlers.c3_handler.build_dut_payload',
+        lambda dut, new_holder: {'location': dut['location']})
+    def test_update_changed_payload(self, mock_init_c3_api):
+        """ Should update the DUT again if its payload is changed since
+            previous run, e.g. the location is corrected
+        """
+        mock_c3 = self._mock_update(mock_init_c3_api)
+        dut = {'cid': '202304-12345', 'location': 'TEL-L5-F01-S1-P1'}
+        update_duts_info_on_c3([dut], 'holder', journal=self.journal)
+        update_duts_info_on_c3([dut], 'holder', journal=self.journal)
+        self.assertEqual(1, mock_c3.update_duts_bulk.call_count)
+
+        dut['location'] = 'TEL-L3-F01-S1-P1'
+        results = update_duts_info_on_c3([dut], 'holder', journal=self.journal)
+
+        self.assertEqual(2, mock_c3.update_duts_bulk.call_count)
+        self.assertEqual(
+            {'202304-12345': {'location': 'TEL-L3-F01-S1-P1'}},
+            mock_c3.update_duts_bulk.call_args.args[0])
+        self.assertNotIn('skipped', results[0])
+        self.assertEqual(
+            ['202304-12345'], self.journal.targets(C3_UPDATE))
+
+
+class InitC3APITest(unittest.TestCase):
+    @patch('handlers.c3_handler.C3API')
+    def test_shared_cache(self, mock_c3_api_class):
+        """ The C3API of a run should share the response cache
+        """
+        init_c3_api()
+        init_c3_api()
+
+        self.assertEqual(
+            [C3_CACHE, C3_CACHE],
+            [c.kwargs['cache'] for c in mock_c3_api_class.call_args_list])
+
+
+if __name__ == '__main__':
+    unittest.main()
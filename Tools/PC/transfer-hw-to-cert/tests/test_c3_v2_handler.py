@@ -0,0 +1,130 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Make sure mock_import must need to be imported before our own modules
+from . import mock_import  # noqa: F401
+
+from handlers import c3_v2_handler
+from handlers.c3_v2_handler import (
+    update_duts_info_on_c3,
+    update_returned_duts_info_on_c3
+)
+
+LABRESOURCES = [{'id': 1}, {'id': 2}]
+DATA = [
+    {'cid': '202304-28634', 'location': 'TEL-L5-F01-S1-P1'},
+    {'cid': '202304-28635', 'location': 'TEL-L5-F01-S1-P2'},
+    {'cid': '202304-28636', 'location': 'TEL-L5-F01-S1-P3'},
+]
+CIDS = [d['cid'] for d in DATA]
+
+
+class RelayService:
+    """ Stand in for the functions of relay_service used by the handler
+
+        The detach of CIDs in fail_detach and the link of CIDs in
+        fail_link raise an exception
+    """
+    def __init__(self, fail_detach=(), fail_link=()):
+        self.fail_detach = fail_detach
+        self.fail_link = fail_link
+        self.updated = []
+        self.detaching = 0
+        self.max_detaching = 0
+        self.lock = threading.Lock()
+
+    def detach_labresource(self, cid, labresources):
+        with self.lock:
+            self.detaching += 1
+            self.max_detaching = max(self.max_detaching, self.detaching)
+        time.sleep(0.05)
+        with self.lock:
+            self.detaching -= 1
+        if cid in self.fail_detach:
+            raise Exception('detach failed')
+        return {'canonical_id': None}
+
+    def link_labresource(self, cid, labresource_id):
+        if cid in self.fail_link:
+            raise Exception('link failed')
+        return {'canonical_id': cid}
+
+    def update_device_info(self, cid, info):
+        with self.lock:
+            self.updated.append(cid)
+        return {'canonical_id': cid}
+
+
+class UpdateDUTsInfoOnC3Test(unittest.TestCase):
+    def _patch(self, relay):
+        patches = {
+            'get_labresource_list': LABRESOURCES,
+            'get_labresource_id': 1,
+            'convert_to_c3_location_status': ('TEL-L5', 'Available'),
+        }
+        mocks = {}
+        for name, return_value in patches.items():
+            patcher = patch.object(
+                c3_v2_handler, name, return_value=return_value)
+            mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+        for name in ('detach_labresource', 'link_labresource',
+                     'update_device_info'):
+            patcher = patch.object(
+                c3_v2_handler, name, side_effect=getattr(relay, name))
+            mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+        return mocks
+
+    def test_list_labresources_once(self):
+        """ Should list the labresources once for all DUTs
+        """
+        relay = RelayService()
+        mocks = self._patch(relay)
+
+        failed = update_duts_info_on_c3(DATA, 'someone')
+
+        self.assertEqual([], failed)
+        mocks['get_labresource_list'].assert_called_once()
+        for call in mocks['detach_labresource'].call_args_list:
+            self.assertIs(LABRESOURCES, call.args[1])
+        self.assertCountEqual(CIDS, relay.updated)
+
+    def test_detach_one_by_one(self):
+        """ Should not detach the shared labresources at the same time
+        """
+        relay = RelayService()
+        self._patch(relay)
+
+        update_duts_info_on_c3(DATA, 'someone')
+
+        self.assertEqual(1, relay.max_detaching)
+
+    def test_failed_dut(self):
+        """ A failed detach or link should not stop the other DUTs
+        """
+        relay = RelayService(fail_detach=[CIDS[0]], fail_link=[CIDS[1]])
+        self._patch(relay)
+
+        failed = update_duts_info_on_c3(DATA, 'someone')
+
+        self.assertCountEqual(CIDS[:2], failed)
+        self.assertEqual([CIDS[2]], relay.updated)
+
+    def test_returned_failed_dut(self):
+        """ A failed detach should not stop the other returned DUTs
+        """
+        relay = RelayService(fail_detach=[CIDS[0]])
+        mocks = self._patch(relay)
+
+        failed = update_returned_duts_info_on_c3(DATA, 'returned')
+
+        self.assertEqual([CIDS[0]], failed)
+        mocks['get_labresource_list'].assert_called_once()
+        self.assertCountEqual(CIDS[1:], relay.updated)
+
+
+if __name__ == '__main__':
+    unittest.main()
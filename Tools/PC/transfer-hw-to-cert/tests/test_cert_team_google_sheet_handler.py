@@ -6,9 +6,37 @@ from . import mock_import  # noqa: F401
 
 from handlers.cert_team_google_sheet_handler import (
     is_valid_input_data,
-    get_sheet_data
+    get_sheet_data,
+    fill_in_google_sheet,
+    find_location_by_cid,
+    update_cert_lab_google_sheet,
+    SheetWriteConflict
 )
 
+SHEET_DATA = {
+    'TEL-L5': {
+        'headers': {
+            'CID': 0,
+            'Certified_OEM_Image': 1,
+            'Lab': 2,
+            'Frame': 3,
+            'Shelf': 4,
+            'Partition': 5},
+        'indexed_table': {
+            'TEL-L5-F01-S1-P1': {
+                'CID': '',
+                'Certified_OEM_Image': '',
+                'row_index': 2}
+        },
+        'cid_index': {}
+    }
+}
+DATA = [{
+    'cid': '202304-28634',
+    'location': 'TEL-L5-F01-S1-P1',
+    'gm_image_link': 'http://fake-link/oem-share'
+}]
+
 
 class IsValidInputDataTest(unittest.TestCase):
     def test_valid_data(self):
@@ -128,18 +156,27 @@ class GetSheetDataTest(unittest.TestCase):
                         'CID': '202112-39487',
                         'Certified_OEM_Image': '',
                         'row_index': 2},
-                    'TEL-L5-R01-S3-P0': {
+                    'TEL-L5-F01-S1-P2': {
                         'CID': '',
                         'Certified_OEM_Image': 'http://fake123.com',
                         'row_index': 3
+                    },
+                    'TEL-L5-F01-S1-P3': {
+                        'CID': '202304-23456',
+                        'Certified_OEM_Image': '',
+                        'row_index': 4
                     }
+                },
+                'cid_index': {
+                    '202112-39487': 'TEL-L5-F01-S1-P1',
+                    '202304-23456': 'TEL-L5-F01-S1-P3'
                 }
             }
         }
 
         mock_gs_obj = mock_gs_instance()
-        mock_gs_obj.get_range_data.side_effect = [
-            [
+        mock_gs_obj.get_ranges_data.return_value = {
+            'test-TEL-L5!1:1': [
                 [
                     'CID', 'MAC', 'Controller_MAC', 'Provision', 'Power',
                     'Device_ID', 'TF_Queue', 'Customized_Agent_Config',
@@ -149,7 +186,7 @@ class GetSheetDataTest(unittest.TestCase):
                     'POE_Port', 'POE_Switch', '2nd_Eth_Usage', 'Note'
                 ]
             ],
-            [
+            'test-TEL-L5!A2:Z': [
                 [
                     '202112-39487', '00:e0:4d:3a:71:18', '', 'noprovision',
                     'raritan', 'aaeon-sse-opti-c29832', '', '', '', '',
@@ -162,9 +199,155 @@ class GetSheetDataTest(unittest.TestCase):
                     'http://fake123.com', '', '', '', '10.102.160.13',
                     '10.102.196.101', '6', 'TEL-L5', 'F01', '1', '2', '2',
                     'TEL-L5-framesw01', '2', 'TEL-L5-frameswpoe01'
-                ]
+                ],
+                # The trailing empty cells are trimmed by Google Sheet
+                [
+                    '202304-23456', '', '', '', '', '', '', '', '', '', '',
+                    '', '', '', '', '', 'TEL-L5', 'F01', '1', '3'
+                ],
+                # Empty row
+                []
             ]
-        ]
-        actual_result = get_sheet_data()
+        }
+        actual_result = get_sheet_data(use_mirror=False)
+
+        self.assertEqual(expected_data, actual_result)
+        mock_gs_obj.get_ranges_data.assert_called_once_with(
+            ['test-TEL-L5!1:1', 'test-TEL-L5!A2:Z'], major_dimension="ROWS")
+
+
+class FindLocationByCIDTest(unittest.TestCase):
+    def test_find_location(self):
+        """ Should find the DUT of CID in any table
+        """
+        sheet_data = {
+            'TEL-L3': {'indexed_table': {}, 'cid_index': {}},
+            'TEL-L5': {
+                'indexed_table': {
+                    'TEL-L5-F01-S1-P1': {
+                        'CID': '202112-39487',
+                        'Certified_OEM_Image': '',
+                        'row_index': 2}
+                },
+                'cid_index': {'202112-39487': 'TEL-L5-F01-S1-P1'}
+            }
+        }
+
+        self.assertEqual(
+            ('TEL-L5', 'TEL-L5-F01-S1-P1', {
+                'CID': '202112-39487',
+                'Certified_OEM_Image': '',
+                'row_index': 2}),
+            find_location_by_cid('202112-39487', sheet_data))
+        self.assertEqual(
+            (None, None, None),
+            find_location_by_cid('202304-00000', sheet_data))
+
+
+class FakeWriteBuffer:
+    """ Send the queued updates by one update_range_data call on close like
+        SheetWriteBuffer
+    """
+    def __init__(self, operator, **kwargs):
+        self.operator = operator
+        self.reports = []
+        self._data = []
+
+    def update_range_data(self, data, input_option="USER_ENTERED"):
+        self._data.extend(data)
+
+    def close(self):
+        try:
+            response = self.operator.update_range_data(
+                data=self._data, input_option="USER_ENTERED")
+        except Exception as e:
+            response, error = None, e
+        else:
+            error = None
+        self.reports.extend({
+            'item': item,
+            'ok': error is None,
+            'error': error,
+            'response': response
+        } for item in self._data)
+
+
+@patch('handlers.cert_team_google_sheet_handler.SheetWriteBuffer',
+       FakeWriteBuffer)
+@patch('handlers.cert_team_google_sheet_handler.create_google_sheet_instance')
+class FillInGoogleSheetTest(unittest.TestCase):
+    def test_conditional_write(self, mock_gs_instance):
+        """ Should write if the target rows aren't changed
+        """
+        mock_gs_obj = mock_gs_instance()
+        # The trailing empty cells are trimmed
+        mock_gs_obj.get_ranges_data.return_value = {
+            'TEL-L5!A2:Z2': [['', '', 'TEL-L5', 'F01', '1', '1']]
+        }
+
+        fill_in_google_sheet(DATA, SHEET_DATA, conditional=True)
+
+        mock_gs_obj.get_ranges_data.assert_called_once_with(
+            ['TEL-L5!A2:Z2'], major_dimension="ROWS")
+        mock_gs_obj.update_range_data.assert_called_once_with(data=[
+            {'range': 'TEL-L5!A2', 'values': [['202304-28634']]},
+            {'range': 'TEL-L5!B2',
+             'values': [['http://fake-link/oem-share']]}
+        ], input_option="USER_ENTERED")
+
+    def test_write_error(self, mock_gs_instance):
+        """ Should raise the error of the failed write
+        """
+        mock_gs_obj = mock_gs_instance()
+        mock_gs_obj.update_range_data.side_effect = Exception('400')
+
+        with self.assertRaisesRegex(Exception, '400'):
+            fill_in_google_sheet(DATA, SHEET_DATA)
+
+    def test_conditional_write_conflict(self, mock_gs_instance):
+        """ Should not write if the target rows are changed
+        """
+        mock_gs_obj = mock_gs_instance()
+        test_cases = [{
+            'name': 'CID is filled by others',
+            'row': ['202304-99999', '', 'TEL-L5', 'F01', '1', '1']
+        }, {
+            'name': 'row is moved',
+            'row': ['', '', 'TEL-L5', 'F01', '1', '2']
+        }]
+
+        for case in test_cases:
+            mock_gs_obj.get_ranges_data.return_value = {
+                'TEL-L5!A2:Z2': [case['row']]
+            }
+            with self.assertRaises(SheetWriteConflict, msg=case['name']):
+                fill_in_google_sheet(DATA, SHEET_DATA, conditional=True)
+        mock_gs_obj.update_range_data.assert_not_called()
+
+
+@patch('handlers.cert_team_google_sheet_handler.time.sleep')
+@patch('handlers.cert_team_google_sheet_handler.fill_in_google_sheet')
+@patch('handlers.cert_team_google_sheet_handler.get_sheet_data')
+class UpdateCertLabGoogleSheetTest(unittest.TestCase):
+    def test_retry_on_conflict(self, mock_get_data, mock_fill_in, _):
+        """ Should read the sheet again and retry if there's a conflict
+        """
+        mock_get_data.return_value = SHEET_DATA
+        mock_fill_in.side_effect = [SheetWriteConflict([]), None]
+
+        update_cert_lab_google_sheet(DATA)
+
+        self.assertEqual(2, mock_fill_in.call_count)
+        self.assertEqual(
+            [((), {'use_mirror': True}), ((), {'use_mirror': False})],
+            mock_get_data.call_args_list)
+
+    def test_give_up_on_conflicts(self, mock_get_data, mock_fill_in, _):
+        """ Should raise if the conflicts don't stop
+        """
+        mock_get_data.return_value = SHEET_DATA
+        mock_fill_in.side_effect = SheetWriteConflict([])
 
-        self.assertCountEqual(expected_data, actual_result)
+        with self.assertRaises(SheetWriteConflict):
+            update_cert_lab_google_sheet(DATA)
+        self.assertEqual(3, mock_fill_in.call_count)
@@ -0,0 +1,148 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit
+
+from handlers import hic_handler
+from handlers.hic_handler import build_cid_index, delete_duts
+
+MAPPING = {
+    '48:9e:bd:ea:d3:d4': 'Varc-PV-SKU6-1_202302-31212',
+    '48:9e:bd:ea:d3:d5': 'Varc-PV-SKU6-1_202302-31212',
+    '00:be:43:bd:cf:16': 'TRM-DVT1-L10-C1_202304-31528',
+    '00:be:43:bd:cf:17': 'no-cid-sku',
+    '00:be:43:bd:cf:18': 'TRM-DVT2_202305-11111_rework',
+}
+
+
+class MockHICServer:
+    """ A local HTTP server which stands in for HIC
+
+        The mapping is returned by /q and the records are removed by /d.
+        The MACs in fail_times fail with 503 for the given times.
+    """
+    def __init__(self, mapping, fail_times=None):
+        self.mapping = dict(mapping)
+        self.fail_times = dict(fail_times or {})
+        self.deleted = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            ('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{}'.format(self._server.server_address[1])
+
+    def _handler_class(self):
+        mock_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):  # noqa: N802
+                url = urlsplit(self.path)
+                status, body = 200, {}
+                with mock_server._lock:
+                    if url.path == '/q':
+                        body = mock_server.mapping
+                    elif url.path == '/d':
+                        mac = parse_qs(url.query)['k'][0]
+                        if mock_server.fail_times.get(mac):
+                            mock_server.fail_times[mac] -= 1
+                            status = 503
+                        else:
+                            mock_server.mapping.pop(mac, None)
+                            mock_server.deleted.append(mac)
+                content = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class BuildCIDIndexTest(unittest.TestCase):
+    def test_build_cid_index(self):
+        """ Should index the MACs by the CID at the end of SKU name
+        """
+        self.assertEqual({
+            '202302-31212': {
+                'sku_name': 'Varc-PV-SKU6-1_202302-31212',
+                'mac_addresses': ['48:9e:bd:ea:d3:d4', '48:9e:bd:ea:d3:d5']
+            },
+            '202304-31528': {
+                'sku_name': 'TRM-DVT1-L10-C1_202304-31528',
+                'mac_addresses': ['00:be:43:bd:cf:16']
+            }
+        }, build_cid_index(MAPPING))
+
+
+@patch.object(hic_handler, 'RETRY_BACKOFF_FACTOR', 0)
+class DeleteDUTsTest(unittest.TestCase):
+    def setUp(self):
+        # Don't share the session and its retry settings between tests
+        hic_handler._session = None
+
+    def test_delete_duts(self):
+        """ Should delete all MACs of the CIDs
+        """
+        with MockHICServer(MAPPING) as server, \
+                patch.object(hic_handler, 'HIC_URL', server.url):
+            delete_duts(['202302-31212', '202311-00000'])
+
+        self.assertCountEqual(
+            ['48:9e:bd:ea:d3:d4', '48:9e:bd:ea:d3:d5'], server.deleted)
+
+    def test_delete_unindexed_duts(self):
+        """ Should find the CID which is not at the end of SKU name
+        """
+        with MockHICServer(MAPPING) as server, \
+                patch.object(hic_handler, 'HIC_URL', server.url):
+            delete_duts(['202305-11111'])
+
+        self.assertEqual(['00:be:43:bd:cf:18'], server.deleted)
+
+    def test_retry_failed_deletion(self):
+        """ Should retry the deletion which is failed by server error
+        """
+        with MockHICServer(
+                MAPPING, fail_times={'00:be:43:bd:cf:16': 2}) as server, \
+                patch.object(hic_handler, 'HIC_URL', server.url):
+            delete_duts(['202304-31528'])
+
+        self.assertEqual(['00:be:43:bd:cf:16'], server.deleted)
+
+    def test_report_failed_deletion(self):
+        """ Should keep deleting others and report the failed deletion
+        """
+        with MockHICServer(
+                MAPPING, fail_times={'48:9e:bd:ea:d3:d4': 10}) as server, \
+                patch.object(hic_handler, 'HIC_URL', server.url), \
+                patch('builtins.print') as mock_print:
+            delete_duts(['202302-31212'])
+
+        self.assertEqual(['48:9e:bd:ea:d3:d5'], server.deleted)
+        mock_print.assert_any_call(
+            'Error: Some DUTs cannot be removed from HIC!')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Make sure mock_import must need to be imported before our own modules
+from . import mock_import  # noqa: F401
+
+from handlers.planner import plan_qa_process, plan_returned_process
+from utils.journal import (
+    C3_RETURN,
+    C3_UPDATE,
+    TELOPS_CREATE,
+    TELOPS_TRANSITION,
+    Journal,
+    payload_hash
+)
+
+CARD_DATA = {
+    'data': [
+        {'cid': '202304-12345', 'location': 'TEL-L5-F01-S1-P1'},
+        {'cid': '202304-12346', 'location': 'TEL-L5-F01-S1-P2'},
+        {'cid': '202304-12347', 'location': 'TEL-L5-F01-S1-P3'},
+    ]
+}
+
+
+@patch(
+    'handlers.planner.build_dut_payload',
+    lambda dut, new_holder: {'holder': new_holder})
+@patch(
+    'handlers.planner.build_returned_dut_payload',
+    lambda status: {'status': status})
+class PlannerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal = Journal('CQT-1234', self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_plan_qa_process(self):
+        """ Should plan the calls of steps not in the journal
+        """
+        updated = payload_hash({'holder': 'holder'})
+        self.journal.record(C3_UPDATE, '202304-12345', updated)
+        self.journal.record(TELOPS_CREATE, '202304-12345', 'TELOPS-1')
+        self.journal.record(TELOPS_TRANSITION, 'TELOPS-1')
+        self.journal.record(C3_UPDATE, '202304-12346', updated)
+        self.journal.record(TELOPS_CREATE, '202304-12346', 'TELOPS-2')
+
+        plan = plan_qa_process('CQT-1234', CARD_DATA, 'holder', self.journal)
+
+        self.assertEqual([
+            ('C3', 'PATCH', '202304-12347'),
+            ('TELOPS', 'POST', 'transition TELOPS-2'),
+            ('TELOPS', 'POST', 'create card of 202304-12347'),
+            ('TELOPS', 'POST', 'transition card of 202304-12347'),
+        ], [(c['service'], c['method'], c['target']) for c in plan])
+        self.assertEqual({'holder': 'holder'}, plan[0]['payload'])
+
+    def test_plan_returned_process(self):
+        """ Should plan the C3 updates of CIDs not in the journal
+        """
+        self.journal.record(
+            C3_RETURN, '202304-12345', payload_hash({'status': 'Returned'}))
+
+        plan = plan_returned_process(
+            ['202304-12345', '202304-12346'], 'Returned', self.journal)
+
+        self.assertEqual([{
+            'service': 'C3',
+            'method': 'PATCH',
+            'target': '202304-12346',
+            'payload': {'status': 'Returned'}
+        }], plan)
+
+    def test_plan_changed_payload(self):
+        """ Should plan the C3 update again if its payload is changed
+        """
+        self.journal.record(
+            C3_UPDATE, '202304-12345', payload_hash({'holder': 'holder'}))
+
+        plan = plan_qa_process(
+            'CQT-1234', CARD_DATA, 'new-holder', self.journal)
+
+        self.assertEqual(
+            ['202304-12345', '202304-12346', '202304-12347'],
+            [c['target'] for c in plan if c['service'] == 'C3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
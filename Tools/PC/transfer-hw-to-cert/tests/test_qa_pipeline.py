@@ -0,0 +1,92 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+# Make sure mock_import must need to be imported before our own modules
+from . import mock_import  # noqa: F401
+
+from handlers.c3_handler import BulkUpdateError
+from handlers.telops_handler import CardCreationError
+from handlers.qa_pipeline import format_report, run_qa_process
+
+CARD_DATA = {
+    'description_original_data': {},
+    'assignee_original_id': 'fake-id',
+    'gm_image_link': '',
+    'data': [
+        {'cid': '202304-12345', 'location': 'TEL-L5-F01-S1-P1'},
+        {'cid': '202304-12346', 'location': 'TEL-L5-F01-S1-P2'},
+    ]
+}
+
+
+@patch('handlers.qa_pipeline.create_send_dut_to_cert_card_in_telops')
+@patch('handlers.qa_pipeline.update_duts_info_on_c3')
+class RunQAProcessTest(unittest.TestCase):
+    def test_run_stages_concurrently(self, mock_c3, mock_telops):
+        """ Should run C3 and TELOPS stages at the same time
+        """
+        # Both stages wait for each other, it times out if they're in
+        # sequence
+        barrier = threading.Barrier(2, timeout=5)
+
+        def update_c3(data, new_holder, journal=None):
+            barrier.wait()
+            return [{'cid': d['cid'], 'ok': True, 'error': None}
+                    for d in data]
+
+        def create_cards(**kwargs):
+            barrier.wait()
+            return ['TELOPS-1', 'TELOPS-2']
+
+        mock_c3.side_effect = update_c3
+        mock_telops.side_effect = create_cards
+
+        report = run_qa_process('CQT-1234', CARD_DATA, 'holder')
+
+        self.assertTrue(report['ok'])
+        self.assertEqual(
+            ['C3: 2 succeeded (202304-12345, 202304-12346)',
+             'TELOPS: 2 succeeded (TELOPS-1, TELOPS-2)'],
+            format_report(report))
+
+    def test_report_failures(self, mock_c3, mock_telops):
+        """ Should report the failed DUTs and the failed stage
+        """
+        mock_c3.side_effect = BulkUpdateError('Error: update failed', [
+            {'cid': '202304-12345', 'ok': True, 'error': None},
+            {'cid': '202304-12346', 'ok': False, 'error': '404 Not Found'},
+        ])
+        mock_telops.side_effect = CardCreationError(
+            'Error: Failed to create card to TELOPS board',
+            created_keys=['TELOPS-1'])
+
+        report = run_qa_process('CQT-1234', CARD_DATA, 'holder')
+
+        self.assertFalse(report['ok'])
+        self.assertFalse(report['stages']['C3']['ok'])
+        self.assertEqual(
+            ['C3: 1 succeeded (202304-12345)',
+             '- 202304-12346: 404 Not Found',
+             'TELOPS: 1 succeeded (TELOPS-1)',
+             '- Error: Failed to create card to TELOPS board'],
+            format_report(report))
+
+    def test_unexpected_error(self, mock_c3, mock_telops):
+        """ Should report the stage failed by an unexpected error without
+            stopping the other stage
+        """
+        mock_c3.side_effect = ConnectionError('C3 is down')
+        mock_telops.return_value = ['TELOPS-1', 'TELOPS-2']
+
+        report = run_qa_process('CQT-1234', CARD_DATA, 'holder')
+
+        self.assertFalse(report['ok'])
+        self.assertEqual(
+            {'ok': False, 'error': 'C3 is down', 'items': []},
+            report['stages']['C3'])
+        self.assertTrue(report['stages']['TELOPS']['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Make sure mock_import must need to be imported before our own modules
+from . import mock_import  # noqa: F401
+
+from handlers.telops_handler import (
+    CardCreationError,
+    create_send_dut_to_cert_card_in_telops
+)
+from utils.journal import TELOPS_CREATE, TELOPS_TRANSITION, Journal
+
+
+@patch('handlers.telops_handler.JiraAPI')
+class CreateSendDUTToCertCardTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal = Journal('CQT-1234', self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _mock_jira_api(self, mock_jira_api_class, issues, errors=()):
+        jira_api = MagicMock()
+        jira_api.create_jira_fields_template.return_value = {
+            'reporter': {}}
+        jira_api.create_link_issue_content.return_value = {}
+        jira_api.create_issues.return_value.ok = not errors
+        jira_api.create_issues.return_value.json.return_value = {
+            'issues': issues, 'errors': list(errors)}
+        jira_api.transition_issues_bulk.side_effect = \
+            lambda issue_keys, transition_id: [
+                {'item': (k, transition_id), 'ok': True, 'error': None}
+                for k in issue_keys]
+        mock_jira_api_class.return_value = jira_api
+        return jira_api
+
+    def test_skip_journaled_steps(self, mock_jira_api_class):
+        """ Should not create the cards created by previous run again, but
+            move the ones not moved yet
+        """
+        self.journal.record(TELOPS_CREATE, '202304-12345', 'TELOPS-1')
+        jira_api = self._mock_jira_api(
+            mock_jira_api_class, [{'key': 'TELOPS-2'}])
+
+        keys = create_send_dut_to_cert_card_in_telops(
+            cqt_card='CQT-1234',
+            description_original_data={},
+            assignee_original_id='fake-id',
+            data=[{'cid': '202304-12345'}, {'cid': '202304-12346'}],
+            journal=self.journal)
+
+        self.assertEqual(['TELOPS-1', 'TELOPS-2'], keys)
+        issue_updates = jira_api.create_issues.call_args.kwargs[
+            'payload']['issueUpdates']
+        self.assertEqual(
+            ['CID#202304-12346 transferred to Cert Lab'],
+            [u['fields']['summary'] for u in issue_updates])
+        self.assertEqual(
+            ['TELOPS-1', 'TELOPS-2'],
+            jira_api.transition_issues_bulk.call_args.kwargs['issue_keys'])
+        self.assertEqual(
+            'TELOPS-2', self.journal.result(TELOPS_CREATE, '202304-12346'))
+        self.assertEqual(
+            ['TELOPS-1', 'TELOPS-2'],
+            self.journal.targets(TELOPS_TRANSITION))
+
+    def test_partial_failure(self, mock_jira_api_class):
+        """ Should move and journal the created cards, and raise with their
+            keys if some cards are failed to create
+        """
+        jira_api = self._mock_jira_api(
+            mock_jira_api_class,
+            [{'key': 'TELOPS-1'}, {'key': 'TELOPS-3'}],
+            [{'status': 400, 'elementErrors': {}, 'failedElementNumber': 1}])
+
+        with self.assertRaises(CardCreationError) as ctx:
+            create_send_dut_to_cert_card_in_telops(
+                cqt_card='CQT-1234',
+                description_original_data={},
+                assignee_original_id='fake-id',
+                data=[{'cid': '202304-12345'}, {'cid': '202304-12346'},
+                      {'cid': '202304-12347'}],
+                journal=self.journal)
+
+        self.assertEqual(['TELOPS-1', 'TELOPS-3'], ctx.exception.created_keys)
+        self.assertEqual(
+            ['TELOPS-1', 'TELOPS-3'],
+            jira_api.transition_issues_bulk.call_args.kwargs['issue_keys'])
+        self.assertEqual(
+            ['202304-12345', '202304-12347'],
+            self.journal.targets(TELOPS_CREATE))
+        self.assertEqual(
+            'TELOPS-3', self.journal.result(TELOPS_CREATE, '202304-12347'))
+
+
+if __name__ == '__main__':
+    unittest.main()
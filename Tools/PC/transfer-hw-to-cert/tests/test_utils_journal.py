@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+from utils.journal import C3_UPDATE, TELOPS_CREATE, Journal
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_replay_recorded_steps(self):
+        """ Should load the steps recorded by previous run
+        """
+        journal = Journal('CQT-1234', self.tmp_dir.name)
+        journal.record(C3_UPDATE, '202304-12345')
+        journal.record(TELOPS_CREATE, '202304-12345', 'TELOPS-1')
+
+        replayed = Journal('CQT-1234', self.tmp_dir.name)
+
+        self.assertTrue(replayed.done(C3_UPDATE, '202304-12345'))
+        self.assertFalse(replayed.done(C3_UPDATE, '202304-12346'))
+        self.assertEqual(
+            'TELOPS-1', replayed.result(TELOPS_CREATE, '202304-12345'))
+        self.assertEqual(['202304-12345'], replayed.targets(C3_UPDATE))
+        self.assertFalse(
+            Journal('CQT-5678', self.tmp_dir.name).done(
+                C3_UPDATE, '202304-12345'))
+
+    def test_ignore_partial_line(self):
+        """ Should ignore the partial line written by a killed run
+        """
+        journal = Journal('CQT-1234', self.tmp_dir.name)
+        journal.record(C3_UPDATE, '202304-12345')
+        with open(os.path.join(self.tmp_dir.name, 'CQT-1234.jsonl'),
+                  'a') as f:
+            f.write('{"step": "c3_upd')
+
+        replayed = Journal('CQT-1234', self.tmp_dir.name)
+
+        self.assertEqual(['202304-12345'], replayed.targets(C3_UPDATE))
+
+
+if __name__ == '__main__':
+    unittest.main()
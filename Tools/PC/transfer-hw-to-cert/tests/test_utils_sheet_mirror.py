@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from utils.sheet_mirror import SheetMirror
+
+
+class FakeSheetsBackend:
+    """ Stands in for GoogleSheetOperator, counts the downloads
+    """
+    def __init__(self, ranges_data, modified_time='2023-05-04T07:12:35Z'):
+        self.spreadsheet = 'fake-spreadsheet-id'
+        self.ranges_data = ranges_data
+        self.modified_time = modified_time
+        self.downloads = []
+
+    def get_modified_time(self):
+        if isinstance(self.modified_time, Exception):
+            raise self.modified_time
+        return self.modified_time
+
+    def get_ranges_data(self, ranges, major_dimension="ROWS"):
+        self.downloads.append(list(ranges))
+        return {r: self.ranges_data[r] for r in ranges}
+
+
+class SheetMirrorTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'mirror', 'sheet.json')
+        self.backend = FakeSheetsBackend({
+            'TEL-L5!1:1': [['CID', 'Lab']],
+            'TEL-L5!A2:Z': [['202112-39487', 'TEL-L5']],
+        })
+        self.ranges = ['TEL-L5!1:1', 'TEL-L5!A2:Z']
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reuse_unmodified_sheet(self):
+        """ Should download the ranges once if the sheet isn't modified
+        """
+        first = SheetMirror(self.backend, self.path).get_ranges_data(
+            self.ranges)
+        second = SheetMirror(self.backend, self.path).get_ranges_data(
+            self.ranges)
+
+        self.assertEqual(self.backend.ranges_data, first)
+        self.assertEqual(first, second)
+        self.assertEqual([self.ranges], self.backend.downloads)
+
+    def test_download_modified_sheet(self):
+        """ Should download the ranges again if the sheet is modified
+        """
+        mirror = SheetMirror(self.backend, self.path)
+        mirror.get_ranges_data(self.ranges)
+        self.backend.modified_time = '2023-05-05T01:00:00Z'
+        self.backend.ranges_data['TEL-L5!A2:Z'] = [['', 'TEL-L5']]
+
+        result = mirror.get_ranges_data(self.ranges)
+
+        self.assertEqual([['', 'TEL-L5']], result['TEL-L5!A2:Z'])
+        self.assertEqual(2, len(self.backend.downloads))
+
+    def test_download_missing_ranges(self):
+        """ Should download the ranges which aren't in the snapshot
+        """
+        mirror = SheetMirror(self.backend, self.path)
+        mirror.get_ranges_data(['TEL-L5!1:1'])
+        mirror.get_ranges_data(self.ranges)
+        result = mirror.get_ranges_data(self.ranges)
+
+        self.assertEqual(self.backend.ranges_data, result)
+        self.assertEqual(
+            [['TEL-L5!1:1'], self.ranges], self.backend.downloads)
+
+    def test_no_modified_time(self):
+        """ Should always download the ranges if the modified time can't be
+            got
+        """
+        self.backend.modified_time = Exception('403 Forbidden')
+        mirror = SheetMirror(self.backend, self.path)
+        mirror.get_ranges_data(self.ranges)
+        mirror.get_ranges_data(self.ranges)
+
+        self.assertEqual(2, len(self.backend.downloads))
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
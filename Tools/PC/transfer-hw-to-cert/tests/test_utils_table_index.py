@@ -0,0 +1,58 @@
+import unittest
+
+from utils.table_index import TableIndex, build_column_map, pad_rows
+
+HEADER_ROW = ['CID', 'MAC', 'Lab', 'Frame', 'Shelf', 'Partition', 'Note']
+WANTED_HEADERS = ['CID', 'Lab', 'Frame', 'Shelf', 'Partition']
+
+
+class BuildColumnMapTest(unittest.TestCase):
+    def test_map_wanted_headers(self):
+        """ Should map the wanted headers to their column index
+        """
+        self.assertEqual(
+            {'CID': 0, 'Lab': 2, 'Frame': 3, 'Shelf': 4, 'Partition': 5},
+            build_column_map(HEADER_ROW, WANTED_HEADERS))
+
+    def test_missing_header(self):
+        """ Should raise if a wanted header is not in the table
+        """
+        with self.assertRaisesRegex(Exception, 'Certified_OEM_Image'):
+            build_column_map(HEADER_ROW, ['CID', 'Certified_OEM_Image'])
+
+
+class PadRowsTest(unittest.TestCase):
+    def test_pad_ragged_rows(self):
+        """ Should pad the rows to the same width
+        """
+        self.assertEqual(
+            [['a', '', ''], ['', '', ''], ['a', 'b', 'c']],
+            pad_rows([['a'], [], ['a', 'b', 'c']], 3))
+
+
+class TableIndexTest(unittest.TestCase):
+    def test_index_by_location_and_cid(self):
+        """ Should index the rows by location and by CID
+        """
+        rows = [
+            ['202112-39487', 'mac', 'TEL-L5', 'F01', '1', '1', 'note'],
+            ['', '', 'TEL-L5', 'F01', '1', '2'],
+            [],
+            ['202304-23456', '', 'TEL-L5', 'F01', '2', '1'],
+        ]
+
+        index = TableIndex(HEADER_ROW, rows, WANTED_HEADERS, offset=2)
+
+        self.assertEqual({
+            'TEL-L5-F01-S1-P1': {'CID': '202112-39487', 'row_index': 2},
+            'TEL-L5-F01-S1-P2': {'CID': '', 'row_index': 3},
+            'TEL-L5-F01-S2-P1': {'CID': '202304-23456', 'row_index': 5},
+        }, index.by_location)
+        self.assertEqual({
+            '202112-39487': 'TEL-L5-F01-S1-P1',
+            '202304-23456': 'TEL-L5-F01-S2-P1',
+        }, index.by_cid)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+"""
+    This python script records the completed steps of a Jira card to a local
+    JSONL file, so the steps done by a failed run are skipped by the re-run.
+"""
+
+JOURNAL_DIR = os.environ.get(
+    'TRANSFER_JOURNAL_DIR',
+    os.path.expanduser('~/.cache/transfer-hw-to-cert/journal')
+)
+
+# The steps recorded in the journal, the target of each step is in comment
+C3_UPDATE = 'c3_update'  # CID, the result is the payload_hash of payload
+C3_RETURN = 'c3_return'  # CID, the result is the payload_hash of payload
+TELOPS_CREATE = 'telops_create'  # CID, the result is the key of card
+TELOPS_TRANSITION = 'telops_transition'  # the key of TELOPS card
+
+
+def payload_hash(payload: dict) -> str:
+    """ The hash of the payload sent by a step, so the step is done again if
+        its payload is changed, e.g. the location of DUT is corrected
+    """
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class Journal:
+    """ The completed steps of a Jira card
+
+        Each line of the journal file is a completed step
+            e.g.
+                {"step": "c3_update", "target": "202304-12345",
+                 "result": null, "time": 1683184355.0}
+
+        @param:key, the key of the Jira card. e.g. CQT-1234
+        @param:directory, the directory of journal files
+    """
+    def __init__(self, key: str, directory: str = JOURNAL_DIR):
+        self.path = os.path.join(directory, f'{key}.jsonl')
+        self._steps = {}
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # The last line might be partial if the run was
+                        # killed while writing it
+                        continue
+                    self._steps[(entry['step'], entry['target'])] = \
+                        entry.get('result')
+        except FileNotFoundError:
+            pass
+
+    def done(self, step: str, target: str) -> bool:
+        return (step, target) in self._steps
+
+    def result(self, step: str, target: str):
+        """ The result recorded with the step, e.g. the key of created card
+        """
+        return self._steps.get((step, target))
+
+    def targets(self, step: str) -> list:
+        """ The targets of completed step in the order of completion
+        """
+        return [t for s, t in self._steps if s == step]
+
+    def record(self, step: str, target: str, result=None):
+        """ Record the completed step, it's written to disk immediately
+        """
+        entry = {
+            'step': step,
+            'target': target,
+            'result': result,
+            'time': time.time()
+        }
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._steps[(step, target)] = result
@@ -0,0 +1,88 @@
+import json
+import os
+
+"""
+    This python script keeps a local snapshot of the ranges of a Google
+    Sheet, so the sheet is downloaded again only when it has been modified.
+"""
+
+
+class SheetMirror:
+    """ Local JSON snapshot of some ranges of a spreadsheet
+
+        The snapshot is validated by the modifiedTime of the spreadsheet on
+        Google Drive, which is much cheaper than downloading the ranges. The
+        ranges are downloaded again if the spreadsheet has been modified, the
+        wanted ranges are not in the snapshot, or the modifiedTime can't be
+        got.
+
+        @param:backend, the object to get the data, e.g. GoogleSheetOperator.
+                        It has the spreadsheet property, get_modified_time()
+                        and get_ranges_data(ranges, major_dimension) methods
+        @param:path, the path of the snapshot file
+
+        e.g.
+            mirror = SheetMirror(gs_obj, '/tmp/lab_sheet.json')
+            ranges_data = mirror.get_ranges_data(['TEL-L5!1:1'])
+    """
+    def __init__(self, backend, path: str):
+        self.backend = backend
+        self.path = path
+
+    def _load_snapshot(self) -> dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_snapshot(self, snapshot: dict):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        # Write to a temporary file then rename it, so the other jobs never
+        # read a partial snapshot
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+
+    def _get_revision(self):
+        try:
+            return self.backend.get_modified_time()
+        except Exception as e:
+            print(f'Warning: failed to get the modified time of sheet: {e}')
+            return None
+
+    def get_ranges_data(self, ranges: list[str],
+                        major_dimension: str = "ROWS") -> dict:
+        """ Get the values of ranges from the snapshot if it's up to date,
+            otherwise from the backend
+
+            @return: a dictionary whose keys are the given ranges
+        """
+        revision = self._get_revision()
+        snapshot = self._load_snapshot()
+        cached = snapshot.get('ranges', {}).get(major_dimension, {})
+        if (
+            revision is not None
+            and snapshot.get('spreadsheet') == self.backend.spreadsheet
+            and snapshot.get('revision') == revision
+            and all(r in cached for r in ranges)
+        ):
+            return {r: cached[r] for r in ranges}
+
+        ranges_data = self.backend.get_ranges_data(
+            ranges, major_dimension=major_dimension)
+        if revision is not None:
+            # The modifiedTime is got before downloading, so the snapshot is
+            # downloaded again next time if the sheet is modified meanwhile
+            if snapshot.get('spreadsheet') != self.backend.spreadsheet or \
+                    snapshot.get('revision') != revision:
+                snapshot = {
+                    'spreadsheet': self.backend.spreadsheet,
+                    'revision': revision,
+                    'ranges': {}
+                }
+            snapshot['ranges'].setdefault(
+                major_dimension, {}).update(ranges_data)
+            self._save_snapshot(snapshot)
+        return ranges_data
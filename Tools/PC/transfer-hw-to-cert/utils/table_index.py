@@ -0,0 +1,80 @@
+from operator import itemgetter
+
+"""
+    This python script builds the indexes of the tables on the Cert Lab
+    Google Sheet, so a row can be found by its location or its CID.
+"""
+
+LOCATION_HEADERS = ('Lab', 'Frame', 'Shelf', 'Partition')
+
+
+def pad_rows(rows: list[list], width: int) -> list[list]:
+    """ Pad the rows to width with empty cells, since the trailing empty
+        cells are trimmed by Google Sheet API
+    """
+    return [row + [''] * (width - len(row)) for row in rows]
+
+
+def build_column_map(header_row: list, wanted_headers: list) -> dict:
+    """ Map the wanted headers to their column index by one pass of the
+        header row
+
+        e.g.
+            build_column_map(['CID', 'MAC', 'Lab'], ['CID', 'Lab'])
+            # {'CID': 0, 'Lab': 2}
+    """
+    positions = {}
+    for idx, header in enumerate(header_row):
+        positions.setdefault(header, idx)
+    missing = [h for h in wanted_headers if h not in positions]
+    if missing:
+        raise Exception(f"Error: headers {missing} are not in the table")
+    return {h: positions[h] for h in wanted_headers}
+
+
+def location_of(lab: str, frame: str, shelf: str, partition: str) -> str:
+    """ e.g. location_of('TEL-L5', 'F01', '1', '2') is TEL-L5-F01-S1-P2
+    """
+    return f'{lab}-{frame}-S{shelf}-P{partition}'
+
+
+class TableIndex:
+    """ The indexes of a table on the Cert Lab Google Sheet
+
+        @param:header_row, the first row of the table
+        @param:rows, the rows under the header row
+        @param:wanted_headers, the headers to index, which has to include
+                               the CID and LOCATION_HEADERS
+        @param:offset, the row number of the first row in rows
+
+        e.g.
+            index = TableIndex(headers[0], rows, ['CID', 'Lab', ...], 2)
+            index.columns
+            # {'CID': 0, 'Lab': 16, ...}
+            index.by_location['TEL-L5-F01-S1-P1']
+            # {'row_index': 2, 'CID': '202112-39487', ...}
+            index.by_cid['202112-39487']
+            # 'TEL-L5-F01-S1-P1'
+    """
+    def __init__(self, header_row: list, rows: list[list],
+                 wanted_headers: list, offset: int = 2):
+        self.columns = build_column_map(header_row, wanted_headers)
+        width = max(len(header_row), max(self.columns.values()) + 1)
+        get_location = itemgetter(
+            *[self.columns[h] for h in LOCATION_HEADERS])
+        value_columns = [(h, self.columns[h]) for h in wanted_headers
+                         if h not in LOCATION_HEADERS]
+
+        self.by_location = {}
+        self.by_cid = {}
+        for idx, row in enumerate(pad_rows(rows, width)):
+            lab, frame, shelf, partition = get_location(row)
+            # Skip the empty or separator rows
+            if not lab:
+                continue
+            location = location_of(lab, frame, shelf, partition)
+            record = {h: row[i] for h, i in value_columns}
+            record['row_index'] = idx + offset
+            self.by_location[location] = record
+            if record.get('CID'):
+                self.by_cid[record['CID']] = location